@@ -0,0 +1,214 @@
+"""
+Async (ASGI) serving variant.
+
+The event loop only handles connections and request/response I/O; the Flask
+app, and with it all CPU-bound analysis, runs on a bounded thread pool
+executor (SERVER_THREADS workers per process). Health checks are answered on
+the loop directly, so they never queue behind analysis work. Request bodies
+over MAX_REQUEST_BYTES are refused with 413 while they are read (the
+streaming endpoint, bounded per line by the app, instead reads its body as it
+arrives), and response chunks are sent as the app yields them, so NDJSON/SSE
+streams stay incremental.
+
+    SERVER_MODE=async gunicorn -c gunicorn.conf.py asgi:app
+    uvicorn asgi:app --port 5000    (single process, no preloading)
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from wsgi import application as wsgi_app
+from utils.constants import DEFAULT_SERVER_THREADS, MAX_REQUEST_BYTES
+
+HEALTH_PATH = '/api/health'
+STREAM_PATH = '/api/analyze/stream'
+
+class _ReceiveStream(io.RawIOBase):
+    """
+    wsgi.input that pulls body chunks from the ASGI connection as the app
+    reads them (from an executor thread).
+    """
+
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.pending = b''
+        self.more_body = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending and self.more_body:
+            message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+            if message['type'] == 'http.disconnect':
+                self.more_body = False
+                break
+            self.pending = message.get('body', b'')
+            self.more_body = message.get('more_body', False)
+        n = min(len(buffer), len(self.pending))
+        buffer[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+class AsyncAnalysisApp:
+    """
+    ASGI adapter that runs a WSGI app on an executor.
+    """
+
+    def __init__(self, wsgi_app, max_workers=None, max_body=None):
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers or int(os.getenv("SERVER_THREADS", DEFAULT_SERVER_THREADS))
+        self.max_body = max_body or int(os.getenv("MAX_REQUEST_BYTES", MAX_REQUEST_BYTES))
+        # Created on startup, i.e. after a pre-forking master has forked
+        self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._get_executor()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.executor is not None:
+                    self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis')
+        return self.executor
+
+    async def _http(self, scope, receive, send):
+        if scope['path'] == HEALTH_PATH and scope['method'] == 'GET':
+            body = json.dumps({"status": "healthy"}).encode('utf-8')
+            await self._respond(send, 200, [(b'content-type', b'application/json')], [body])
+            return
+
+        loop = asyncio.get_running_loop()
+        if scope['path'] == STREAM_PATH:
+            # 1. Streaming input: the app reads the body as it arrives
+            environ = self._environ(scope, io.BufferedReader(_ReceiveStream(receive, loop)))
+        else:
+            # 1. Read the request body on the loop, refusing it once it is over the limit
+            body = await self._read_body(receive, dict(scope.get('headers', [])))
+            if body is None:
+                await self._too_large(send)
+                return
+            environ = self._environ(scope, io.BytesIO(body), len(body))
+
+        # 2. Run the WSGI app (routing, validation, analysis) on the executor; it
+        # sends the response itself, chunk by chunk, through the loop
+        await loop.run_in_executor(self._get_executor(), self._run_wsgi, environ, send, loop)
+
+    async def _read_body(self, receive, headers):
+        """
+        The full request body, or None once it is over max_body (declared or read).
+        """
+        if int(headers.get(b'content-length', b'0') or 0) > self.max_body:
+            return None
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body:
+                return None
+            chunks.append(chunk)
+            more_body = message.get('more_body', False)
+        return b''.join(chunks)
+
+    def _run_wsgi(self, environ, send, loop):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+        def emit(message):
+            # Blocks this worker until the loop has sent it, so a slow client holds
+            # back the app instead of buffering its output (raises on disconnect)
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start():
+            if not response.get('started'):
+                response['started'] = True
+                emit({'type': 'http.response.start', 'status': response['status'],
+                      'headers': response['headers']})
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    start()
+                    emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            start()
+            emit({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    async def _too_large(self, send):
+        body = json.dumps({"error": RequestEntityTooLarge.description}).encode('utf-8')
+        await self._respond(send, 413, [(b'content-type', b'application/json'), (b'connection', b'close')], [body])
+
+    @staticmethod
+    async def _respond(send, status, headers, body):
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(body)})
+
+    @staticmethod
+    def _environ(scope, body, content_length=None):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            # Without a length the body is read until the client ends it
+            'wsgi.input_terminated': content_length is None,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+        if content_length is not None:
+            environ['CONTENT_LENGTH'] = str(content_length)
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                key = f'HTTP_{name}'
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+app = AsyncAnalysisApp(wsgi_app)
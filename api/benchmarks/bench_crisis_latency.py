@@ -0,0 +1,139 @@
+"""
+Latency of crisis messages while routine traffic floods the service.
+
+In process: --flood threads call perform_full_analysis back to back with
+routine (non-crisis) corpus messages, standing in for busy server threads,
+while one more thread sends a crisis message every --interval ms and records
+its latency from the scheduled send time. Runs idle (no flood) as a reference, then under the flood
+without the priority gate (every analysis competes for the GIL) and with
+it (at most --slots analyses at once, crisis messages first). The result
+cache is off, and SOS dispatch uses the mock sender.
+
+Usage: python benchmarks/bench_crisis_latency.py [--flood 16] [--slots 2]
+       [--duration 5] [--interval 20] [--json]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from benchmarks.corpus import synthetic_corpus
+from utils.priority_gate import PriorityGate
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2) if values else None
+
+
+def run_scenario(service, routine, crisis, flood, duration, interval):
+    # Every thread checks the deadline itself: under GIL contention a
+    # sleeping coordinator thread can be woken far too late to stop them
+    start_time = time.perf_counter()
+    deadline = start_time + duration
+    routine_ms = []
+    crisis_ms = []
+
+    def flood_worker(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            service.perform_full_analysis(routine[i % len(routine)], 'user')
+            routine_ms.append((time.perf_counter() - start) * 1000)
+            i += flood
+
+    def crisis_sender():
+        # Open loop: latency counts from each message's scheduled send time, so
+        # time the sender itself spends waiting for the GIL is included
+        i = 0
+        scheduled = start_time
+        while scheduled < deadline:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            result = service.perform_full_analysis(crisis[i % len(crisis)], 'user')
+            crisis_ms.append((time.perf_counter() - scheduled) * 1000)
+            assert result['classified_state'] == "Critical Distress"
+            i += 1
+            scheduled = max(scheduled + interval / 1000, time.perf_counter())
+
+    threads = [threading.Thread(target=flood_worker, args=(n,), daemon=True) for n in range(flood)]
+    threads.append(threading.Thread(target=crisis_sender, daemon=True))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "crisis_messages": len(crisis_ms),
+        "crisis_p50_ms": percentile(crisis_ms, 0.5),
+        "crisis_p99_ms": percentile(crisis_ms, 0.99),
+        "crisis_max_ms": round(max(crisis_ms), 2) if crisis_ms else None,
+        "elapsed_s": round(elapsed, 2),
+        "routine_per_sec": round(len(routine_ms) / elapsed, 1),
+        "routine_p50_ms": percentile(routine_ms, 0.5),
+        "routine_p99_ms": percentile(routine_ms, 0.99)
+    }
+
+
+def run(flood, slots, duration, interval):
+    os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+    os.environ["LOAD_SHEDDING"] = "0"
+    from services.analysis_service import AnalysisService
+    service = AnalysisService()
+    service.warm_up()
+
+    messages = [item["message"] for item in synthetic_corpus(2000)]
+    crisis = [m for m in messages if service.screen_crisis(m)]
+    routine = [m for m in messages if not service.screen_crisis(m)]
+
+    # Screen cost per message
+    start = time.perf_counter()
+    for message in messages:
+        service.screen_crisis(message)
+    screen_us = (time.perf_counter() - start) / len(messages) * 1e6
+
+    results = {"screen_us_per_message": round(screen_us, 2)}
+    for name, gate, threads in (("idle", None, 0), ("flood_no_gate", None, flood),
+                                ("flood_priority_gate", PriorityGate(slots), flood)):
+        service.gate = gate
+        results[name] = run_scenario(service, routine, crisis, threads, duration, interval)
+    service.sos_dispatcher.shutdown(wait=False)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--flood', type=int, default=16, help="Threads sending routine messages")
+    parser.add_argument('--slots', type=int, default=2, help="Priority gate slots (ANALYSIS_CONCURRENCY)")
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument('--interval', type=float, default=20.0, help="Milliseconds between crisis messages")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = run(args.flood, args.slots, args.duration, args.interval)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Crisis pre-screen: {results['screen_us_per_message']} us per message\n")
+    print(f"{'scenario':>20} {'crisis n':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'routine/s':>10} {'routine p50':>12} {'routine p99':>12}")
+    for name in ("idle", "flood_no_gate", "flood_priority_gate"):
+        r = results[name]
+        print(f"{name:>20} {r['crisis_messages']:>9} {r['crisis_p50_ms']:>8} {r['crisis_p99_ms']:>8} "
+              f"{r['crisis_max_ms']:>8} {r['routine_per_sec']:>10} {str(r['routine_p50_ms']):>12} "
+              f"{str(r['routine_p99_ms']):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Per-endpoint request benchmark through the Flask test client (in-process, no
+network): request parsing, validation, analysis and response serialisation.
+
+Each variant runs in its own process: the JSON codec (JSON_BACKEND=stdlib or
+orjson) with compression off, and orjson with gzip and brotli negotiated.
+--before adds a "before" variant running the same requests against another
+checkout of api/ (e.g. a `git worktree` of an older commit). Variants are
+run interleaved for --rounds rounds and the best round per endpoint is kept,
+which evens out noise on shared machines. The result cache and rate limiting
+are disabled and SOS uses the fake Twilio client.
+
+Usage: python benchmarks/bench_endpoints.py [--requests 2000] [--rounds 3]
+       [--variants stdlib orjson orjson+gzip orjson+br] [--before PATH] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.normpath(os.path.join(BENCH_DIR, '..'))
+CORPUS_PATH = os.path.join(BENCH_DIR, 'fixtures', 'sentiment_corpus.txt')
+
+VARIANTS = {
+    "stdlib": ({"JSON_BACKEND": "stdlib", "COMPRESSION": "0"}, None),
+    "orjson": ({"JSON_BACKEND": "orjson", "COMPRESSION": "0"}, None),
+    "orjson+gzip": ({"JSON_BACKEND": "orjson"}, "gzip"),
+    "orjson+br": ({"JSON_BACKEND": "orjson"}, "br"),
+}
+
+
+def load_messages():
+    with open(CORPUS_PATH, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def endpoints(messages):
+    """
+    (name, method, path, request kwargs) for each benchmarked endpoint.
+    """
+    batch = messages[:50]
+    return [
+        ("analyze_user", 'POST', '/api/analyze', lambda i: {"json": {"message": messages[i % len(messages)]}}),
+        ("analyze_review", 'POST', '/api/analyze',
+         lambda i: {"json": {"message": messages[i % len(messages)], "mode": "review"}}),
+        ("batch_50_review", 'POST', '/api/analyze/batch', lambda i: {"json": {"messages": batch, "mode": "review"}}),
+        ("stream_50", 'POST', '/api/analyze/stream', lambda i: {"data": "\n".join(batch), "content_type": "text/plain"}),
+        ("cache_stats", 'GET', '/api/cache/stats', lambda i: {}),
+        ("health", 'GET', '/api/health', lambda i: {}),
+    ]
+
+
+def run_variant(requests, encoding):
+    """
+    Runs in the child process: times every endpoint with the test client.
+    """
+    sys.path.insert(0, os.environ["BENCH_API_DIR"])
+    import logging
+    logging.disable(logging.WARNING)
+    from index import app, get_services
+
+    get_services()[0].warm_up()
+    client = app.test_client()
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    messages = load_messages()
+
+    results = {}
+    for name, method, path, make in endpoints(messages):
+        # Batch and stream requests carry 50 messages each
+        count = max(20, requests // 50) if name in ("batch_50_review", "stream_50") else requests
+        latencies = []
+        size = 0
+        for i in range(count):
+            kwargs = make(i)
+            start = time.perf_counter()
+            response = client.open(path, method=method, headers=headers, **kwargs)
+            body = response.get_data()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {response.status_code} {body[:200]!r}")
+            size = len(body)
+
+        latencies.sort()
+        results[name] = {
+            "requests": count,
+            "mean_ms": round(statistics.fmean(latencies), 4),
+            "p50_ms": round(latencies[len(latencies) // 2], 4),
+            "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 4),
+            "body_bytes": size
+        }
+    return results
+
+
+def spawn(variant, requests, api_dir):
+    env_overrides, _ = VARIANTS[variant]
+    env = dict(os.environ, ANALYSIS_CACHE_SIZE="0", SOS_FAKE_TWILIO="1", SOS_FAKE_TWILIO_LATENCY="0",
+               LEXICON_WATCH_INTERVAL="0", RATE_LIMIT="0", LOAD_SHEDDING="0", BENCH_API_DIR=api_dir, **env_overrides)
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', variant, '--requests', str(requests)]
+    out = subprocess.run(cmd, env=env, cwd=api_dir, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per single-message endpoint")
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--before', help="api/ directory of an older checkout to compare against")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_variant(args.requests, VARIANTS[args.child][1])))
+        return
+
+    runs = [(variant, API_DIR, variant) for variant in args.variants]
+    if args.before:
+        runs.insert(0, ("before", os.path.abspath(args.before), "stdlib"))
+
+    results = {}
+    for _ in range(args.rounds):
+        for label, api_dir, variant in runs:
+            for name, r in spawn(variant, args.requests, api_dir).items():
+                best = results.setdefault(label, {}).get(name)
+                if best is None or r["mean_ms"] < best["mean_ms"]:
+                    results[label][name] = r
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'endpoint':>16} {'variant':>12} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8} {'body B':>8}")
+    for name in next(iter(results.values())):
+        for label, by_endpoint in results.items():
+            r = by_endpoint[name]
+            print(f"{name:>16} {label:>12} {r['mean_ms']:>9} {r['p50_ms']:>9} {r['p99_ms']:>9} "
+                  f"{round(1000 / r['mean_ms']):>8} {r['body_bytes']:>8}")
+
+
+if __name__ == '__main__':
+    main()
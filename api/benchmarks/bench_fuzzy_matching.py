@@ -0,0 +1,149 @@
+"""
+Latency of lexicon matching with fuzzy (typo-tolerant) mode off and on.
+
+Runs KeywordExtractor.match_cleaned over the synthetic corpus twice: as
+generated, and with one random edit (deletion, insertion, substitution or
+transposition) applied to every lexicon word of 5+ letters, which is what the
+fuzzy index has to recover. Fuzzy mode is timed cold (empty correction cache)
+and warm. Also reports the index build time, how many misspelled words are
+corrected back to the original, and the per-token cost of the SymSpell
+lookup against a brute-force edit distance over the whole vocabulary.
+
+Usage: python benchmarks/bench_fuzzy_matching.py [--size 2000] [--seed 11] [--json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import string
+import sys
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from benchmarks.corpus import synthetic_corpus
+from nlp.fuzzy_index import edit_distance
+from nlp.keyword_extractor import KeywordExtractor
+from nlp.preprocessing import clean_text
+
+
+def misspell(word, rng):
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(('delete', 'insert', 'substitute', 'transpose'))
+    if edit == 'delete':
+        return word[:i] + word[i + 1:]
+    if edit == 'insert':
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if edit == 'substitute':
+        return word[:i] + rng.choice(string.ascii_lowercase.replace(word[i], '')) + word[i + 1:]
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+
+
+def typo_corpus(messages, vocabulary, seed):
+    """
+    Cleaned messages with every long lexicon word misspelled, plus the
+    (misspelling, original word) pairs.
+    """
+    rng = random.Random(seed)
+    typo_messages, edits = [], []
+    for cleaned in messages:
+        tokens = cleaned.split()
+        for i, token in enumerate(tokens):
+            if token in vocabulary and len(token) >= 5:
+                tokens[i] = misspell(token, rng)
+                edits.append((tokens[i], token))
+        typo_messages.append(" ".join(tokens))
+    return typo_messages, edits
+
+
+def time_matches(extractor, lexicon, messages):
+    latencies = []
+    results = []
+    for cleaned in messages:
+        start = time.perf_counter()
+        results.append(extractor.match_cleaned(cleaned, lexicon))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    return results, {
+        "mean_us": round(sum(latencies) / len(latencies), 2),
+        "p50_us": round(latencies[len(latencies) // 2], 2),
+        "p99_us": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2)
+    }
+
+
+def run(size, seed):
+    exact = KeywordExtractor(fuzzy_matching=False)
+    fuzzy = KeywordExtractor(fuzzy_matching=True)
+    lexicon = exact.lexicon
+
+    start = time.perf_counter()
+    index = lexicon.fuzzy_index
+    build_ms = (time.perf_counter() - start) * 1000
+
+    clean = [clean_text(item["message"]) for item in synthetic_corpus(size)]
+    typos, edits = typo_corpus(clean, index.vocabulary, seed)
+
+    results = {"index": {"build_ms": round(build_ms, 1), "vocabulary": len(index.vocabulary),
+                         "delete_keys": len(index)}}
+    for name, messages in (("clean", clean), ("typos", typos)):
+        exact_results, results[f"{name}_fuzzy_off"] = time_matches(exact, lexicon, messages)
+        index.correct.cache_clear()
+        _, results[f"{name}_fuzzy_on_cold"] = time_matches(fuzzy, lexicon, messages)
+        fuzzy_results, results[f"{name}_fuzzy_on_warm"] = time_matches(fuzzy, lexicon, messages)
+        if name == "typos":
+            results["recall"] = {
+                "misspelled_words": len(edits),
+                "recovered": sum(1 for typo, word in edits if index.correct(typo) == word),
+                "keywords_exact": sum(len(r["keywords"]) for r in exact_results),
+                "keywords_fuzzy": sum(len(r["keywords"]) for r in fuzzy_results)
+            }
+
+    # Per-token lookup: SymSpell index vs. edit distance against every vocabulary word
+    tokens = sorted({t for m in typos for t in m.split() if len(t) >= index.min_length})[:500]
+    index.correct.cache_clear()
+    start = time.perf_counter()
+    for token in tokens:
+        index._correct(token)
+    symspell_us = (time.perf_counter() - start) / len(tokens) * 1e6
+    start = time.perf_counter()
+    for token in tokens:
+        min(index.vocabulary, key=lambda word: edit_distance(token, word, index.max_distance))
+    brute_us = (time.perf_counter() - start) / len(tokens) * 1e6
+    results["lookup"] = {"tokens": len(tokens), "symspell_us_per_token": round(symspell_us, 2),
+                         "brute_force_us_per_token": round(brute_us, 2)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument('--seed', type=int, default=11, help="Seed for the injected typos")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = run(args.size, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    r = results["index"]
+    print(f"Fuzzy index: {r['vocabulary']} words, {r['delete_keys']} delete keys, built in {r['build_ms']} ms\n")
+    print(f"{'corpus':>8} {'mode':>14} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+    for name in ("clean", "typos"):
+        for mode in ("fuzzy_off", "fuzzy_on_cold", "fuzzy_on_warm"):
+            r = results[f"{name}_{mode}"]
+            print(f"{name:>8} {mode:>14} {r['mean_us']:>9} {r['p50_us']:>9} {r['p99_us']:>9}")
+    r = results["recall"]
+    print(f"\nMisspelled lexicon words: {r['misspelled_words']}, corrected back: {r['recovered']}; "
+          f"keywords found {r['keywords_exact']} exact vs {r['keywords_fuzzy']} fuzzy")
+    r = results["lookup"]
+    print(f"Lookup per token ({r['tokens']} tokens): SymSpell {r['symspell_us_per_token']} us, "
+          f"brute force {r['brute_force_us_per_token']} us")
+
+
+if __name__ == '__main__':
+    main()
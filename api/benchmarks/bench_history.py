@@ -0,0 +1,103 @@
+"""
+Dashboard history queries as a user's history grows.
+
+Fills a fresh SQLite history store with N analyses spread over a year
+(timing the appends, rollups included), then times series() for the views
+the dashboard draws (last day, last 30 days, last year) against reading
+every raw event in the range and aggregating it in Python, which is what
+the browser did with the full history.
+
+Usage: python benchmarks/bench_history.py [--sizes 1000 10000 100000] [--points 200]
+       [--repeat 5] [--json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from services.history_store import SQLiteHistoryStore
+from utils.constants import ALLOWED_STATES
+
+YEAR = 365 * 86400
+VIEWS = (("day", 86400), ("30_days", 30 * 86400), ("year", YEAR))
+
+
+def fill(store, size, now, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for timestamp in sorted(now - rng.random() * YEAR for _ in range(size)):
+        store.append("user", rng.choice(ALLOWED_STATES), rng.random() * 5, rng.uniform(-1, 1),
+                     rng.random() < 0.02, timestamp=timestamp)
+    return (time.perf_counter() - start) / size * 1e6
+
+
+def raw_series(store, start, end, points):
+    """
+    Every event in the range, bucketed client-side.
+    """
+    rows = store._connection().execute(
+        "SELECT timestamp, intensity_score FROM history_events WHERE user_id = ? AND timestamp >= ? AND timestamp < ?",
+        ("user", start, end)
+    ).fetchall()
+    width = (end - start) / points
+    buckets = {}
+    for timestamp, intensity in rows:
+        buckets.setdefault(int((timestamp - start) // width), []).append(intensity)
+    return [sum(values) / len(values) for _, values in sorted(buckets.items())]
+
+
+def best_ms(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+def run(sizes, points, repeat, seed=7):
+    now = time.time()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            store = SQLiteHistoryStore(os.path.join(directory, f"history-{size}.sqlite3"))
+            row = {"events": size, "append_us": round(fill(store, size, now, seed), 1)}
+            for name, span in VIEWS:
+                row[f"{name}_series_ms"] = best_ms(lambda: store.series("user", now - span, now, points), repeat)
+                row[f"{name}_raw_ms"] = best_ms(lambda: raw_series(store, now - span, now, points), repeat)
+            results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--points', type=int, default=200, help="Chart resolution (buckets per series)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per query (best is kept)")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = run(args.sizes, args.points, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'events':>8} {'append us':>10}" + "".join(f" {name + ' series':>16} {name + ' raw':>13}" for name, _ in VIEWS))
+    for r in results:
+        print(f"{r['events']:>8} {r['append_us']:>10}" +
+              "".join(f" {r[name + '_series_ms']:>16} {r[name + '_raw_ms']:>13}" for name, _ in VIEWS))
+    print("\n(times in ms; raw = every event in the range aggregated in Python)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Compares the token-level LexiconIndex against the original per-keyword
+substring loop at growing lexicon sizes.
+The "scored" column is the full KeywordExtractor pass over the index with
+negation/intensifier weighting applied.
+
+Usage: python benchmarks/bench_lexicon_index.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from types import SimpleNamespace
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.keyword_extractor import KeywordExtractor
+from nlp.lexicon_index import LexiconIndex
+from nlp.preprocessing import clean_text
+
+MESSAGES = [
+    "im fine",
+    "I feel so anxious and worried about my exams tomorrow",
+    "Everything is overwhelming, I can't sleep and my chest feels tight all the time",
+    "Had a calm and productive day, feeling grateful and content with how things went",
+    "I don't know anymore. Nothing matters, I feel empty and alone and I just want it all to stop. "
+    "Work is piling up, deadlines everywhere, and I keep thinking I'm a burden to everyone.",
+]
+
+
+def build_lexicon(size, seed=42):
+    """
+    Real lexicon terms padded with deterministic synthetic words and phrases.
+    """
+    lex_path = os.path.join(API_DIR, 'data', 'lexicon.json')
+    with open(lex_path, 'r') as f:
+        terms = [" ".join(clean_text(kw).split()) for kws in json.load(f).values() for kw in kws]
+    terms = [t for t in dict.fromkeys(terms) if t]
+
+    rng = random.Random(seed)
+    seen = set(terms)
+    while len(terms) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+                 for _ in range(rng.choice((1, 1, 1, 2, 3)))]
+        term = " ".join(words)
+        if term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms[:size]
+
+
+def loop_match(terms, cleaned):
+    return [t for t in terms if t in cleaned]
+
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for msg in MESSAGES:
+            fn(msg)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES))
+
+
+def run(sizes, repeat):
+    cleaned_messages = {msg: clean_text(msg) for msg in MESSAGES}
+    extractor = KeywordExtractor(context_scoring=True)
+    results = []
+
+    for size in sizes:
+        terms = build_lexicon(size)
+
+        start = time.perf_counter()
+        index = LexiconIndex(terms, terms, [("Normal",)] * len(terms), {"Normal": 1})
+        build_s = time.perf_counter() - start
+
+        loop_s = time_per_call(lambda m: loop_match(terms, cleaned_messages[m]), repeat)
+        index_s = time_per_call(lambda m: index.find_spans(cleaned_messages[m]), repeat)
+        lexicon = SimpleNamespace(index=index, categories=("Normal",))
+        scored_s = time_per_call(
+            lambda m: extractor.match_cleaned(cleaned_messages[m], lexicon, raw_text=m.lower()), repeat)
+
+        results.append({
+            "lexicon_size": size,
+            "build_ms": round(build_s * 1000, 2),
+            "loop_us_per_msg": round(loop_s * 1e6, 2),
+            "index_us_per_msg": round(index_s * 1e6, 2),
+            "index_speedup": round(loop_s / index_s, 1),
+            "scored_us_per_msg": round(scored_s * 1e6, 2),
+            "scored_speedup": round(loop_s / scored_s, 1)
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'lexicon':>8} {'build ms':>10} {'loop us/msg':>12} "
+          f"{'index us/msg':>13} {'speedup':>8} {'scored us/msg':>14} {'speedup':>8}")
+    for r in results:
+        print(f"{r['lexicon_size']:>8} {r['build_ms']:>10} {r['loop_us_per_msg']:>12} "
+              f"{r['index_us_per_msg']:>13} {r['index_speedup']:>7}x "
+              f"{r['scored_us_per_msg']:>14} {r['scored_speedup']:>7}x")
+
+
+if __name__ == '__main__':
+    main()
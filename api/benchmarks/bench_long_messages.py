@@ -0,0 +1,100 @@
+"""
+Per-request cost of long messages (journal entries) as input grows.
+
+Times perform_full_analysis (review mode, result cache off, SOS disabled)
+on messages of increasing length built from the synthetic corpus, for:
+whole-message analysis without an input cap, whole-message analysis with
+the MAX_ANALYSIS_CHARS cap, and segmented (per-sentence) analysis with the
+cap. With the cap, cost stops growing once input exceeds it.
+
+Usage: python benchmarks/bench_long_messages.py [--sizes 1000 10000 100000 500000]
+       [--max-chars 10000] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from benchmarks.corpus import synthetic_corpus
+from utils.constants import MAX_ANALYSIS_CHARS
+
+
+def build_message(size):
+    """
+    Multi-paragraph text of at least `size` characters.
+    """
+    paragraphs = []
+    length = 0
+    for item in synthetic_corpus(max(8, size // 100)):
+        if item["shape"] in ("long", "multi_paragraph"):
+            paragraphs.append(item["message"])
+            length += len(item["message"]) + 2
+            if length >= size:
+                break
+    return "\n\n".join(paragraphs)[:size]
+
+
+def time_analysis(service, message, segmented, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = service.perform_full_analysis(message, 'review', segmented=segmented)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 2), result
+
+
+def run(sizes, max_chars, repeat):
+    os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+    os.environ["LOAD_SHEDDING"] = "0"
+    from services.analysis_service import AnalysisService
+    service = AnalysisService(enable_sos=False)
+    service.warm_up()
+    # Loads punkt outside the timings
+    service.perform_full_analysis("Warm up. Two sentences.", 'review', segmented=True)
+
+    results = []
+    for size in sizes:
+        message = build_message(size)
+        row = {"chars": len(message)}
+
+        service.max_chars = sys.maxsize
+        row["whole_uncapped_ms"], _ = time_analysis(service, message, False, repeat)
+        service.max_chars = max_chars
+        row["whole_capped_ms"], _ = time_analysis(service, message, False, repeat)
+        row["segmented_capped_ms"], result = time_analysis(service, message, True, repeat)
+        row["sentences"] = len(result["decision_explanation"]["sentences"])
+        row["truncated"] = "input_truncated" in result
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 500000])
+    parser.add_argument('--max-chars', type=int, default=MAX_ANALYSIS_CHARS)
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per point (best is kept)")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = run(args.sizes, args.max_chars, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Cap: {args.max_chars} characters\n")
+    print(f"{'chars':>8} {'whole ms':>10} {'capped ms':>10} {'segmented ms':>13} {'sentences':>10} {'truncated':>10}")
+    for r in results:
+        print(f"{r['chars']:>8} {r['whole_uncapped_ms']:>10} {r['whole_capped_ms']:>10} "
+              f"{r['segmented_capped_ms']:>13} {r['sentences']:>10} {str(r['truncated']):>10}")
+
+
+if __name__ == '__main__':
+    main()
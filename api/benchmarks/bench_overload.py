@@ -0,0 +1,183 @@
+"""
+Load shedding: serving modes and latency through an overload and after it.
+
+In process, open loop: a dispatcher thread schedules routine corpus messages
+at --light requests/s, then --heavy requests/s for --surge seconds, then
+--light again, and hands each one to a pool of --threads workers (standing
+in for one worker process's server threads) that call perform_full_analysis
+in review mode.
+Latency counts from the scheduled arrival, so time spent queued behind busy
+workers is included. The timeline shows, per --window, the requests
+completed, their latency and the serving modes they got; the run is
+repeated with LOAD_SHEDDING=0 for comparison. Sentiment uses the TextBlob
+backend (what the first degraded mode sheds), the result cache is off and a
+crisis message every 100 ms checks that crisis detection is never shed.
+
+Usage: python benchmarks/bench_overload.py [--light 200] [--heavy 2500]
+       [--before 3] [--surge 6] [--after 12] [--threads 4] [--window 0.5] [--json]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from benchmarks.corpus import synthetic_corpus
+from utils.constants import SERVING_MODES, DEFAULT_SERVER_THREADS
+
+CRISIS_INTERVAL = 0.1
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2) if values else None
+
+
+def schedule(light, heavy, before, surge, after):
+    """
+    Arrival offsets (seconds from the start) for the three phases.
+    """
+    arrivals = []
+    for rate, phase_start, phase_end in ((light, 0, before), (heavy, before, before + surge),
+                                         (light, before + surge, before + surge + after)):
+        t = phase_start
+        while t < phase_end:
+            arrivals.append(t)
+            t += 1 / rate
+    return arrivals
+
+
+def run_scenario(service, routine, crisis, arrivals, threads, duration):
+    records = []
+    crisis_states = []
+    lock = threading.Lock()
+    start_time = time.perf_counter()
+
+    def handle(scheduled, message, is_crisis):
+        response = service.perform_full_analysis(message, 'review')
+        done = time.perf_counter()
+        with lock:
+            if is_crisis:
+                crisis_states.append((response['classified_state'], response['serving_mode']))
+            else:
+                records.append((done - start_time, (done - scheduled) * 1000, response['serving_mode']))
+
+    # Crisis messages ride along with the routine arrivals
+    events = [(t, False) for t in arrivals]
+    events += [(i * CRISIS_INTERVAL, True) for i in range(int(duration / CRISIS_INTERVAL))]
+    events.sort()
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for i, (offset, is_crisis) in enumerate(events):
+            scheduled = start_time + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            message = crisis[i % len(crisis)] if is_crisis else routine[i % len(routine)]
+            futures.append(pool.submit(handle, scheduled, message, is_crisis))
+    for future in futures:
+        future.result()
+    return records, crisis_states
+
+
+def timeline(records, window):
+    rows = []
+    end = max(done for done, _, _ in records)
+    for n in range(int(end / window) + 1):
+        latencies = [ms for done, ms, _ in records if n * window <= done < (n + 1) * window]
+        modes = [mode for done, _, mode in records if n * window <= done < (n + 1) * window]
+        rows.append({
+            "t": round(n * window, 2),
+            "completed": len(latencies),
+            "p50_ms": percentile(latencies, 0.5),
+            "p99_ms": percentile(latencies, 0.99),
+            "modes": {mode: modes.count(mode) for mode in SERVING_MODES if mode in modes}
+        })
+    return rows
+
+
+def phase_summary(records, before, surge):
+    phases = {}
+    for name, lo, hi in (("before", 0, before), ("surge", before, before + surge),
+                         ("after", before + surge, float("inf"))):
+        latencies = [ms for done, ms, _ in records if lo <= done < hi]
+        phases[name] = {"completed": len(latencies), "p50_ms": percentile(latencies, 0.5),
+                        "p99_ms": percentile(latencies, 0.99)}
+    return phases
+
+
+def run(light, heavy, before, surge, after, threads, window):
+    os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+    os.environ["SENTIMENT_BACKEND"] = "textblob"
+    os.environ["HISTORY_STORE"] = "none"
+    # Analyses queue at the priority gate, so queue depth is one of the overload signals
+    os.environ.setdefault("ANALYSIS_CONCURRENCY", "2")
+    os.environ.setdefault("SOS_FAKE_TWILIO", "1")
+    os.environ.setdefault("SOS_FAKE_TWILIO_LATENCY", "0")
+    from services.analysis_service import AnalysisService
+
+    arrivals = schedule(light, heavy, before, surge, after)
+    duration = before + surge + after
+    results = {}
+    for name, shedding in (("shedding", "1"), ("no_shedding", "0")):
+        os.environ["LOAD_SHEDDING"] = shedding
+        service = AnalysisService()
+        service.warm_up()
+        messages = [item["message"] for item in synthetic_corpus(2000)]
+        crisis = [m for m in messages if service.screen_crisis(m)]
+        routine = [m for m in messages if not service.screen_crisis(m)]
+
+        records, crisis_states = run_scenario(service, routine, crisis, arrivals, threads, duration)
+        results[name] = {
+            "phases": phase_summary(records, before, surge),
+            "timeline": timeline(records, window),
+            "crisis_messages": len(crisis_states),
+            "crisis_all_critical_full": all(state == "Critical Distress" and mode == SERVING_MODES[0]
+                                            for state, mode in crisis_states),
+            "final_mode": service.overload.stats()["mode"] if service.overload else None
+        }
+        service.sos_dispatcher.shutdown(wait=False)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--light', type=float, default=200, help="Requests/s before and after the surge")
+    parser.add_argument('--heavy', type=float, default=2500, help="Requests/s during the surge")
+    parser.add_argument('--before', type=float, default=3, help="Seconds of light load first")
+    parser.add_argument('--surge', type=float, default=6, help="Seconds of heavy load")
+    parser.add_argument('--after', type=float, default=12, help="Seconds of light load after the surge")
+    parser.add_argument('--threads', type=int, default=DEFAULT_SERVER_THREADS, help="Worker threads")
+    parser.add_argument('--window', type=float, default=0.5, help="Timeline resolution in seconds")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = run(args.light, args.heavy, args.before, args.surge, args.after, args.threads, args.window)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, r in results.items():
+        print(f"{name}: {r['crisis_messages']} crisis messages, all Critical and served in full: "
+              f"{r['crisis_all_critical_full']}; final mode {r['final_mode']}")
+        print(f"{'t (s)':>6} {'done':>6} {'p50 ms':>9} {'p99 ms':>9}  modes")
+        for row in r['timeline']:
+            modes = ", ".join(f"{mode} {n}" for mode, n in row['modes'].items())
+            print(f"{row['t']:>6} {row['completed']:>6} {str(row['p50_ms']):>9} {str(row['p99_ms']):>9}  {modes}")
+        print(f"{'phase':>8} {'done':>7} {'p50 ms':>9} {'p99 ms':>9}")
+        for phase, p in r['phases'].items():
+            print(f"{phase:>8} {p['completed']:>7} {str(p['p50_ms']):>9} {str(p['p99_ms']):>9}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Analysis pipeline benchmark and golden-corpus accuracy check.
+
+Measures per-stage latency (from AnalysisContext stage timings), end-to-end
+throughput and peak memory on a synthetic corpus, and the pipeline's accuracy
+on the hand-labelled golden corpus (states and sentiment labels, scored
+separately). --check fails when either accuracy drops below its floor.
+Results are written as JSON so runs can be compared (--baseline). The result
+cache is disabled and SOS uses the fake Twilio client.
+
+Usage: python benchmarks/bench_pipeline.py [--size 2000] [--output run.json]
+       [--baseline previous.json] [--check] [--json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+os.environ["LOAD_SHEDDING"] = "0"
+os.environ.setdefault("SOS_FAKE_TWILIO", "1")
+os.environ.setdefault("SOS_FAKE_TWILIO_LATENCY", "0")
+
+import logging
+logging.disable(logging.WARNING)
+
+from benchmarks.corpus import SHAPES, load_golden, synthetic_corpus
+
+# --check floors for golden-corpus accuracy (raise them as the pipeline improves)
+GOLDEN_MIN_STATE_ACCURACY = 0.8
+GOLDEN_MIN_SENTIMENT_ACCURACY = 0.75
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(values):
+    return {
+        "mean_ms": round(statistics.fmean(values), 4),
+        "p50_ms": round(percentile(values, 50), 4),
+        "p95_ms": round(percentile(values, 95), 4),
+        "p99_ms": round(percentile(values, 99), 4)
+    }
+
+
+def check_golden(service, golden):
+    """
+    Accuracy against the hand labels: states and sentiment labels are
+    counted separately; every message that gets either wrong is listed.
+    """
+    states = labels = 0
+    mismatches = []
+    for item in golden:
+        result = service.perform_full_analysis(item["message"], 'review')
+        state = result["classified_state"]
+        label = result["sentiment_analysis"]["label"]
+        states += state == item["expected_state"]
+        labels += label == item["expected_sentiment_label"]
+        if state != item["expected_state"] or label != item["expected_sentiment_label"]:
+            mismatches.append({
+                "id": item["id"],
+                "expected": [item["expected_state"], item["expected_sentiment_label"]],
+                "actual": [state, label]
+            })
+    total = len(golden)
+    return {
+        "total": total,
+        "state_correct": states,
+        "state_accuracy": round(states / total, 4) if total else None,
+        "sentiment_correct": labels,
+        "sentiment_accuracy": round(labels / total, 4) if total else None,
+        "mismatches": mismatches
+    }
+
+
+def below_floor(golden):
+    return (golden["state_accuracy"] < GOLDEN_MIN_STATE_ACCURACY
+            or golden["sentiment_accuracy"] < GOLDEN_MIN_SENTIMENT_ACCURACY)
+
+
+def stage_latency(service, corpus):
+    """
+    Per-stage timings over the corpus (review mode exposes them), plus
+    end-to-end latency per message shape.
+    """
+    stages = {}
+    by_shape = {shape: [] for shape in SHAPES}
+    for item in corpus:
+        timings = service.perform_full_analysis(item["message"], 'review')["stage_timings_ms"]
+        for stage, ms in timings.items():
+            stages.setdefault(stage, []).append(ms)
+        by_shape[item["shape"]].append(timings["total"])
+
+    return (
+        {stage: summarize(values) for stage, values in sorted(stages.items())},
+        {shape: summarize(values) for shape, values in by_shape.items() if values}
+    )
+
+
+def throughput(service, corpus):
+    start = time.perf_counter()
+    for item in corpus:
+        service.perform_full_analysis(item["message"], 'user')
+    elapsed = time.perf_counter() - start
+    return {"messages": len(corpus), "seconds": round(elapsed, 3), "msgs_per_sec": round(len(corpus) / elapsed, 1)}
+
+
+def peak_memory(service, corpus):
+    tracemalloc.start()
+    for item in corpus:
+        service.perform_full_analysis(item["message"], 'user')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    maxrss_kib = maxrss / 1024 if sys.platform == 'darwin' else maxrss
+    return {"traced_peak_kib": round(peak / 1024, 1), "max_rss_mib": round(maxrss_kib / 1024, 1)}
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=API_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Relative change (%) of stage p50s and throughput against a previous run.
+    """
+    def delta(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    stages = {}
+    for stage, summary in results["stage_latency"].items():
+        old = baseline.get("stage_latency", {}).get(stage)
+        if old:
+            stages[stage] = delta(summary["p50_ms"], old["p50_ms"])
+    return {
+        "baseline_commit": baseline.get("meta", {}).get("commit"),
+        "stage_p50_change_pct": stages,
+        "throughput_change_pct": delta(results["throughput"]["msgs_per_sec"],
+                                       baseline.get("throughput", {}).get("msgs_per_sec", 0))
+    }
+
+
+def run(args):
+    start = time.perf_counter()
+    from services.analysis_service import AnalysisService
+    service = AnalysisService()
+    init_ms = (time.perf_counter() - start) * 1000
+
+    golden = load_golden()
+    corpus = synthetic_corpus(args.size, seed=args.seed)
+    service.warm_up()
+
+    stages, shapes = stage_latency(service, corpus)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "lexicon_version": service.keyword_extractor.lexicon_version,
+            "sentiment_backend": service.sentiment_analyzer.backend.name,
+            "corpus_size": len(corpus),
+            "seed": args.seed
+        },
+        "init_ms": round(init_ms, 1),
+        "golden": check_golden(service, golden),
+        "stage_latency": stages,
+        "end_to_end_by_shape": shapes,
+        "throughput": throughput(service, corpus),
+        "memory": peak_memory(service, corpus[:min(len(corpus), 500)])
+    }
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            results["comparison"] = compare(results, json.load(f))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write the JSON results to this file")
+    parser.add_argument('--baseline', help="Previous results JSON to compare against")
+    parser.add_argument('--check', action='store_true', help="Exit non-zero if golden accuracy is below its floors")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        golden = results["golden"]
+        print(f"Golden corpus accuracy: states {golden['state_correct']}/{golden['total']} "
+              f"({golden['state_accuracy']:.1%}, floor {GOLDEN_MIN_STATE_ACCURACY:.0%}), "
+              f"sentiment labels {golden['sentiment_correct']}/{golden['total']} "
+              f"({golden['sentiment_accuracy']:.1%}, floor {GOLDEN_MIN_SENTIMENT_ACCURACY:.0%})")
+        for m in golden["mismatches"]:
+            print(f"  {m['id']}: expected {m['expected']}, got {m['actual']}")
+
+        print(f"\n{'stage':>20} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for stage, s in results["stage_latency"].items():
+            print(f"{stage:>20} {s['mean_ms']:>9} {s['p50_ms']:>9} {s['p95_ms']:>9} {s['p99_ms']:>9}")
+
+        print(f"\n{'shape':>20} {'p50 ms':>9} {'p99 ms':>9}")
+        for shape, s in results["end_to_end_by_shape"].items():
+            print(f"{shape:>20} {s['p50_ms']:>9} {s['p99_ms']:>9}")
+
+        t, m = results["throughput"], results["memory"]
+        print(f"\nThroughput: {t['msgs_per_sec']} msgs/s ({t['messages']} messages)")
+        print(f"Memory: traced peak {m['traced_peak_kib']} KiB, max RSS {m['max_rss_mib']} MiB")
+
+        if "comparison" in results:
+            c = results["comparison"]
+            print(f"\nVs. baseline {c['baseline_commit']}: throughput {c['throughput_change_pct']:+}%")
+            for stage, pct in c["stage_p50_change_pct"].items():
+                print(f"{stage:>20} p50 {pct:+}%")
+
+    if args.check and below_floor(results["golden"]):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Response assembly and serialisation microbenchmark.
+
+Compares the per-request cost of building and encoding an analysis response
+the previous way (agent response and full review payload rebuilt as fresh
+dicts every call, user mode copied out of the full response, whole response
+through jsonify's encoder) against the current one (frozen per-(state, trend)
+fragments, mode-specific assembly, pre-encoded fragments spliced in by
+encode_response). Reports time per response and memory allocated per
+response (tracemalloc, responses kept alive); times are the best of 5 rounds.
+
+Usage: python benchmarks/bench_response_payload.py [--iterations 10000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+os.environ["ANALYSIS_CACHE_SIZE"] = "0"
+os.environ["LOAD_SHEDDING"] = "0"
+os.environ.setdefault("SOS_FAKE_TWILIO", "1")
+
+import logging
+logging.disable(logging.WARNING)
+
+from nlp.analysis_context import AnalysisContext
+from utils.constants import PRECAUTIONS, NORMAL
+from utils.payload import encode_response
+
+MESSAGES = [
+    "I feel calm and happy today",
+    "I am so stressed about my exams and deadlines",
+    "My heart is racing and I can't stop worrying",
+    "I feel empty and hopeless lately",
+]
+
+
+def legacy_response(service, context, result, mode):
+    """
+    The previous _build_response: agent response and explanation rebuilt as
+    fresh dicts every call, user payload copied field by field from the full one.
+    """
+    sentiment, keywords, state = result['sentiment'], result['keywords'], result['state']
+    with context.timed('trend'):
+        trend = service._analyze_momentum([])
+    with context.timed('agent_response'):
+        agent_resp = service.agent_service._build_response(state, trend)
+    explanation = service._explain(state, sentiment, keywords, result['keyword_contributions'], result['intensity'])
+    precautions = PRECAUTIONS.get(state, PRECAUTIONS[NORMAL])
+    sos_action = {"sos_triggered": False, "message": "No emergency action required"}
+    stage_timings = context.stage_timings()
+    service._record_metrics(context, state, mode)
+
+    full_response = {
+        "prediction_result": state,
+        "sentiment_analysis": sentiment,
+        "extracted_keywords": keywords,
+        "classified_state": state,
+        "intensity_score": result['intensity'],
+        "state_probabilities": result['probabilities'],
+        "precautions": precautions,
+        "autonomous_action": sos_action,
+        "decision_explanation": explanation,
+        "agent_response": agent_resp,
+        "stage_timings_ms": stage_timings,
+        "lexicon_version": context.lexicon_version,
+        "mode": mode
+    }
+    if mode == 'user':
+        return {
+            "prediction_result": full_response["prediction_result"],
+            "sentiment_analysis": full_response["sentiment_analysis"],
+            "intensity_score": full_response["intensity_score"],
+            "classified_state": full_response["classified_state"],
+            "precautions": full_response["precautions"],
+            "autonomous_action": full_response["autonomous_action"],
+            "agent_response": full_response["agent_response"],
+            "lexicon_version": full_response["lexicon_version"],
+            "mode": mode
+        }
+    return full_response
+
+
+def current_response(service, context, result, mode):
+    return service._build_response(context, result, mode, [], None)
+
+
+def measure(build, encode, service, inputs, mode, iterations, rounds=5):
+    # Time: assembly and serialisation separately, best of several rounds
+    build_us = encode_us = float('inf')
+    size = 0
+    for _ in range(rounds):
+        build_s = encode_s = 0.0
+        for i in range(iterations):
+            context, result = inputs[i % len(inputs)]
+            t0 = time.perf_counter()
+            response = build(service, context, result, mode)
+            t1 = time.perf_counter()
+            body = encode(response)
+            encode_s += time.perf_counter() - t1
+            build_s += t1 - t0
+            size = len(body)
+        build_us = min(build_us, build_s / iterations * 1e6)
+        encode_us = min(encode_us, encode_s / iterations * 1e6)
+
+    # Memory: bytes allocated per response (assembled and encoded, kept alive)
+    kept = []
+    sample = min(iterations, 2000)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(sample):
+        context, result = inputs[i % len(inputs)]
+        response = build(service, context, result, mode)
+        kept.append((response, encode(response)))
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return {
+        "build_us": round(build_us, 2),
+        "encode_us": round(encode_us, 2),
+        "bytes_per_response": round(allocated / sample),
+        "body_bytes": size
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=10000)
+    args = parser.parse_args()
+
+    from services.analysis_service import AnalysisService
+    service = AnalysisService()
+    inputs = []
+    for message in MESSAGES:
+        context = AnalysisContext(message, service.keyword_extractor)
+        inputs.append((context, service._analyze_stages(context)))
+
+    # Previous serialisation: Flask's default provider (jsonify)
+    from flask import Flask
+    flask_dumps = Flask(__name__).json.dumps
+    print(f"{'mode':>8} {'variant':>9} {'build us':>9} {'encode us':>10} {'alloc B/resp':>13} {'body B':>7}")
+    for mode in ('user', 'review'):
+        for name, build, encode in (("previous", legacy_response, flask_dumps),
+                                    ("current", current_response, encode_response)):
+            r = measure(build, encode, service, inputs, mode, args.iterations)
+            print(f"{mode:>8} {name:>9} {r['build_us']:>9} {r['encode_us']:>10} "
+                  f"{r['bytes_per_response']:>13} {r['body_bytes']:>7}")
+
+
+if __name__ == '__main__':
+    main()
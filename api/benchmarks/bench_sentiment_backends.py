@@ -0,0 +1,113 @@
+"""
+Accuracy parity and throughput of the sentiment backends on a fixture corpus.
+Parity is measured against the TextBlob backend: raw polarity (exact matches,
+mean/max absolute difference) and the label SentimentAnalyzer assigns.
+
+Usage: python benchmarks/bench_sentiment_backends.py [--corpus PATH] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from models.sentiment_backends import SENTIMENT_BACKENDS, get_sentiment_backend
+from models.sentiment_model import SentimentAnalyzer
+from nlp.analysis_context import AnalysisContext
+from nlp.keyword_extractor import KeywordExtractor
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sentiment_corpus.txt')
+
+
+def load_corpus(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def parity(messages, extractor, reference='textblob'):
+    ref_backend = get_sentiment_backend(reference)
+    ref_analyzer = SentimentAnalyzer(extractor, ref_backend)
+    ref_polarity = [ref_backend.polarity(AnalysisContext(m, extractor)) for m in messages]
+    ref_labels = [ref_analyzer.analyze(m)['label'] for m in messages]
+
+    report = {}
+    for name in SENTIMENT_BACKENDS:
+        backend = get_sentiment_backend(name)
+        analyzer = SentimentAnalyzer(extractor, backend)
+        diffs = [abs(backend.polarity(AnalysisContext(m, extractor)) - ref)
+                 for m, ref in zip(messages, ref_polarity)]
+        labels = [analyzer.analyze(m)['label'] for m in messages]
+        mismatches = [
+            {"message": m, "label": label, "reference_label": ref_label}
+            for m, label, ref_label in zip(messages, labels, ref_labels) if label != ref_label
+        ]
+        report[name] = {
+            "exact_polarity": round(sum(d < 1e-9 for d in diffs) / len(messages), 4),
+            "polarity_mae": round(sum(diffs) / len(messages), 4),
+            "polarity_max_abs_diff": round(max(diffs), 4),
+            "label_agreement": round(1 - len(mismatches) / len(messages), 4),
+            "label_mismatches": mismatches
+        }
+    return report
+
+
+def throughput(messages, extractor, repeat):
+    """
+    Polarity scoring only, with a fresh AnalysisContext per message (as per request).
+    """
+    results = {}
+    for name in SENTIMENT_BACKENDS:
+        backend = get_sentiment_backend(name)
+        backend.polarity(AnalysisContext(messages[0], extractor))  # warm up lazy imports/data
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for message in messages:
+                backend.polarity(AnalysisContext(message, extractor))
+        elapsed = time.perf_counter() - start
+
+        count = repeat * len(messages)
+        results[name] = {
+            "us_per_msg": round(elapsed / count * 1e6, 2),
+            "msgs_per_sec": round(count / elapsed)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    messages = load_corpus(args.corpus)
+    extractor = KeywordExtractor()
+    results = {
+        "corpus_size": len(messages),
+        "parity_vs_textblob": parity(messages, extractor),
+        "throughput": throughput(messages, extractor, args.repeat)
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Corpus: {len(messages)} messages\n")
+    print(f"{'backend':>10} {'exact':>7} {'MAE':>7} {'max diff':>9} {'labels':>7} {'us/msg':>9} {'msgs/s':>9}")
+    for name, p in results["parity_vs_textblob"].items():
+        t = results["throughput"][name]
+        print(f"{name:>10} {p['exact_polarity']:>7.1%} {p['polarity_mae']:>7} {p['polarity_max_abs_diff']:>9} "
+              f"{p['label_agreement']:>7.1%} {t['us_per_msg']:>9} {t['msgs_per_sec']:>9}")
+
+    for name, p in results["parity_vs_textblob"].items():
+        for m in p["label_mismatches"]:
+            print(f"\n[{name}] {m['message']!r}: {m['label']} (textblob: {m['reference_label']})", end='')
+    print()
+
+
+if __name__ == '__main__':
+    main()
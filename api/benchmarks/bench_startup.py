@@ -0,0 +1,82 @@
+"""
+Cold-start benchmark: measures, in fresh interpreter processes, how long
+`import index` takes, how long loading the lexicon takes (from the prebuilt
+artifact or compiled from lexicon.json) and how long the first /api/health
+and first /api/analyze requests take after that.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+API_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+PROBE = r'''
+import json, logging, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+import index
+t1 = time.perf_counter()
+client = index.app.test_client()
+client.get('/api/health')
+t2 = time.perf_counter()
+from nlp.lexicon_registry import get_lexicon
+get_lexicon()
+t3 = time.perf_counter()
+client.post('/api/analyze', json={"message": "I feel anxious about my exams"})
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_health_ms": (t2 - t1) * 1000,
+    "lexicon_load_ms": (t3 - t2) * 1000,
+    "first_analyze_ms": (t4 - t3) * 1000,
+}))
+'''
+
+CONFIGS = {
+    "artifact": {"LEXICON_ARTIFACT": "1"},
+    "json_compile": {"LEXICON_ARTIFACT": "0"},
+}
+
+
+def run_probe(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE, API_DIR],
+        env=env, capture_output=True, text=True, check=True, cwd=API_DIR
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, env in CONFIGS.items():
+        samples = [run_probe(env) for _ in range(args.runs)]
+        results[name] = {
+            key: round(statistics.median(s[key] for s in samples), 2)
+            for key in ("import_ms", "first_health_ms", "lexicon_load_ms", "first_analyze_ms")
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'config':<14} {'import ms':>10} {'1st health ms':>14} {'lexicon ms':>11} {'1st analyze ms':>15}"
+          f"   (median of {args.runs})")
+    for name, r in results.items():
+        print(f"{name:<14} {r['import_ms']:>10} {r['first_health_ms']:>14} {r['lexicon_load_ms']:>11} "
+              f"{r['first_analyze_ms']:>15}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Message corpora for the pipeline benchmarks.
+
+- The golden corpus (fixtures/golden_corpus.jsonl) is a set of hand-written
+  messages in four shapes (short, long, multi_paragraph, keyword_dense),
+  each labelled by hand with the state and sentiment label a reader would
+  give it. Labels are never copied from pipeline output; the pipeline's
+  accuracy against them is what bench_pipeline.py reports.
+- synthetic_corpus() deterministically generates any number of messages of
+  the same shapes from lexicon terms and neutral filler, for load.
+"""
+import json
+import os
+import random
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.normpath(os.path.join(BENCH_DIR, '..'))
+GOLDEN_PATH = os.path.join(BENCH_DIR, 'fixtures', 'golden_corpus.jsonl')
+
+SHAPES = ('short', 'long', 'multi_paragraph', 'keyword_dense')
+
+FILLER = [
+    "I went to class this morning and then had lunch with my cousin.",
+    "The bus was late again so I walked part of the way.",
+    "We talked about the weekend plans for a while.",
+    "My phone battery died halfway through the afternoon.",
+    "There is a group project due at the end of the month.",
+    "Dinner was pasta and we watched an old movie afterwards.",
+    "I cleaned my room and sorted out some clothes.",
+    "The weather changed twice today, sunny and then rainy.",
+]
+
+TEMPLATES = [
+    "I feel {0}.",
+    "Lately I've been {0} and {1}.",
+    "Honestly it's been {0}, kind of {1}, and I keep thinking about {2}.",
+    "Today was {0}.",
+]
+
+
+def load_golden(path=GOLDEN_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _lexicon_terms():
+    with open(os.path.join(API_DIR, 'data', 'lexicon.json'), 'r') as f:
+        return {category: [t for t in terms if not any(ch.isdigit() for ch in t)]
+                for category, terms in json.load(f).items()}
+
+
+def synthetic_corpus(size, seed=7, include_critical=False):
+    """
+    Returns [{"shape", "message"}] cycling through SHAPES. Critical terms are
+    left out by default so load runs don't trigger SOS dispatches.
+    """
+    rng = random.Random(seed)
+    terms = _lexicon_terms()
+    categories = [c for c in terms if include_critical or c != "Critical Distress"]
+
+    def sentence(category):
+        words = rng.sample(terms[category], 3)
+        return rng.choice(TEMPLATES).format(*words)
+
+    corpus = []
+    for i in range(size):
+        shape = SHAPES[i % len(SHAPES)]
+        category = rng.choice(categories)
+        if shape == 'short':
+            message = rng.choice(terms[category])
+        elif shape == 'long':
+            parts = rng.sample(FILLER, 4) + [sentence(category) for _ in range(3)]
+            rng.shuffle(parts)
+            message = " ".join(parts)
+        elif shape == 'multi_paragraph':
+            message = "\n\n".join(
+                " ".join(rng.sample(FILLER, 2) + [sentence(rng.choice(categories))])
+                for _ in range(rng.randint(3, 5))
+            )
+        else:
+            message = ", ".join(rng.sample(terms[category], 12))
+        corpus.append({"shape": shape, "message": message})
+    return corpus
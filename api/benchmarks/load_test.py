@@ -0,0 +1,164 @@
+"""
+Load test for the serving modes: starts a local server per mode, fires
+concurrent /api/analyze requests and reports p50/p99 latency and requests/sec.
+
+Modes: dev (Flask's built-in server, as `python index.py`), wsgi (gunicorn
+gthread workers, preloaded) and async (gunicorn + uvicorn workers, analysis on
+an executor). The result cache is disabled in spawned servers unless --cache,
+and rate limiting is off (every request comes from one client).
+
+Usage: python benchmarks/load_test.py [--modes dev wsgi async] [--requests 2000]
+       [--concurrency 32] [--workers 4] [--threads 4] [--cache] [--json]
+       python benchmarks/load_test.py --url http://localhost:5000   (existing instance)
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+API_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+CORPUS_PATH = os.path.join(API_DIR, 'benchmarks', 'fixtures', 'sentiment_corpus.txt')
+
+DEV_SERVER = "import index; index.app.run(host='127.0.0.1', port={port}, debug=False, use_reloader=False)"
+
+
+def load_messages():
+    with open(CORPUS_PATH, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def start_server(mode, port, workers, threads, cache):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers), SERVER_THREADS=str(threads),
+               RATE_LIMIT="0", LOAD_SHEDDING="0")
+    if not cache:
+        env["ANALYSIS_CACHE_SIZE"] = "0"
+
+    if mode == 'dev':
+        cmd = [sys.executable, '-c', DEV_SERVER.format(port=port)]
+    elif mode == 'wsgi':
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    elif mode == 'async':
+        env["SERVER_MODE"] = "async"
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'asgi:app']
+    else:
+        raise ValueError(f"Unknown mode '{mode}'")
+
+    return subprocess.Popen(cmd, cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_healthy(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become healthy")
+
+
+def run_load(host, port, messages, total, concurrency):
+    """
+    `concurrency` clients, each on a keep-alive connection, share `total` requests.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def client():
+        nonlocal errors
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local = []
+        local_errors = 0
+        for i in counter:
+            body = json.dumps({"message": messages[i % len(messages)], "mode": "user"})
+            start = time.perf_counter()
+            try:
+                conn.request('POST', '/api/analyze', body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    local_errors += 1
+            except OSError:
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            local.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['dev', 'wsgi', 'async'])
+    parser.add_argument('--url', help="Test an already running instance instead of spawning servers")
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--cache', action='store_true', help="Keep the analysis result cache enabled")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSON")
+    args = parser.parse_args()
+
+    messages = load_messages()
+    results = {}
+
+    if args.url:
+        target = urllib.parse.urlparse(args.url)
+        host, port = target.hostname, target.port or 80
+        wait_healthy(host, port)
+        run_load(host, port, messages, min(100, args.requests), args.concurrency)  # warm-up
+        results['external'] = run_load(host, port, messages, args.requests, args.concurrency)
+    else:
+        for mode in args.modes:
+            server = start_server(mode, args.port, args.workers, args.threads, args.cache)
+            try:
+                wait_healthy('127.0.0.1', args.port)
+                run_load('127.0.0.1', args.port, messages, min(100, args.requests), args.concurrency)
+                results[mode] = run_load('127.0.0.1', args.port, messages, args.requests, args.concurrency)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}"
+          + ("" if args.url else f", {args.workers} workers x {args.threads} threads"))
+    print(f"{'mode':>10} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode, r in results.items():
+        print(f"{mode:>10} {r['rps']:>9} {r['p50_ms']:>9} {r['p99_ms']:>9} {r['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
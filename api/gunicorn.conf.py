@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for self-hosted production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app                      # threaded WSGI workers
+    SERVER_MODE=async gunicorn -c gunicorn.conf.py asgi:app    # uvicorn workers + executor
+
+Environment: PORT (5000), WEB_CONCURRENCY (worker processes, default CPU count),
+SERVER_THREADS (threads per worker; executor size in async mode), SERVER_MODE
+(wsgi | async), SERVER_TIMEOUT (seconds, 30).
+"""
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.constants import DEFAULT_SERVER_THREADS
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.getenv("SERVER_THREADS", DEFAULT_SERVER_THREADS))
+timeout = int(os.getenv("SERVER_TIMEOUT", "30"))
+
+# Import the app (and preload models) once in the master, then fork workers
+preload_app = True
+
+if os.getenv("SERVER_MODE", "wsgi") == "async":
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    worker_class = "gthread"
+
+accesslog = None
+errorlog = "-"
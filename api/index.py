@@ -1,7 +1,11 @@
 import os
-import nltk
 import logging
-from flask import Flask, request, jsonify
+import threading
+import time
+import hmac
+import hashlib
+import math
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 
 import traceback
@@ -16,35 +20,202 @@ current_dir = os.path.dirname(__file__)
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
+from werkzeug.exceptions import HTTPException
+from utils.constants import (
+    MAX_REQUEST_BYTES, MAX_STREAM_LINE_BYTES, COMPRESSION_MIN_BYTES, HISTORY_SERIES_POINTS, HISTORY_MAX_POINTS,
+    MAX_USER_ID_LENGTH, PRIORITY_CRISIS, PRIORITY_ROUTINE, SERVING_MODES,
+    RATE_LIMIT_IP_RATE, RATE_LIMIT_IP_BURST, RATE_LIMIT_SESSION_RATE, RATE_LIMIT_SESSION_BURST
+)
+from utils.compression import compress_response
+from utils.json_provider import FastJSONProvider
+from utils.validation import ANALYZE_SCHEMA, BATCH_SCHEMA, SOS_TRIGGER_SCHEMA, validate
+from utils.metrics import REGISTRY, ERRORS, HTTP_REQUESTS, HTTP_LATENCY, RATE_LIMITED, COALESCED
+from utils.profiler import get_profiler
+from utils.payload import encode_response
+from utils.rate_limit import get_rate_limiter
+from utils.single_flight import SingleFlight
+from utils.auth import AuthError, FirebaseVerifier
+
 # Add local nltk_data path for Vercel deployment
+# (nltk itself is imported lazily; it reads NLTK_DATA when first imported)
 nltk_data_path = os.path.join(current_dir, 'nltk_data')
 if os.path.exists(nltk_data_path):
     os.environ['NLTK_DATA'] = nltk_data_path # Explicitly set for NLTK
-    if nltk_data_path not in nltk.data.path:
-        nltk.data.path.append(nltk_data_path)
     logger.info(f"NLTK data path added: {nltk_data_path}")
 else:
     logger.warning(f"NLTK data path not found: {nltk_data_path}")
 
 app = Flask(__name__)
 CORS(app)
+# Fast JSON codec (orjson when installed) for jsonify and request parsing
+app.json = FastJSONProvider(app)
+# Larger bodies are rejected with 413 before they are read
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("MAX_REQUEST_BYTES", MAX_REQUEST_BYTES))
+_compression_enabled = os.getenv("COMPRESSION", "1") != "0"
+_compression_min_bytes = int(os.getenv("COMPRESSION_MIN_BYTES", COMPRESSION_MIN_BYTES))
+# Token buckets per client IP and per session (opt-in with RATE_LIMIT=1)
+_rate_limiter = get_rate_limiter() if os.getenv("RATE_LIMIT", "0") == "1" else None
+_ip_limit = (float(os.getenv("RATE_LIMIT_IP_RATE", RATE_LIMIT_IP_RATE)),
+             float(os.getenv("RATE_LIMIT_IP_BURST", RATE_LIMIT_IP_BURST)))
+_session_limit = (float(os.getenv("RATE_LIMIT_SESSION_RATE", RATE_LIMIT_SESSION_RATE)),
+                  float(os.getenv("RATE_LIMIT_SESSION_BURST", RATE_LIMIT_SESSION_BURST)))
+_trust_proxy = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+# Identical requests in flight at the same time share one execution
+_flights = SingleFlight()
+# Firebase ID tokens gate everything tied to a user_id (long-term history)
+_verifier = FirebaseVerifier()
 
-# Initialize services with error handling for easier debugging
+# Services are built on first use, so a cold start (or /api/health) doesn't pay
+# for them. Initialization errors are kept for easier debugging.
 init_error = None
-try:
-    from services.analysis_service import AnalysisService
-    from services.sos_service import SOSService
-    analysis_service = AnalysisService()
-    sos_service = SOSService()
-    logger.info("Services initialized successfully")
-except Exception as e:
-    init_error = traceback.format_exc()
-    logger.error(f"Error initializing services: {init_error}")
-    analysis_service = None
-    sos_service = None
+_services = None
+_services_lock = threading.Lock()
+
+def get_services():
+    """
+    Returns (analysis_service, sos_service), initializing them once.
+    Both are None if initialization failed.
+    """
+    global _services, init_error
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                try:
+                    from services.analysis_service import AnalysisService
+                    from services.sos_service import SOSService
+                    _services = (AnalysisService(), SOSService())
+                    logger.info("Services initialized successfully")
+                except Exception:
+                    init_error = traceback.format_exc()
+                    logger.exception("Error initializing services")
+                    _services = (None, None)
+    return _services
+
+def _service_metrics():
+    """
+    Scrape-time metrics read from the services (result cache statistics,
+    lexicon version in service, coalescable requests in flight, analysis
+    slots in use and requests waiting for one, serving mode under load).
+    """
+    if not _services or not _services[0]:
+        return []
+    stats = _services[0].cache_stats()
+    lexicon_version = _services[0].keyword_extractor.lexicon_version
+    gate = _services[0].gate.stats() if _services[0].gate else None
+    gate_metrics = [
+        ("kiddo_analysis_slots_active", "gauge", "Analyses holding a concurrency slot.", [({}, gate["active"])]),
+        ("kiddo_analysis_queue_depth", "gauge", "Analyses waiting for a slot, by priority (0 = crisis).",
+         [({"priority": p}, gate["waiting"].get(p, 0)) for p in (PRIORITY_CRISIS, PRIORITY_ROUTINE)])
+    ] if gate else []
+    overload = _services[0].overload.stats() if _services[0].overload else None
+    overload_metrics = [
+        ("kiddo_serving_mode", "gauge", "Serving mode in use (1) under the overload controller.",
+         [({"mode": mode}, int(mode == overload["mode"])) for mode in SERVING_MODES]),
+        ("kiddo_overload_pressure", "gauge", "Load relative to the shedding thresholds (1.0 = step down).",
+         [({}, overload["pressure"])])
+    ] if overload else []
+    return gate_metrics + overload_metrics + [
+        ("kiddo_lexicon_info", "gauge", "Lexicon version in service.", [({"version": lexicon_version}, 1)]),
+        ("kiddo_cache_hits_total", "counter", "Analysis result cache hits.", [({}, stats["hits"])]),
+        ("kiddo_cache_misses_total", "counter", "Analysis result cache misses.", [({}, stats["misses"])]),
+        ("kiddo_cache_evictions_total", "counter", "Analysis result cache LRU evictions.", [({}, stats["evictions"])]),
+        ("kiddo_cache_expirations_total", "counter", "Analysis result cache TTL expirations.", [({}, stats["expirations"])]),
+        ("kiddo_cache_entries", "gauge", "Analysis result cache size.", [({}, stats["size"])]),
+        ("kiddo_single_flight_in_flight", "gauge", "Distinct coalescable requests executing.",
+         [({}, _flights.stats()["in_flight"])])
+    ]
+
+REGISTRY.register_collector(_service_metrics)
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+    profiler = get_profiler()
+    if profiler:
+        profiler.ensure_started()
+    # Lexicon file watcher, started per worker once services exist
+    if _services and _services[0]:
+        _services[0].keyword_extractor.registry.ensure_watching()
+
+@app.after_request
+def _record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    start = g.get('request_start')
+    if start is not None:
+        HTTP_LATENCY.observe(time.perf_counter() - start, route=route)
+    return response
+
+@app.after_request
+def _compress(response):
+    if not _compression_enabled:
+        return response
+    return compress_response(response, request.accept_encodings, _compression_min_bytes)
+
+@app.errorhandler(HTTPException)
+def _http_error(e):
+    """
+    HTTP errors (413 body too large, 404, 405, ...) as JSON like every other API error.
+    """
+    return jsonify({"error": e.description}), e.code
+
+def _client_ip():
+    # Behind a trusted proxy the first X-Forwarded-For hop is the client
+    if _trust_proxy and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or "unknown"
+
+def _rate_limit(session_id=None):
+    """
+    Takes a token from the client IP bucket (and the session's, if any).
+    Returns None if allowed, otherwise a (body, status, headers) 429 reply.
+    """
+    if _rate_limiter is None:
+        return None
+    limits = [(f"ip:{_client_ip()}", *_ip_limit)]
+    if session_id:
+        limits.append((f"session:{session_id}", *_session_limit))
+    retry_after = _rate_limiter.take(limits)
+    if not retry_after:
+        return None
+    RATE_LIMITED.inc(route=request.url_rule.rule)
+    body = app.json.dumps({"error": "Too many requests, please slow down", "retry_after": round(retry_after, 2)})
+    return body, 429, {"Retry-After": str(math.ceil(retry_after))}
+
+def _coalesced(scope, handler):
+    """
+    Runs handler() -> (body, status, headers) once for identical concurrent
+    requests (same route, client scope and raw body): a double-submit or retry
+    while the first is still running gets the first one's response instead of
+    running the pipeline (and any SOS dispatch) again. Only the executing
+    request is charged by the rate limiter.
+    """
+    key = (request.url_rule.rule, scope, hashlib.blake2b(request.get_data(), digest_size=16).digest())
+    (body, status, headers), shared = _flights.do(key, handler)
+    response = Response(body, status=status, headers=headers, mimetype='application/json')
+    if shared:
+        COALESCED.inc(route=request.url_rule.rule)
+        response.headers['X-Coalesced'] = '1'
+    return response
+
+def _record_history(analysis_service, user_id, authorization, result):
+    """
+    Records the analysis for user_id if the request carries an ID token for
+    that user. Runs once the response has been sent (see analyze), so token
+    verification (a key fetch on first use) never delays it or its SOS; an
+    unverified user_id is only not recorded, since the analysis must never
+    fail over history.
+    """
+    try:
+        _verifier.verify_user(authorization, user_id)
+    except AuthError as e:
+        logger.warning(f"Not recording history for an unverified user_id: {e}")
+        return
+    analysis_service.record_history(user_id, result)
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
+    analysis_service, _ = get_services()
     if not analysis_service:
         return jsonify({
             "error": "Backend services failed to initialize.",
@@ -55,44 +226,287 @@ def analyze():
     """
     Main endpoint for mental health text analysis.
     """
-    data = request.get_json()
-    
-    if not data or 'message' not in data:
-        return jsonify({"error": "Missing 'message' field in request body"}), 400
+    data = request.get_json(silent=True)
+    error = validate(data, ANALYZE_SCHEMA)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
         
     message = data['message']
     mode = data.get('mode', 'user')
-    history = data.get('history', [])
-    
-    if not isinstance(message, str) or not message.strip():
-        return jsonify({"error": "Message must be a non-empty string"}), 400
-        
+    history = data.get('history') or []
+    emergency_contacts = data.get('emergency_contacts')
+    # Optional: with a session ID the server keeps the trend history itself
+    session_id = data.get('session_id')
+    # Optional: with a user ID the analysis is added to the user's long-term history
+    user_id = data.get('user_id')
+    authorization = request.headers.get('Authorization')
+    # History is off by default; then the token isn't checked at all
+    record = user_id and analysis_service.history_store is not None
+    recorded = []
+
+    def run():
+        # Crisis messages (tier 1 pre-screen) are never rate limited
+        crisis = analysis_service.screen_crisis(message)
+        limited = None if crisis else _rate_limit(session_id)
+        if limited:
+            return limited
+        try:
+            result = analysis_service.perform_full_analysis(message, mode, history, emergency_contacts, session_id,
+                                                            data.get('segmented'), crisis)
+            if record:
+                recorded.append(result)
+            # Static fragments (agent response, precautions) are spliced in pre-encoded
+            return encode_response(result), 200, {"X-Serving-Mode": result['serving_mode']}
+        except Exception as e:
+            ERRORS.inc(source='analyze')
+            return app.json.dumps({"error": str(e)}), 500, None
+
+    response = _coalesced(session_id or _client_ip(), run)
+    if recorded:
+        response.call_on_close(lambda: _record_history(analysis_service, user_id, authorization, recorded[0]))
+    return response
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({
+            "error": "Backend services failed to initialize.",
+            "details": init_error
+        }), 500
+    """
+    Batch endpoint: analyzes a list of messages, returning one result per message.
+    """
+    data = request.get_json(silent=True)
+    error = validate(data, BATCH_SCHEMA)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+
+    messages = data['messages']
+    mode = data.get('mode', 'user')
+
     try:
-        result = analysis_service.perform_full_analysis(message, mode, history)
-        return jsonify(result), 200
+        results = analysis_service.perform_batch_analysis(messages, mode, data.get('segmented'))
+        errors = sum(1 for item in results if 'error' in item)
+        return jsonify({"results": results, "count": len(results), "errors": errors, "mode": mode}), 200
     except Exception as e:
+        ERRORS.inc(source='batch')
         return jsonify({"error": str(e)}), 500
 
+def _stream_lines(stream, ndjson):
+    """
+    Yields one message per non-empty body line without buffering the body.
+    NDJSON lines may be {"message": ...} objects or JSON strings; a bad line
+    is yielded as a ValueError so it is reported in place.
+    """
+    while True:
+        line = stream.readline(MAX_STREAM_LINE_BYTES + 1)
+        if not line:
+            return
+        if len(line) > MAX_STREAM_LINE_BYTES:
+            # Skip the rest of an over-long line
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(MAX_STREAM_LINE_BYTES)
+            yield ValueError(f"Line exceeds {MAX_STREAM_LINE_BYTES} bytes")
+            continue
+
+        text = line.decode('utf-8', errors='replace').strip()
+        if not text:
+            continue
+        if not ndjson:
+            yield text
+            continue
+        try:
+            item = app.json.loads(text)
+            message = item.get('message') if isinstance(item, dict) else item
+        except ValueError:
+            message = None
+        if not isinstance(message, str) or not message.strip():
+            yield ValueError("Each line must be a JSON string or an object with a non-empty 'message'")
+        else:
+            yield message
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({
+            "error": "Backend services failed to initialize.",
+            "details": init_error
+        }), 500
+    """
+    Streaming endpoint: newline-delimited messages in (text/plain, or
+    application/x-ndjson objects with a 'message' field), one analysis result
+    out per message as soon as it is ready, as NDJSON or Server-Sent Events.
+    Query parameters: mode, format (ndjson | sse), window (states the trend
+    and window_severity cover), alpha.
+    """
+    mode = request.args.get('mode', 'user')
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in ('ndjson', 'sse'):
+        return jsonify({"error": "format must be 'ndjson' or 'sse'"}), 400
+    try:
+        window = request.args.get('window', type=int)
+        alpha = request.args.get('alpha', type=float)
+        if (window is not None and window < 2) or (alpha is not None and not 0 < alpha <= 1):
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "window must be an integer >= 2 and alpha in (0, 1]"}), 400
+
+    # The body is read line by line (each line bounded), so the JSON body limit doesn't apply
+    # (None would fall back to MAX_CONTENT_LENGTH)
+    request.max_content_length = sys.maxsize
+    ndjson = request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json')
+    messages = _stream_lines(request.stream, ndjson)
+
+    def generate():
+        count = 0
+        for result in analysis_service.analyze_stream(messages, mode, window, alpha):
+            count += 1
+            payload = encode_response(result)
+            yield f"event: analysis\ndata: {payload}\n\n" if output_format == 'sse' else f"{payload}\n"
+        if output_format == 'sse':
+            yield f"event: end\ndata: {app.json.dumps({'count': count})}\n\n"
+
+    mimetype = 'text/event-stream' if output_format == 'sse' else 'application/x-ndjson'
+    # Disable proxy buffering so each result is delivered as soon as it is ready
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route('/api/sos/trigger', methods=['POST'])
 def trigger_sos():
+    _, sos_service = get_services()
     if not sos_service:
         return jsonify({"error": "SOS service failed to initialize. Check logs."}), 500
     """
     Manual SOS trigger endpoint.
     """
+    data = request.get_json(silent=True) or {}
+    error = validate(data, SOS_TRIGGER_SCHEMA)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+
+    emergency_contacts = data.get('emergency_contacts') or []
+
+    def run():
+        limited = _rate_limit()
+        if limited:
+            return limited
+        try:
+            return app.json.dumps(sos_service.trigger_sos(emergency_contacts)), 200, None
+        except Exception as e:
+            ERRORS.inc(source='sos_trigger')
+            return app.json.dumps({"error": str(e)}), 500, None
+
+    return _coalesced(_client_ip(), run)
+
+@app.route('/api/sos/status/<dispatch_id>', methods=['GET'])
+def sos_status(dispatch_id):
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({"error": "Backend services failed to initialize."}), 500
+    """
+    Per-contact delivery status for a dispatch started by /api/analyze.
+    """
+    status = analysis_service.sos_dispatcher.get_status(dispatch_id)
+    if status is None:
+        return jsonify({"error": "Unknown dispatch ID"}), 404
+    return jsonify(status), 200
+
+@app.route('/api/history/<user_id>/series', methods=['GET'])
+def history_series(user_id):
+    """
+    Downsampled history for dashboard charts: per-bucket analysis count,
+    intensity mean and max, sentiment mean, SOS count and state counts.
+    Query parameters: start, end (epoch seconds; default the last 30 days)
+    and points (chart resolution, the most buckets returned). Requires a
+    Firebase ID token for the same user.
+    """
     try:
-        data = request.get_json() or {}
-        emergency_contacts = data.get('emergency_contacts', [])
-        
-        result = sos_service.trigger_sos(emergency_contacts)
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        _verifier.verify_user(request.headers.get('Authorization'), user_id)
+    except AuthError as e:
+        return jsonify({"error": str(e)}), e.status
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({"error": "Backend services failed to initialize."}), 500
+    if analysis_service.history_store is None:
+        return jsonify({"error": "History is not enabled on this server (HISTORY_STORE)"}), 404
+    if len(user_id) > MAX_USER_ID_LENGTH:
+        return jsonify({"error": f"user_id exceeds the maximum length of {MAX_USER_ID_LENGTH}"}), 400
+    try:
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        points = request.args.get('points', HISTORY_SERIES_POINTS, type=int)
+        if not 1 <= points <= HISTORY_MAX_POINTS:
+            raise ValueError(f"points must be between 1 and {HISTORY_MAX_POINTS}")
+        series = analysis_service.history_store.series(user_id, start, end, points)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(series), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({"error": "Backend services failed to initialize."}), 500
+    return jsonify(analysis_service.cache_stats()), 200
+
+@app.route('/api/lexicon', methods=['GET'])
+def lexicon_status():
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({"error": "Backend services failed to initialize."}), 500
+    return jsonify(analysis_service.keyword_extractor.registry.status()), 200
+
+@app.route('/api/lexicon/reload', methods=['POST'])
+def lexicon_reload():
+    """
+    Recompiles lexicon.json in the background and swaps it in without
+    blocking in-flight requests (?wait=1 returns once it is in service).
+    Reloads the worker that serves the call only; under a multi-worker server
+    rely on the file watcher (LEXICON_WATCH_INTERVAL), which runs in every
+    worker. Requires the X-Reload-Token header if LEXICON_RELOAD_TOKEN is set.
+    """
+    token = os.getenv("LEXICON_RELOAD_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get('X-Reload-Token', ''), token):
+        return jsonify({"error": "Invalid reload token"}), 403
+
+    analysis_service, _ = get_services()
+    if not analysis_service:
+        return jsonify({"error": "Backend services failed to initialize."}), 500
+
+    result = analysis_service.keyword_extractor.registry.reload(wait=request.args.get('wait') == '1')
+    if result["status"] == "failed":
+        return jsonify(result), 422
+    return jsonify(result), 202 if result["status"] in ("started", "in_progress") else 200
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus text-format metrics for this process.
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/profile', methods=['GET'])
+def profile():
+    """
+    Sampled hot-path stacks in folded format (flamegraph input).
+    Only available with SAMPLING_PROFILER=1; ?reset=1 starts a new window.
+    """
+    profiler = get_profiler()
+    if profiler is None:
+        return jsonify({"error": "Sampling profiler is disabled (set SAMPLING_PROFILER=1)"}), 404
+    body = profiler.folded()
+    headers = {"X-Profile-Samples": str(profiler.samples), "X-Profile-Dropped": str(profiler.dropped)}
+    if request.args.get('reset') == '1':
+        profiler.reset()
+    return Response(body, mimetype='text/plain', headers=headers)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
 if __name__ == '__main__':
+    # Development server only; self-hosted production uses wsgi.py / asgi.py (see gunicorn.conf.py)
     # Using 0.0.0.0 to make it accessible outside container if needed
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import re
+import threading
+from utils.constants import DEFAULT_SENTIMENT_BACKEND
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SENTIMENT_TABLE_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'sentiment_table.json')
+)
+
+class SentimentBackend:
+    """
+    Produces a raw polarity in [-1.0, 1.0] for a message.
+    SentimentAnalyzer applies the keyword overrides and labels on top.
+    """
+    name = None
+
+    def polarity(self, context):
+        raise NotImplementedError
+
+class TextBlobSentimentBackend(SentimentBackend):
+    """
+    TextBlob's pattern analyzer (the original scorer).
+    """
+    name = 'textblob'
+
+    def polarity(self, context):
+        return context.blob.sentiment.polarity
+
+class LexiconSentimentBackend(SentimentBackend):
+    """
+    Precomputed polarity table scored in a single pass over the tokens.
+
+    Follows the pattern analyzer TextBlob uses: known words are averaged,
+    an adverb ("very") scales the next word by its intensity, a negation
+    ("not", "never", "n't") flips and halves it, "!" boosts the previous
+    word and emoticons count as words. Unlike TextBlob's tokenizer, "n't"
+    contractions ("don't like") are treated as negations.
+    """
+    name = 'lexicon'
+
+    def __init__(self, table_path=DEFAULT_SENTIMENT_TABLE_PATH):
+        with open(table_path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+
+        # word -> (polarity, intensity, is_modifier)
+        self.words = {w: (p, i, bool(m)) for w, (p, i, m) in table["words"].items()}
+        self.emoticons = table["emoticons"]
+        self.negations = frozenset(table["negations"])
+
+        faces = "|".join(re.escape(face) for face in sorted(self.emoticons, key=len, reverse=True))
+        self._token_re = re.compile(
+            rf"(?<!\S)(?:{faces})(?!\S)|\(!\)|n't|[^\W_]+(?=n't)|[^\W_]+(?:-[^\W_]+)*|!"
+        )
+        logger.info(f"Loaded sentiment table: {len(self.words)} words")
+
+    def tokenize(self, text):
+        return self._token_re.findall(text.lower().replace('’', "'"))
+
+    def polarity(self, context):
+        with context.timed('polarity'):
+            return self.score(context.lower_text)
+
+    def score(self, text):
+        words, emoticons, negations = self.words, self.emoticons, self.negations
+        assessments = []  # [polarity, intensity, negated]
+        modifier = None
+        negation = None
+
+        for token in self.tokenize(text):
+            entry = words.get(token)
+            if entry is not None:
+                p, i, is_modifier = entry
+                # Known word, alone ("good") or scaled by a preceding modifier ("very good")
+                if modifier is None:
+                    assessments.append([p, i, False])
+                else:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(p * last[1], 1.0))
+                    last[1] = i
+                # Preceded by a negation ("not very good")
+                if negation is not None:
+                    last = assessments[-1]
+                    last[1] = 1.0 / last[1]
+                    last[2] = True
+                modifier = token if is_modifier else None
+                negation = token if token in negations else None
+                continue
+
+            # Unknown word: a negation, or a word that ends one (small words don't: "not a good")
+            if token in negations:
+                negation = token
+            elif negation and len(token.strip("'")) > 1:
+                negation = None
+
+            # Negation after an -ly modifier ("really not good")
+            if negation is not None and modifier is not None and modifier.endswith('ly'):
+                assessments[-1][2] = True
+                negation = None
+            elif modifier and len(token) > 2:
+                modifier = None
+
+            if token == '!':
+                if assessments:
+                    assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+            elif token == '(!)':
+                assessments.append([0.0, 1.0, False])
+            elif token in emoticons:
+                assessments.append([emoticons[token], 1.0, False])
+
+        if not assessments:
+            return 0.0
+        # "not good" = slightly bad, "not bad" = slightly good
+        return sum(p * -0.5 if negated else p for p, _, negated in assessments) / len(assessments)
+
+SENTIMENT_BACKENDS = {
+    LexiconSentimentBackend.name: LexiconSentimentBackend,
+    TextBlobSentimentBackend.name: TextBlobSentimentBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_sentiment_backend(name=None):
+    """
+    Process-wide backend instance by name (default: SENTIMENT_BACKEND env var).
+    """
+    name = (name or os.getenv("SENTIMENT_BACKEND", DEFAULT_SENTIMENT_BACKEND)).lower()
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}' (available: {', '.join(SENTIMENT_BACKENDS)})")
+
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = SENTIMENT_BACKENDS[name]()
+                _backends[name] = backend
+    return backend
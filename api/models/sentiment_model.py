@@ -1,22 +1,29 @@
-from textblob import TextBlob
-import os
-import json
+from models.sentiment_backends import get_sentiment_backend
+from nlp.analysis_context import AnalysisContext
+from nlp.keyword_extractor import KeywordExtractor
+from utils.constants import CRITICAL, DEPRESSION
 
 class SentimentAnalyzer:
-    def __init__(self):
-        # Load critical lexicon for sentiment overrides
-        lex_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'lexicon.json')
-        with open(lex_path, 'r') as f:
-            lex = json.load(f)
-            self.critical_phrases = lex.get("Critical Distress", [])
-            self.depression_phrases = lex.get("Depression", [])
+    def __init__(self, keyword_extractor=None, backend=None):
+        # Critical/Depression phrase overrides come from the shared lexicon matches
+        self.keyword_extractor = keyword_extractor or KeywordExtractor()
+        # Polarity scorer: a SentimentBackend or its name ("lexicon", "textblob")
+        if backend is None or isinstance(backend, str):
+            backend = get_sentiment_backend(backend)
+        self.backend = backend
 
     def analyze(self, text):
         """
         Calculates sentiment with a critical phrase and keyword override.
+        Accepts a raw message or an AnalysisContext.
         """
-        lower_text = text.lower()
-        
+        context = AnalysisContext.of(text, self.keyword_extractor)
+        with context.timed('sentiment'):
+            return self._analyze(context)
+
+    def _analyze(self, context):
+        lower_text = context.lower_text
+
         # 1. Broad Critical Keyword Sweep (Highest Priority)
         # Even if the phrase isn't exact, these words in any non-positive context are critical
         danger_words = ['suicide', 'kill myself', 'killing myself', 'end my life', 'want to die', 'going to die', 'end it all']
@@ -26,29 +33,45 @@ class SentimentAnalyzer:
         # Standalone 'die' or 'kill' check
         if ' die ' in f' {lower_text} ' or ' kill ' in f' {lower_text} ':
              return {"score": -1.0, "label": "Critical"}
-            
+
+        category_matches = context.matches["category_matches"]
+
         # 2. Critical Phrase Lexicon Override
-        if any(phrase in lower_text for phrase in self.critical_phrases):
+        if category_matches.get(CRITICAL, 0) > 0:
             return {"score": -1.0, "label": "Critical"}
-            
+
         # 3. Depression/Severe Negative Override
-        if any(phrase in lower_text for phrase in self.depression_phrases):
-            analysis = TextBlob(text)
-            score = min(analysis.sentiment.polarity, -0.6)
+        if category_matches.get(DEPRESSION, 0) > 0:
+            score = min(self.backend.polarity(context), -0.6)
             return {"score": round(score, 2), "label": "Negative"}
 
-        # 3. Standard TextBlob fallback
-        analysis = TextBlob(text)
-        score = analysis.sentiment.polarity
-        
-        if score > 0.1:
-            label = "Positive"
-        elif score < -0.1:
-            label = "Negative"
-        else:
-            label = "Neutral"
-            
+        # 3. Standard polarity fallback
+        score = self.backend.polarity(context)
+
         return {
             "score": round(score, 2),
-            "label": label
+            "label": self.label(score)
         }
+
+    @staticmethod
+    def label(score):
+        if score > 0.1:
+            return "Positive"
+        if score < -0.1:
+            return "Negative"
+        return "Neutral"
+
+    @classmethod
+    def aggregate(cls, sentiments, weights, category_matches):
+        """
+        Sentiment of a segmented message from its sentences' results: the
+        `weights`-weighted mean score, with the same Critical and Depression
+        overrides as a whole message (using its aggregated category matches).
+        """
+        if any(s['label'] == "Critical" for s in sentiments) or category_matches.get(CRITICAL, 0) > 0:
+            return {"score": -1.0, "label": "Critical"}
+        total = sum(weights)
+        score = sum(s['score'] * w for s, w in zip(sentiments, weights)) / total if total else 0.0
+        if category_matches.get(DEPRESSION, 0) > 0:
+            return {"score": round(min(score, -0.6), 2), "label": "Negative"}
+        return {"score": round(score, 2), "label": cls.label(score)}
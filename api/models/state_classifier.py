@@ -1,4 +1,5 @@
-from utils.constants import NORMAL, ANXIETY, STRESS, DEPRESSION, CRITICAL
+from nlp.analysis_context import AnalysisContext
+from utils.constants import NORMAL, ANXIETY, STRESS, DEPRESSION, CRITICAL, ALLOWED_STATES
 
 class StateClassifier:
     def __init__(self, keyword_extractor):
@@ -7,14 +8,17 @@ class StateClassifier:
     def get_detailed_classification(self, text, sentiment_score):
         """
         Returns detailed classification data for explainability.
+        Accepts a raw message or an AnalysisContext.
         """
-        category_matches = self.keyword_extractor.get_category_matches(text)
-        
-        # Determine classified state
-        final_state = self.classify(text, sentiment_score)
-        
-        # Calculate probabilities
-        probabilities = self.get_probabilities(text, sentiment_score)
+        context = AnalysisContext.of(text, self.keyword_extractor)
+        with context.timed('classification'):
+            category_matches = self.keyword_extractor.get_category_matches(context)
+
+            # Determine classified state
+            final_state = self.classify(context, sentiment_score)
+
+            # Calculate probabilities
+            probabilities = self.get_probabilities(context, sentiment_score)
         
         return {
             "classified_state": final_state,
@@ -27,8 +31,16 @@ class StateClassifier:
         Rule-based classification prioritizing Critical Distress, 
         then using keyword counts and sentiment.
         """
-        category_matches = self.keyword_extractor.get_category_matches(text)
-        
+        context = AnalysisContext.of(text, self.keyword_extractor)
+        category_matches = self.keyword_extractor.get_category_matches(context)
+        return self.classify_matches(category_matches, sentiment_score)
+
+    @staticmethod
+    def classify_matches(category_matches, sentiment_score):
+        """
+        The classification rules on precomputed category scores (also used to
+        classify a segmented message from its aggregated sentence scores).
+        """
         # 1. Check for Critical Distress (High Priority)
         if category_matches.get("Critical Distress", 0) > 0:
             return CRITICAL
@@ -56,7 +68,8 @@ class StateClassifier:
         Calculates normalized confidence across all states.
         Sums to exactly 100%.
         """
-        category_matches = self.keyword_extractor.get_category_matches(text)
+        context = AnalysisContext.of(text, self.keyword_extractor)
+        category_matches = self.keyword_extractor.get_category_matches(context)
         
         # Base scores
         scores = {
@@ -107,3 +120,53 @@ class StateClassifier:
                 scores[max_state] += diff
                 
         return scores
+
+    def get_probabilities_batch(self, category_matches_list, sentiment_scores):
+        """
+        Vectorized get_probabilities over a batch of precomputed category matches.
+        Uses the same arithmetic (and round-half-even) as the per-message version,
+        so results are identical item for item.
+        """
+        n = len(category_matches_list)
+        if n == 0:
+            return []
+
+        import numpy as np
+
+        # Column order follows ALLOWED_STATES: Normal, Anxiety, Stress, Depression, Critical
+        counts = np.array([
+            [m.get("Anxiety", 0), m.get("Stress", 0), m.get("Depression", 0), m.get("Critical Distress", 0)]
+            for m in category_matches_list
+        ], dtype=np.float64)
+        sentiment = np.asarray(sentiment_scores, dtype=np.float64)
+
+        # Base scores + keyword adjustment
+        scores = np.tile(np.array([10, 5, 5, 5, 0], dtype=np.float64), (n, 1))
+        multiplier = 10
+        scores[:, 1:4] += counts[:, 0:3] * multiplier
+        scores[:, 4] += counts[:, 3] * 50
+
+        # Sentiment adjustment (mutually exclusive branches, as in get_probabilities)
+        very_negative = sentiment < -0.5
+        negative = ~very_negative & (sentiment < -0.2)
+        positive = ~very_negative & ~negative & (sentiment > 0.2)
+        scores[very_negative, 3] += 20
+        scores[very_negative, 4] += 5
+        scores[negative, 2] += 15
+        scores[negative, 1] += 15
+        scores[positive, 0] += 30
+
+        # Normalization with the rounding remainder fed to the most likely state
+        total = scores.sum(axis=1)
+        safe_total = np.where(total == 0, 1, total)
+        probs = np.rint(scores / safe_total[:, None] * 100)
+        diff = 100 - probs.sum(axis=1)
+        probs[np.arange(n), probs.argmax(axis=1)] += diff
+
+        probs[total == 0] = [100, 0, 0, 0, 0]
+        probs[counts[:, 3] > 0] = [0, 0, 0, 0, 100]
+
+        return [
+            {state: int(value) for state, value in zip(ALLOWED_STATES, row)}
+            for row in probs.tolist()
+        ]
@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager
+from nlp.preprocessing import clean_text
+
+class AnalysisContext:
+    """
+    Per-message state shared by every pipeline stage.
+
+    Built once per message so lowercasing, cleaning, tokenization, lexicon
+    matching and TextBlob parsing each happen at most once per request.
+    Expensive fields are computed lazily on first access. The lexicon
+    version is pinned when the extractor is attached, so a reload mid-request
+    doesn't mix versions within one analysis.
+    """
+
+    def __init__(self, text, keyword_extractor=None, lexicon=None):
+        self.text = text
+        self.timings = {}
+        self._keyword_extractor = keyword_extractor
+        # Pinned here unless given (e.g. sentences share their message's version)
+        if lexicon is None and keyword_extractor is not None:
+            lexicon = keyword_extractor.lexicon
+        self.lexicon = lexicon
+        self._tokens = None
+        self._matches = None
+        self._blob = None
+
+        with self.timed('clean_text'):
+            self.lower_text = text.lower()
+            self.cleaned_text = clean_text(text)
+
+    @classmethod
+    def of(cls, text_or_context, keyword_extractor=None):
+        """
+        Lets stages accept either a raw message or an existing context.
+        """
+        if isinstance(text_or_context, cls):
+            if text_or_context._keyword_extractor is None:
+                text_or_context._keyword_extractor = keyword_extractor
+                text_or_context.lexicon = keyword_extractor.lexicon if keyword_extractor is not None else None
+            return text_or_context
+        return cls(text_or_context, keyword_extractor)
+
+    @contextmanager
+    def timed(self, stage):
+        """
+        Accumulates wall time (ms) spent in a stage. Stages may nest, e.g.
+        'textblob' and 'lexicon_match' are also counted in the stage that
+        first needed them.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def stage_timings(self):
+        return {stage: round(ms, 3) for stage, ms in self.timings.items()}
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = self.cleaned_text.split()
+        return self._tokens
+
+    @property
+    def lexicon_version(self):
+        return self.lexicon.version if self.lexicon is not None else None
+
+    @property
+    def matches(self):
+        """
+        Lexicon hits: {"keywords", "category_matches", "negated_keywords",
+        "fuzzy_corrections", "spans"}.
+        """
+        if self._matches is None:
+            with self.timed('lexicon_match'):
+                self._matches = self._keyword_extractor.match_cleaned(
+                    self.cleaned_text, self.lexicon, raw_text=self.lower_text)
+        return self._matches
+
+    @property
+    def blob(self):
+        """
+        TextBlob for the raw message, with its (cached) sentiment already parsed.
+        """
+        if self._blob is None:
+            with self.timed('textblob'):
+                # Imported on first use to keep cold starts cheap
+                from textblob import TextBlob
+                blob = TextBlob(self.text)
+                blob.sentiment
+                self._blob = blob
+        return self._blob
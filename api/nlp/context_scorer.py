@@ -0,0 +1,98 @@
+from nlp.preprocessing import clause_ids
+from utils.constants import (
+    CRITICAL, NEGATION_WORDS, INTENSIFIER_WEIGHTS, NEGATION_SCOPE_WORDS, INABILITY_VERBS, INABILITY_WEIGHT,
+    NEGATION_WINDOW, NEGATED_HIT_WEIGHT
+)
+
+class ContextScorer:
+    """
+    Weight of a lexicon hit given the tokens before it.
+
+    The word governing the hit is the first one before it that isn't a scope
+    word ("feel", "at all", an intensifier...), skipping at most `window`.
+    If it is a negation ("not anxious", "don't feel very stressed") the hit
+    is cancelled; if it is an inability verb after a negation ("can't stop
+    crying", "never stop feeling anxious") the hit is strengthened. Either
+    only holds within a clause (punctuation and commas end one, and clause
+    words like "but" are not scope words). Otherwise an intensifier right
+    before the hit scales it ("very sad" 1.5, "a bit sad" 0.7). Only the few
+    tokens before each hit are looked at, so scoring stays within the single
+    pass over the message. Categories in `exempt` (Critical Distress) always
+    count in full: a missed crisis costs far more than a false alarm.
+    """
+
+    def __init__(self, negations=NEGATION_WORDS, intensifiers=INTENSIFIER_WEIGHTS,
+                 scope_words=NEGATION_SCOPE_WORDS, inability_verbs=INABILITY_VERBS,
+                 inability_weight=INABILITY_WEIGHT, window=NEGATION_WINDOW,
+                 negated_weight=NEGATED_HIT_WEIGHT, exempt=(CRITICAL,)):
+        self.negations = frozenset(negations)
+        self.intensifiers = {k: v for k, v in intensifiers.items() if ' ' not in k}
+        self.phrase_intensifiers = {tuple(k.split()): v for k, v in intensifiers.items() if ' ' in k}
+        # Intensifiers may sit between a negation and its hit too ("not very sad", "not a bit worried")
+        self.scope_words = frozenset(scope_words).union(*(k.split() for k in intensifiers))
+        self.inability_verbs = frozenset(inability_verbs)
+        self.inability_weight = inability_weight
+        self.window = window
+        self.negated_weight = negated_weight
+        self.exempt = frozenset(exempt)
+        # Any of these in a message means some hit may not weigh exactly 1
+        self.cues = self.negations | set(self.intensifiers) | {phrase[-1] for phrase in self.phrase_intensifiers}
+
+    def applies(self, tokens):
+        """
+        False when no hit in `tokens` can be weighted (no negation or
+        intensifier at all), so callers can skip factor() per hit.
+        """
+        return not self.cues.isdisjoint(tokens)
+
+    def factor(self, tokens, start, clauses):
+        """
+        Multiplier for a hit starting at token `start`. `clauses` is a
+        zero-argument callable returning the clause id of every token; it is
+        only called when a negation governs the hit.
+        """
+        lo = max(0, start - self.window - 1)
+        if self.cues.isdisjoint(tokens[max(0, lo - 1):start]):
+            return 1.0
+
+        # 1. Find the governing word, skipping scope words
+        j = start - 1
+        while j >= lo and tokens[j] in self.scope_words:
+            j -= 1
+
+        # 2. A negation cancels the hit; "can't stop" / "never stop" strengthens it
+        if j >= lo:
+            if tokens[j] in self.negations:
+                cue, weight = j, self.negated_weight
+            elif tokens[j] in self.inability_verbs and j >= 1 and tokens[j - 1] in self.negations:
+                cue, weight = j - 1, self.inability_weight
+            else:
+                cue = None
+            if cue is not None:
+                ids = clauses()
+                if ids is None or ids[cue] == ids[start]:
+                    return weight
+
+        # 3. Otherwise only an intensifier right before the hit counts
+        if start >= 2:
+            weight = self.phrase_intensifiers.get((tokens[start - 2], tokens[start - 1]))
+            if weight is not None:
+                return weight
+        if start >= 1:
+            return self.intensifiers.get(tokens[start - 1], 1.0)
+        return 1.0
+
+    @staticmethod
+    def clause_resolver(raw_text, token_count):
+        """
+        Lazily computed clause ids for the message `raw_text` (None if they
+        can't be aligned with the tokens, e.g. for pre-cleaned input).
+        """
+        cache = []
+
+        def clauses():
+            if not cache:
+                ids = clause_ids(raw_text) if raw_text is not None else None
+                cache.append(ids if ids is not None and len(ids) == token_count else None)
+            return cache[0]
+        return clauses
@@ -0,0 +1,158 @@
+import importlib.util
+import logging
+import os
+from functools import lru_cache
+from utils.constants import FUZZY_MAX_DISTANCE, FUZZY_MIN_TOKEN_LENGTH, FUZZY_LONG_TOKEN_LENGTH, FUZZY_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_known_words = None
+
+# The word lists miss some inflected forms: "hikes" counts as known through "hike"
+_SUFFIXES = ('ing', 'ed', 'es', 's', 'er', 'ly')
+
+def known_words():
+    """
+    Correctly spelled English words (TextBlob's bundled spelling list and
+    tagger lexicon, read without importing TextBlob). Tokens in it are never
+    "corrected", so real words close to a lexicon term ("said" vs "sad",
+    "hiking" vs "hiding") don't become hits.
+    """
+    global _known_words
+    if _known_words is None:
+        words = set()
+        spec = importlib.util.find_spec('textblob')
+        data_dir = os.path.join(os.path.dirname(spec.origin), 'en') if spec else None
+        for name in ('en-spelling.txt', 'en-lexicon.txt'):
+            path = os.path.join(data_dir, name) if data_dir else None
+            if path and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    words.update(line.split()[0].lower() for line in f if line.strip() and not line.startswith(';'))
+        if not words:
+            logger.warning("TextBlob word lists not found; fuzzy matching has no known-word guard")
+        _known_words = frozenset(words)
+    return _known_words
+
+def _deletes(word, distance):
+    """
+    Every string reachable from `word` by deleting up to `distance` characters.
+    """
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (a transposition counts as one edit),
+    or limit + 1 once it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A typo touches one spot: only the differing middle needs the DP
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+class FuzzyIndex:
+    """
+    Typo correction of message tokens against the lexicon vocabulary.
+
+    A symmetric-delete (SymSpell) index: every vocabulary word is stored
+    under each string obtained by deleting up to `max_distance` characters.
+    A token is looked up by generating its own deletes, so candidates come
+    from a few hash lookups instead of an edit distance against every term;
+    only those candidates are verified. Tokens shorter than `min_length`,
+    in the vocabulary, or known English words are left alone; tokens shorter
+    than `long_length` allow a single edit.
+    """
+
+    def __init__(self, vocabulary, max_distance=FUZZY_MAX_DISTANCE, min_length=FUZZY_MIN_TOKEN_LENGTH,
+                 long_length=FUZZY_LONG_TOKEN_LENGTH, known=None, cache_size=FUZZY_CACHE_SIZE):
+        self.vocabulary = frozenset(vocabulary)
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.long_length = long_length
+        self.known = known_words() if known is None else frozenset(known)
+        self.deletes = {}
+        for word in sorted(self.vocabulary):
+            # Words much shorter than any correctable token can't be within reach
+            if len(word) + max_distance < min_length:
+                continue
+            for key in _deletes(word, max_distance):
+                self.deletes.setdefault(key, []).append(word)
+        # Tokens repeat heavily across messages; corrections are cached per index
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+
+    def _correct(self, token):
+        """
+        The closest vocabulary word to a misspelled token, or None.
+        Ties go to the alphabetically first word, so results are stable.
+        """
+        if len(token) < self.min_length or token in self.vocabulary or self.is_known(token):
+            return None
+        distance = self.max_distance if len(token) >= self.long_length else 1
+
+        best, best_distance = None, distance + 1
+        seen = set()
+        for key in _deletes(token, distance):
+            for word in self.deletes.get(key, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                d = edit_distance(token, word, distance)
+                if d < best_distance or (d == best_distance <= distance and word < best):
+                    best, best_distance = word, d
+        return best
+
+    def is_known(self, token):
+        if token in self.known:
+            return True
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix):
+                stem = token[:-len(suffix)]
+                if stem in self.known or stem + 'e' in self.known:
+                    return True
+        return False
+
+    def correct_tokens(self, tokens):
+        """
+        Returns (tokens with misspellings replaced, {position: original token}).
+        The input list is returned unchanged when nothing was corrected.
+        """
+        corrections = {}
+        corrected = tokens
+        for i, token in enumerate(tokens):
+            word = self.correct(token)
+            if word is not None:
+                if corrected is tokens:
+                    corrected = list(tokens)
+                corrected[i] = word
+                corrections[i] = token
+        return corrected, corrections
+
+    def __len__(self):
+        return len(self.deletes)
@@ -1,45 +1,149 @@
-import json
 import os
+import re
 from nlp.preprocessing import clean_text
+from nlp.analysis_context import AnalysisContext
+from nlp.context_scorer import ContextScorer
+from nlp.lexicon_registry import get_registry
+from utils.constants import FUZZY_HIT_WEIGHT
+
+_TOKEN_RE = re.compile(r'\S+')
 
 class KeywordExtractor:
-    def __init__(self, lexicon_path=None):
-        if lexicon_path is None:
-            lexicon_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'lexicon.json')
-        
-        with open(lexicon_path, 'r') as f:
-            self.lexicon = json.load(f)
+    def __init__(self, lexicon_path=None, context_scoring=None, fuzzy_matching=None):
+        # Shared per process; the registry may swap in a reloaded version at any time
+        self.registry = get_registry(lexicon_path)
+        # Negation/intensifier weighting of hits (CONTEXT_SCORING=0 counts every hit as 1)
+        if context_scoring is None:
+            context_scoring = os.getenv("CONTEXT_SCORING", "1") != "0"
+        self.scorer = ContextScorer() if context_scoring else None
+        # Typo-tolerant matching (FUZZY_MATCHING=1); corrected hits count FUZZY_HIT_WEIGHT of an exact one
+        if fuzzy_matching is None:
+            fuzzy_matching = os.getenv("FUZZY_MATCHING", "0") == "1"
+        self.fuzzy_matching = fuzzy_matching
+        self.fuzzy_weight = float(os.getenv("FUZZY_HIT_WEIGHT", FUZZY_HIT_WEIGHT))
+
+    @property
+    def lexicon(self):
+        """
+        The compiled lexicon currently in service. Callers that need a
+        consistent view across several steps should read this once and pass
+        it along (AnalysisContext pins it per message).
+        """
+        return self.registry.current
+
+    @property
+    def categories(self):
+        return self.lexicon.categories
+
+    @property
+    def lexicon_version(self):
+        # Content hash identifying the lexicon version (e.g. for cache keys)
+        return self.lexicon.version
+
+    def match(self, text):
+        """
+        Single pass over the cleaned text's tokens returning matched keywords,
+        context-weighted per-category scores (floats), keywords cancelled by
+        a negation, typo corrections applied ({token: lexicon word}, fuzzy
+        mode only) and (start, end, keyword) spans.
+        Span offsets refer to the cleaned text.
+        """
+        return self.match_cleaned(clean_text(text), raw_text=text.lower())
+
+    def match_cleaned(self, cleaned, lexicon=None, raw_text=None):
+        """
+        Same as match() for text that has already been through clean_text,
+        optionally against a specific lexicon version. Pass the lowercased
+        raw text so negation scope can stop at sentence punctuation.
+        """
+        lexicon = lexicon or self.lexicon
+        index = lexicon.index
+        scorer = self.scorer
+
+        found = list(_TOKEN_RE.finditer(cleaned))
+        tokens = [m.group() for m in found]
+        # Misspelled tokens are matched as the lexicon word they are closest to
+        corrections = {}
+        if self.fuzzy_matching:
+            tokens, corrections = lexicon.fuzzy_index.correct_tokens(tokens)
+        # Most messages have no negation or intensifier: every hit weighs 1
+        if scorer is not None and not scorer.applies(tokens):
+            scorer = None
+        clauses = scorer.clause_resolver(raw_text, len(tokens)) if scorer else None
+
+        # 1. Hits in one pass; each term keeps its strongest occurrence
+        spans = []
+        factors = {}
+        scales = {}
+        fuzzy = {}
+        for start, end, term_id in index.find(tokens):
+            spans.append((found[start].start(), found[end - 1].end(), index.keywords[term_id]))
+            scale = 1.0
+            if corrections and not corrections.keys().isdisjoint(range(start, end)):
+                scale = self.fuzzy_weight
+                fuzzy.update((corrections[i], tokens[i]) for i in range(start, end) if i in corrections)
+            if scorer is None and not corrections:
+                factors.setdefault(term_id, 1.0)
+                continue
+            factor = scorer.factor(tokens, start, clauses) * scale if scorer else scale
+            if factor > factors.get(term_id, -1.0):
+                factors[term_id] = factor
+            if corrections and scale > scales.get(term_id, 0.0):
+                scales[term_id] = scale
+
+        # 2. Weighted category scores
+        matches = dict.fromkeys(lexicon.categories, 0.0)
+        keywords = []
+        negated = []
+        if scorer is None and not corrections:
+            for term_id in factors:
+                keywords.append(index.keywords[term_id])
+                for category, weight in index.term_weights[term_id]:
+                    matches[category] += weight
+        else:
+            # Exempt categories ignore negation context, but not the fuzzy down-weighting
+            exempt = scorer.exempt if scorer else ()
+            for term_id, factor in factors.items():
+                counted = False
+                for category, weight in index.term_weights[term_id]:
+                    if category in exempt:
+                        matches[category] += weight * scales.get(term_id, 1.0)
+                        counted = True
+                    elif factor:
+                        matches[category] += weight * factor
+                        counted = True
+                (keywords if counted else negated).append(index.keywords[term_id])
+            matches = {category: round(score, 2) for category, score in matches.items()}
+
+        return {
+            "keywords": keywords,
+            "category_matches": matches,
+            "negated_keywords": negated,
+            "fuzzy_corrections": fuzzy,
+            "spans": spans
+        }
+
+    def has_crisis_terms(self, text, lexicon=None):
+        """
+        True if the text contains a Critical Distress term (crisis hits are
+        never negated, so no context scoring). For screening text that is not
+        analyzed in full.
+        """
+        lexicon = lexicon or self.lexicon
+        return lexicon.crisis_pattern.search(clean_text(text)) is not None
 
     def extract_keywords(self, text):
         """
         Extracts words that match the emotion lexicon.
+        Accepts a raw message or an AnalysisContext.
         """
-        cleaned = clean_text(text)
-        found_keywords = []
-        
-        # We check both individual words and the lexicon entries (which might be phrases)
-        for category, keywords in self.lexicon.items():
-            for kw in keywords:
-                if kw in cleaned:
-                    found_keywords.append(kw)
-        
-        # Deduplicate while preserving order if possible
-        return list(set(found_keywords))
+        return AnalysisContext.of(text, self).matches["keywords"]
 
     def get_category_matches(self, text):
         """
-        Returns match counts with heavy weighting for Critical Distress phrases.
-        """
-        cleaned = clean_text(text)
-        matches = {category: 0 for category in self.lexicon.keys()}
-        
-        for category, keywords in self.lexicon.items():
-            for kw in keywords:
-                # Use word boundary or direct phrase match to prevent partial matches
-                # e.g., "die" shouldn't match "diet", but "want to die" should match "i want to die"
-                if kw in cleaned:
-                    # HEAVY WEIGHTING for Critical Distress
-                    weight = 10 if category == "Critical Distress" else 1
-                    matches[category] += weight
-        
-        return matches
+        Returns per-category scores (floats) with heavy weighting for Critical
+        Distress phrases, negation/intensifier context and fuzzy-hit
+        down-weighting applied.
+        Accepts a raw message or an AnalysisContext.
+        """
+        return AnalysisContext.of(text, self).matches["category_matches"]
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import time
+from nlp.fuzzy_index import FuzzyIndex
+from nlp.lexicon_index import LexiconIndex
+from nlp.preprocessing import clean_text
+from utils.constants import CRITICAL, CRITICAL_KEYWORD_WEIGHT
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+DEFAULT_LEXICON_PATH = os.path.join(DATA_DIR, 'lexicon.json')
+DEFAULT_ARTIFACT_PATH = os.path.join(DATA_DIR, 'lexicon.bin')
+
+# Artifact layout: magic, format version, header length, then a JSON header
+# holding the term table and the LexiconIndex tables. The tables are Python
+# dicts at match time, so the file is read and decoded whole rather than
+# memory-mapped; what loading it saves is normalising every entry and
+# building the index (~2 ms cold, see benchmarks/bench_startup.py).
+ARTIFACT_MAGIC = b'KDLX'
+ARTIFACT_FORMAT = 2
+_PREAMBLE = struct.Struct('<4sII')
+
+def normalize_term(keyword):
+    """
+    Brings a lexicon entry into the same form as clean_text output
+    ("self-harm" -> "selfharm"). Entries containing digits ("988") can never
+    occur in cleaned text and are skipped.
+    """
+    if any(ch.isdigit() for ch in keyword):
+        return None
+    term = " ".join(clean_text(keyword).split())
+    return term or None
+
+def category_weights(categories):
+    """
+    Weight a match adds to its category's count: Critical phrases dominate.
+    """
+    return {category: CRITICAL_KEYWORD_WEIGHT if category == CRITICAL else 1 for category in categories}
+
+def source_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class CompiledLexicon:
+    """
+    lexicon.json compiled for matching.
+
+    Holds one entry per normalised term (its display keyword and the categories
+    it is listed under, once per listing) and the token index used for
+    matching (rebuilt from the terms, or restored from the artifact when
+    `index` is given). `version` is a short
+    content hash of the source file. Instances are never mutated, so one
+    can be shared by in-flight requests while a newer version is swapped in.
+    """
+
+    def __init__(self, categories, keywords, term_categories, terms, source_hash, skipped=(), index=None):
+        self.categories = categories
+        self.keywords = keywords
+        self.term_categories = term_categories
+        # Normalised terms, indexed by term ID
+        self.terms = list(terms)
+        self.source_hash = source_hash
+        self.skipped = list(skipped)
+        self.version = source_hash[:12]
+        self.loaded_at = time.time()
+        # Token index used for matching (see LexiconIndex)
+        self.index = index if index is not None else self.build_index(category_weights(categories))
+        # Terms listed under Critical Distress, as one regex over clean_text output
+        self.crisis_pattern = self.build_crisis_pattern()
+        self._fuzzy_index = None
+
+    @property
+    def fuzzy_index(self):
+        """
+        Typo-correction index over the tokens of every term, built on first
+        use (only fuzzy matching needs it).
+        """
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyIndex({token for term in self.terms for token in term.split()})
+        return self._fuzzy_index
+
+    def build_crisis_pattern(self):
+        """
+        Regex matching any Critical Distress term as whole tokens. Screening
+        text for crisis language with it runs in C, without tokenizing.
+        """
+        crisis = sorted((term for term, cats in zip(self.terms, self.term_categories) if CRITICAL in cats),
+                        key=len, reverse=True)
+        if not crisis:
+            return re.compile(r'(?!)')
+        alternation = '|'.join(r'\s+'.join(map(re.escape, term.split())) for term in crisis)
+        return re.compile(rf'(?<!\S)(?:{alternation})(?!\S)')
+
+    def build_index(self, weights):
+        """
+        Token-level LexiconIndex; `weights` maps category -> weight per match.
+        """
+        return LexiconIndex(self.terms, self.keywords, self.term_categories, weights)
+
+    def report(self):
+        """
+        Lexicon hygiene: terms listed more than once in a category, terms
+        listed under several categories, terms nested in longer phrases, and
+        entries skipped at normalisation.
+        """
+        duplicates = {}
+        cross_category = []
+        for keyword, categories in zip(self.keywords, self.term_categories):
+            for category in dict.fromkeys(categories):
+                if categories.count(category) > 1:
+                    duplicates.setdefault(category, []).append(keyword)
+            if len(set(categories)) > 1:
+                cross_category.append({"term": keyword, "categories": list(dict.fromkeys(categories))})
+
+        index = self.index
+        return {
+            "version": self.version,
+            "terms": len(self.keywords),
+            "duplicates": duplicates,
+            "cross_category": cross_category,
+            "overlaps": [{"term": inner, "inside": outer} for inner, outer in index.overlaps()],
+            "skipped": self.skipped
+        }
+
+    @classmethod
+    def from_json(cls, path=DEFAULT_LEXICON_PATH):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        lexicon = json.loads(raw.decode('utf-8'))
+
+        keywords = []
+        term_categories = []
+        term_ids = {}
+        skipped = []
+        for category, entries in lexicon.items():
+            for kw in entries:
+                term = normalize_term(kw)
+                if term is None:
+                    skipped.append(kw)
+                    continue
+                if term not in term_ids:
+                    term_ids[term] = len(keywords)
+                    keywords.append(kw)
+                    term_categories.append([])
+                term_categories[term_ids[term]].append(category)
+
+        return cls(
+            categories=list(lexicon.keys()),
+            keywords=keywords,
+            term_categories=[tuple(c) for c in term_categories],
+            terms=term_ids.keys(),
+            source_hash=hashlib.sha256(raw).hexdigest(),
+            skipped=skipped
+        )
+
+    def save_artifact(self, path=DEFAULT_ARTIFACT_PATH):
+        """
+        Serialises the compiled lexicon and its LexiconIndex tables.
+        """
+        header = {
+            "source_hash": self.source_hash,
+            "categories": self.categories,
+            "keywords": self.keywords,
+            "term_categories": self.term_categories,
+            "terms": self.terms,
+            "skipped": self.skipped,
+            "index": self.index.to_tables()
+        }
+        header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(_PREAMBLE.pack(ARTIFACT_MAGIC, ARTIFACT_FORMAT, len(header_bytes)))
+            f.write(header_bytes)
+
+    @classmethod
+    def from_artifact(cls, path=DEFAULT_ARTIFACT_PATH, expected_source_hash=None):
+        """
+        Loads a prebuilt artifact. Returns None if it is missing, corrupt, in
+        an older format or stale relative to expected_source_hash.
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if len(raw) < _PREAMBLE.size:
+            return None
+        magic, fmt, header_len = _PREAMBLE.unpack_from(raw, 0)
+        if magic != ARTIFACT_MAGIC or fmt != ARTIFACT_FORMAT:
+            return None
+        header = json.loads(raw[_PREAMBLE.size:_PREAMBLE.size + header_len].decode('utf-8'))
+        if expected_source_hash and header["source_hash"] != expected_source_hash:
+            return None
+
+        index = LexiconIndex.from_tables(header["terms"], header["keywords"], header["index"])
+        return cls(
+            categories=header["categories"],
+            keywords=header["keywords"],
+            term_categories=[tuple(c) for c in header["term_categories"]],
+            terms=header["terms"],
+            source_hash=header["source_hash"],
+            skipped=header.get("skipped", ()),
+            index=index
+        )
@@ -0,0 +1,110 @@
+import re
+
+_TOKEN_RE = re.compile(r'\S+')
+
+class LexiconIndex:
+    """
+    Token-level index over the normalised lexicon terms.
+
+    Single-word terms live in a hash index; multi-word phrases are bucketed
+    by their first token (longest first), so a message is matched by walking
+    its tokens once and only comparing the phrases that can start there.
+    Each term carries its display keyword and its (category, weight) pairs,
+    with repeat listings in the same category collapsed.
+    """
+
+    def __init__(self, terms, keywords, term_categories, weights):
+        self.terms = list(terms)
+        self.keywords = list(keywords)
+        self.single = {}
+        self.phrases = {}
+        self.max_phrase_tokens = 1
+        self.term_weights = []
+
+        for term_id, term in enumerate(self.terms):
+            tokens = tuple(term.split())
+            if len(tokens) == 1:
+                self.single[tokens[0]] = term_id
+            else:
+                self.phrases.setdefault(tokens[0], []).append((tokens, term_id))
+                self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+
+            categories = dict.fromkeys(term_categories[term_id])
+            self.term_weights.append(tuple((category, weights[category]) for category in categories))
+
+        for bucket in self.phrases.values():
+            bucket.sort(key=lambda entry: len(entry[0]), reverse=True)
+
+    def to_tables(self):
+        """
+        The index as JSON-serialisable tables (for the lexicon artifact).
+        """
+        return {
+            "single": self.single,
+            "phrases": {first: [[list(tokens), term_id] for tokens, term_id in bucket]
+                        for first, bucket in self.phrases.items()},
+            "max_phrase_tokens": self.max_phrase_tokens,
+            "term_weights": [[list(pair) for pair in pairs] for pairs in self.term_weights]
+        }
+
+    @classmethod
+    def from_tables(cls, terms, keywords, tables):
+        """
+        Restores an index from to_tables() output without rebuilding it.
+        """
+        index = cls.__new__(cls)
+        index.terms = list(terms)
+        index.keywords = list(keywords)
+        index.single = tables["single"]
+        index.phrases = {first: [(tuple(tokens), term_id) for tokens, term_id in bucket]
+                         for first, bucket in tables["phrases"].items()}
+        index.max_phrase_tokens = tables["max_phrase_tokens"]
+        index.term_weights = [tuple(tuple(pair) for pair in pairs) for pairs in tables["term_weights"]]
+        return index
+
+    def __len__(self):
+        return len(self.terms)
+
+    def find(self, tokens):
+        """
+        Returns (start, end, term_id) token ranges for every term occurrence,
+        including terms nested inside longer ones ("die" in "want to die").
+        """
+        single, phrases = self.single, self.phrases
+        hits = []
+        for i, token in enumerate(tokens):
+            term_id = single.get(token)
+            if term_id is not None:
+                hits.append((i, i + 1, term_id))
+            bucket = phrases.get(token)
+            if bucket:
+                for phrase, term_id in bucket:
+                    end = i + len(phrase)
+                    if tuple(tokens[i:end]) == phrase:
+                        hits.append((i, end, term_id))
+        return hits
+
+    def find_spans(self, text):
+        """
+        Like find() on whitespace tokens of `text`, with character offsets.
+        """
+        matches = list(_TOKEN_RE.finditer(text))
+        tokens = [m.group() for m in matches]
+        return [(matches[start].start(), matches[end - 1].end(), term_id)
+                for start, end, term_id in self.find(tokens)]
+
+    def overlaps(self):
+        """
+        Terms that occur inside longer terms, as (term, containing_term) pairs;
+        both fire when the longer one is present.
+        """
+        pairs = []
+        for term in self.terms:
+            tokens = term.split()
+            if len(tokens) < 2:
+                continue
+            for start, end, term_id in self.find(tokens):
+                inner = self.terms[term_id]
+                if inner != term:
+                    pairs.append((inner, term))
+        return pairs
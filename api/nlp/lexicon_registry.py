@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from nlp.lexicon import CompiledLexicon, DEFAULT_LEXICON_PATH, source_hash
+from utils.constants import ALLOWED_STATES, LEXICON_WATCH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+class LexiconRegistry:
+    """
+    Serves the current compiled lexicon for one source file and swaps in new
+    versions without blocking readers.
+
+    `current` is a plain attribute read: a reload compiles the new version
+    off to the side (in a background thread) and replaces the reference in a
+    single assignment, so in-flight analyses keep the version they started
+    with. Reloads are triggered explicitly (reload()) or by a polling watcher
+    on the file's mtime; a version that fails to compile or validate is
+    rejected and the current one stays in service.
+    """
+
+    def __init__(self, path, watch_interval=LEXICON_WATCH_INTERVAL):
+        self.path = path
+        self.watch_interval = watch_interval
+        self.current = _load(path)
+        self.previous_version = None
+        self.last_reload = None
+        self._mtime = _mtime(path)
+        self._reload_lock = threading.Lock()
+        self._watch_lock = threading.Lock()
+        self._watch_pid = None
+        _log_report(self.current)
+
+    @property
+    def version(self):
+        return self.current.version
+
+    def reload(self, wait=False):
+        """
+        Recompiles the lexicon from its source file in the background. Returns
+        the reload record ({"status": "started" | "swapped" | "unchanged" |
+        "failed" | "in_progress", ...}); with wait=True the call blocks until
+        the new version is in service or rejected.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return {"status": "in_progress", "version": self.version}
+
+        if not wait:
+            threading.Thread(target=self._reload_locked, name="lexicon-reload", daemon=True).start()
+            return {"status": "started", "version": self.version}
+        return self._reload_locked()
+
+    def _reload_locked(self):
+        start = time.perf_counter()
+        old = self.current
+        # A rejected edit is not retried by the watcher until the file changes again
+        self._mtime = _mtime(self.path)
+        try:
+            if source_hash(self.path) == old.source_hash:
+                record = {"status": "unchanged", "version": old.version}
+            else:
+                # 1. Compile next to the serving version
+                compiled = CompiledLexicon.from_json(self.path)
+                # 2. Validate before it can serve traffic
+                self._validate(compiled, old)
+                # 3. Swap (single reference assignment)
+                self.current = compiled
+                self.previous_version = old.version
+                record = {"status": "swapped", "version": compiled.version, "previous_version": old.version}
+                logger.info(f"Lexicon {old.version} replaced by {compiled.version}")
+                _log_report(compiled)
+        except Exception as e:
+            logger.error(f"Lexicon reload failed, keeping {old.version}: {e}")
+            record = {"status": "failed", "version": old.version, "error": str(e)}
+        finally:
+            self._reload_lock.release()
+
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record["at"] = time.time()
+        self.last_reload = record
+        return record
+
+    @staticmethod
+    def _validate(compiled, old):
+        unknown = [c for c in compiled.categories if c not in ALLOWED_STATES and c not in old.categories]
+        if unknown:
+            raise ValueError(f"Unknown lexicon categories: {', '.join(unknown)}")
+        if not compiled.keywords:
+            raise ValueError("Lexicon has no usable terms")
+
+    def ensure_watching(self):
+        """
+        Starts the file watcher in the current process (a forked worker
+        starts its own on first use). LEXICON_WATCH_INTERVAL=0 disables it.
+        """
+        if self.watch_interval <= 0 or self._watch_pid == os.getpid():
+            return
+        with self._watch_lock:
+            if self._watch_pid != os.getpid():
+                threading.Thread(target=self._watch, name="lexicon-watcher", daemon=True).start()
+                self._watch_pid = os.getpid()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            mtime = _mtime(self.path)
+            if mtime is not None and mtime != self._mtime:
+                logger.info(f"Lexicon source {self.path} changed; reloading")
+                self.reload(wait=True)
+
+    def status(self):
+        current = self.current
+        return {
+            "path": self.path,
+            "version": current.version,
+            "previous_version": self.previous_version,
+            "terms": len(current.keywords),
+            "categories": list(current.categories),
+            "loaded_at": current.loaded_at,
+            "watching": self._watch_pid == os.getpid(),
+            "last_reload": self.last_reload
+        }
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(path=None):
+    """
+    Returns the process-wide registry for a lexicon path, loading it once.
+    """
+    path = os.path.abspath(path or DEFAULT_LEXICON_PATH)
+    registry = _registries.get(path)
+    if registry is not None:
+        return registry
+
+    with _registries_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            interval = float(os.getenv("LEXICON_WATCH_INTERVAL", LEXICON_WATCH_INTERVAL))
+            registry = _registries[path] = LexiconRegistry(path, watch_interval=interval)
+        return registry
+
+def get_lexicon(path=None):
+    """
+    The lexicon version currently in service for a path.
+    """
+    return get_registry(path).current
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _log_report(compiled):
+    """
+    Summarises lexicon hygiene issues at load (details at debug level;
+    scripts/lexicon_report.py prints the full report).
+    """
+    report = compiled.report()
+    duplicates = sum(len(terms) for terms in report["duplicates"].values())
+    logger.info(
+        f"Lexicon {compiled.version}: {report['terms']} terms, {duplicates} duplicate listings, "
+        f"{len(report['cross_category'])} cross-category terms, {len(report['overlaps'])} overlapping terms, "
+        f"{len(report['skipped'])} skipped entries"
+    )
+    logger.debug(f"Lexicon report: {report}")
+
+def _load(path):
+    """
+    Initial load: for the default lexicon a fresh prebuilt artifact
+    (terms and index tables) is loaded instead of compiling (LEXICON_ARTIFACT=0 always compiles
+    from JSON). Reloads always compile, since the artifact lags an edit.
+    """
+    use_artifact = os.getenv("LEXICON_ARTIFACT", "1") != "0"
+    if use_artifact and path == os.path.abspath(DEFAULT_LEXICON_PATH):
+        try:
+            compiled = CompiledLexicon.from_artifact(expected_source_hash=source_hash(path))
+            if compiled is not None:
+                logger.info(f"Lexicon {compiled.version} loaded from artifact")
+                return compiled
+            logger.warning("Lexicon artifact missing or stale; compiling from JSON "
+                           "(run scripts/build_lexicon_artifact.py)")
+        except Exception as e:
+            logger.warning(f"Failed to load lexicon artifact, compiling from JSON: {e}")
+    return CompiledLexicon.from_json(path)
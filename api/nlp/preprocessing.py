@@ -1,14 +1,4 @@
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-
-import os
-
-# Add local nltk_data path for Vercel deployment
-nltk_data_path = os.path.join(os.path.dirname(__file__), '..', 'nltk_data')
-if nltk_data_path not in nltk.data.path:
-    nltk.data.path.append(nltk_data_path)
 
 def clean_text(text):
     """
@@ -25,15 +15,93 @@ def clean_text(text):
     
     return text
 
-def preprocess_text(text):
+# Punctuation that ends a clause (for negation scope)
+_CLAUSE_END = re.compile(r'[.!?;:,]')
+_LETTER = re.compile(r'[a-zA-Z]')
+
+def clause_ids(text):
+    """
+    Clause number of each clean_text(text) token, counting clauses split by
+    sentence punctuation or commas (which clean_text removes).
+    """
+    ids = []
+    clause = 0
+    for raw in text.split():
+        first = _LETTER.search(raw)
+        if first is None:
+            # Token removed by cleaning (e.g. "..." or "-")
+            if _CLAUSE_END.search(raw):
+                clause += 1
+            continue
+        if _CLAUSE_END.search(raw, 0, first.start()):
+            clause += 1
+        ids.append(clause)
+        last = len(raw) - 1
+        while not raw[last].isalpha() or not raw[last].isascii():
+            last -= 1
+        if _CLAUSE_END.search(raw, last + 1):
+            clause += 1
+    return ids
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Sentence end (punctuation, optional closing quote/bracket, whitespace) or a line break
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+
+def split_sentences(text, language='english'):
+    """
+    Sentences of a message using the bundled punkt model, paragraph by
+    paragraph (a blank line always ends a sentence).
+    """
+    from nlp.resources import get_resources
+    tokenizer = get_resources().sentence_tokenizer(language)
+
+    sentences = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        if paragraph.strip():
+            sentences.extend(s.strip() for s in tokenizer.tokenize(paragraph) if s.strip())
+    return sentences
+
+def split_sentences_fast(text):
+    """
+    Regex sentence split for text that only needs screening, not analysis.
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start:match.end()].strip())
+        start = match.end()
+    sentences.append(text[start:].strip())
+    return [s for s in sentences if s]
+
+def truncate_text(text, limit):
+    """
+    Splits text into (head, rest) with head at most `limit` characters,
+    cutting after the last sentence end that keeps at least half the budget,
+    else at the last whitespace, so no sentence or word is cut in half.
+    """
+    if len(text) <= limit:
+        return text, ""
+    cut = None
+    for match in _SENTENCE_END.finditer(text, 0, limit):
+        cut = match.end()
+    if cut is None or cut < limit // 2:
+        space = text.rfind(' ', 0, limit)
+        cut = space if space > 0 else limit
+    return text[:cut].rstrip(), text[cut:]
+
+def preprocess_text(text, language='english'):
     """
     Full preprocessing pipeline: cleaning, tokenization, and stopword removal.
+    Tokenizer and stopword data are loaded once per language, on first use.
     """
+    from nlp.resources import get_resources
+    resources = get_resources()
+
     text = clean_text(text)
     
-    tokens = word_tokenize(text)
+    tokens = resources.word_tokenize(text, language)
     
-    stop_words = set(stopwords.words('english'))
+    stop_words = resources.stopwords(language)
     filtered_tokens = [w for w in tokens if w not in stop_words]
     
     return filtered_tokens
@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+from utils.constants import DEFAULT_NLTK_LANGUAGES
+
+logger = logging.getLogger(__name__)
+
+# Bundled nltk_data (for Vercel deployment); see scripts/package_nltk_data.py
+NLTK_DATA_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'nltk_data'))
+
+def configured_languages():
+    """
+    Languages whose tokenizer/stopword data is bundled and may be loaded,
+    from NLTK_LANGUAGES (comma-separated), e.g. "english,spanish".
+    """
+    value = os.getenv("NLTK_LANGUAGES", DEFAULT_NLTK_LANGUAGES)
+    return [lang.strip().lower() for lang in value.split(',') if lang.strip()]
+
+class NLTKResources:
+    """
+    Language-aware loader for tokenizer and stopword data.
+
+    Nothing is read from disk (and nltk is not imported) until a language's
+    resource is first requested; after that it is cached for the process.
+    """
+
+    def __init__(self, data_path=NLTK_DATA_PATH, languages=None):
+        self.data_path = data_path
+        self.languages = languages or configured_languages()
+        self._stopwords = {}
+        self._sentence_tokenizers = {}
+        self._word_tokenizer = None
+        self._lock = threading.Lock()
+
+    def _check_language(self, language):
+        if language not in self.languages:
+            raise LookupError(
+                f"Language '{language}' is not configured (configured: {', '.join(self.languages)}); "
+                f"add it to NLTK_LANGUAGES"
+            )
+
+    def _nltk(self):
+        import nltk
+        if self.data_path not in nltk.data.path:
+            nltk.data.path.append(self.data_path)
+        return nltk
+
+    def stopwords(self, language='english'):
+        """
+        Stopwords for a language as a frozenset.
+        Read straight from the bundled corpus file when present.
+        """
+        words = self._stopwords.get(language)
+        if words is not None:
+            return words
+
+        self._check_language(language)
+        with self._lock:
+            words = self._stopwords.get(language)
+            if words is None:
+                path = os.path.join(self.data_path, 'corpora', 'stopwords', language)
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        words = frozenset(line.strip() for line in f if line.strip())
+                else:
+                    self._nltk()
+                    from nltk.corpus import stopwords
+                    words = frozenset(stopwords.words(language))
+                self._stopwords[language] = words
+                logger.info(f"Loaded {len(words)} {language} stopwords")
+        return words
+
+    def sentence_tokenizer(self, language='english'):
+        """
+        Punkt sentence tokenizer for a language (punkt_tab data).
+        """
+        tokenizer = self._sentence_tokenizers.get(language)
+        if tokenizer is not None:
+            return tokenizer
+
+        self._check_language(language)
+        with self._lock:
+            tokenizer = self._sentence_tokenizers.get(language)
+            if tokenizer is None:
+                self._nltk()
+                from nltk.tokenize.punkt import PunktTokenizer
+                tokenizer = PunktTokenizer(language)
+                self._sentence_tokenizers[language] = tokenizer
+                logger.info(f"Loaded {language} punkt tokenizer")
+        return tokenizer
+
+    def word_tokenize(self, text, language='english'):
+        """
+        Equivalent to nltk.word_tokenize, using the cached per-language tokenizer.
+        """
+        if self._word_tokenizer is None:
+            self._nltk()
+            from nltk.tokenize import NLTKWordTokenizer
+            self._word_tokenizer = NLTKWordTokenizer()
+
+        sentences = self.sentence_tokenizer(language).tokenize(text)
+        return [token for sent in sentences for token in self._word_tokenizer.tokenize(sent)]
+
+    def loaded(self):
+        return {
+            "stopwords": sorted(self._stopwords),
+            "tokenizers": sorted(self._sentence_tokenizers)
+        }
+
+_resources = None
+_resources_lock = threading.Lock()
+
+def get_resources():
+    """
+    Process-wide NLTKResources instance.
+    """
+    global _resources
+    if _resources is None:
+        with _resources_lock:
+            if _resources is None:
+                _resources = NLTKResources()
+    return _resources
@@ -0,0 +1,42 @@
+"""
+Build step: compiles data/lexicon.json into data/lexicon.bin, an artifact
+(term table + LexiconIndex tables) that is read and decoded at startup
+instead of compiling. It is not memory-mapped (see nlp/lexicon.py).
+Re-run whenever lexicon.json changes; a stale artifact is ignored at load time.
+
+Usage: python scripts/build_lexicon_artifact.py [--lexicon PATH] [--output PATH]
+"""
+import argparse
+import os
+import sys
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.lexicon import CompiledLexicon, DEFAULT_LEXICON_PATH, DEFAULT_ARTIFACT_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lexicon', default=DEFAULT_LEXICON_PATH)
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    compiled = CompiledLexicon.from_json(args.lexicon)
+    compiled.save_artifact(args.output)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    loaded = CompiledLexicon.from_artifact(args.output, expected_source_hash=compiled.source_hash)
+    if loaded is None or (loaded.terms != compiled.terms
+                           or loaded.index.to_tables() != compiled.index.to_tables()):
+        sys.exit("Artifact verification failed")
+
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KiB, "
+          f"{len(compiled.keywords)} terms, lexicon {compiled.version}) in {elapsed:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
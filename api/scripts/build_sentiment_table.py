@@ -0,0 +1,62 @@
+"""
+Build step: extracts the English polarity lexicon that TextBlob's pattern
+analyzer uses (en-sentiment.xml) into data/sentiment_table.json, the
+precomputed table behind the default "lexicon" sentiment backend.
+TextBlob is only needed to run this script, not at serving time.
+
+Usage: python scripts/build_sentiment_table.py [--output PATH]
+"""
+import argparse
+import json
+import os
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from models.sentiment_backends import DEFAULT_SENTIMENT_TABLE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default=DEFAULT_SENTIMENT_TABLE_PATH)
+    args = parser.parse_args()
+
+    from importlib.metadata import version
+    from textblob._text import EMOTICONS
+    from textblob.en import sentiment
+
+    sentiment.load()
+
+    # word -> [polarity, intensity, is_modifier]; the POS-averaged (None) sense
+    # is what TextBlob scores plain text with
+    words = {}
+    for word in sorted(sentiment):
+        senses = sentiment[word]
+        polarity, _, intensity = senses[None]
+        is_modifier = any(pos in senses for pos in sentiment.modifiers)
+        words[word] = [polarity, intensity, int(is_modifier)]
+
+    emoticons = {}
+    for (_, polarity), faces in EMOTICONS.items():
+        for face in faces:
+            # TextBlob never treats alphabetic faces ("xD") as emoticons
+            if not face.isalpha():
+                emoticons[face.lower()] = polarity
+
+    table = {
+        "source": f"pattern en-sentiment.xml (textblob {version('textblob')})",
+        "negations": list(sentiment.negations),
+        "words": words,
+        "emoticons": dict(sorted(emoticons.items()))
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KiB, "
+          f"{len(words)} words, {len(emoticons)} emoticons)")
+
+
+if __name__ == '__main__':
+    main()
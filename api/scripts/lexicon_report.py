@@ -0,0 +1,45 @@
+"""
+Prints the lexicon hygiene report: terms listed twice in a category, terms
+listed under several categories, terms nested inside longer phrases, and
+entries skipped at normalisation (e.g. containing digits).
+
+Usage: python scripts/lexicon_report.py [--lexicon PATH] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.lexicon import CompiledLexicon, DEFAULT_LEXICON_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lexicon', default=DEFAULT_LEXICON_PATH)
+    parser.add_argument('--json', action='store_true', help="Emit the report as JSON")
+    args = parser.parse_args()
+
+    report = CompiledLexicon.from_json(args.lexicon).report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Lexicon {report['version']}: {report['terms']} terms")
+    print("\nDuplicate listings within a category:")
+    for category, terms in report["duplicates"].items():
+        print(f"  {category}: {', '.join(terms)}")
+    print(f"\nTerms under several categories ({len(report['cross_category'])}):")
+    for entry in report["cross_category"]:
+        print(f"  {entry['term']}: {', '.join(entry['categories'])}")
+    print(f"\nTerms nested in longer phrases ({len(report['overlaps'])}):")
+    for entry in report["overlaps"]:
+        print(f"  '{entry['term']}' in '{entry['inside']}'")
+    print(f"\nSkipped entries: {', '.join(report['skipped']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
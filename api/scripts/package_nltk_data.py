@@ -0,0 +1,96 @@
+"""
+Packaging mode for nltk_data: bundles only the tokenizer (punkt_tab) and
+stopword data for the configured languages, so the deployment bundle and
+cold-start disk reads stay small.
+
+Usage:
+  python scripts/package_nltk_data.py --output build/nltk_data [--languages english spanish]
+  python scripts/package_nltk_data.py --in-place   # prune api/nltk_data before deploying
+
+Languages default to NLTK_LANGUAGES (comma-separated), i.e. "english".
+"""
+import argparse
+import os
+import shutil
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.resources import NLTK_DATA_PATH, configured_languages
+
+# Per-language resource directories/files, relative to the nltk_data root
+LANGUAGE_RESOURCES = [
+    ('tokenizers', 'punkt_tab'),
+    ('corpora', 'stopwords'),
+]
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def plan(source, languages):
+    """
+    Returns (keep, drop): resource paths to bundle and paths not needed.
+    """
+    keep, drop = [], []
+    for parts in LANGUAGE_RESOURCES:
+        resource_dir = os.path.join(source, *parts)
+        if not os.path.isdir(resource_dir):
+            continue
+        for entry in sorted(os.listdir(resource_dir)):
+            path = os.path.join(resource_dir, entry)
+            # READMEs are kept; language entries only if configured
+            if entry == 'README' or entry in languages:
+                keep.append(path)
+            else:
+                drop.append(path)
+
+    missing = [
+        f"{'/'.join(parts)}/{lang}" for parts in LANGUAGE_RESOURCES for lang in languages
+        if not os.path.exists(os.path.join(source, *parts, lang))
+    ]
+    return keep, drop, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--languages', nargs='+', default=configured_languages())
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--output', help="Directory to write the trimmed nltk_data into")
+    target.add_argument('--in-place', action='store_true', help="Delete unconfigured languages from the source")
+    parser.add_argument('--source', default=NLTK_DATA_PATH)
+    args = parser.parse_args()
+
+    languages = [lang.lower() for lang in args.languages]
+    before = dir_size(args.source)
+    keep, drop, missing = plan(args.source, languages)
+    if missing:
+        sys.exit(f"Missing data for configured languages: {', '.join(missing)}")
+
+    if args.in_place:
+        for path in drop:
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+        output = args.source
+    else:
+        output = args.output
+        for path in keep:
+            dest = os.path.join(output, os.path.relpath(path, args.source))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            if os.path.isdir(path):
+                shutil.copytree(path, dest, dirs_exist_ok=True)
+            else:
+                shutil.copy2(path, dest)
+
+    after = dir_size(output)
+    print(f"Bundled {', '.join(languages)}: {before / 1024:.0f} KiB -> {after / 1024:.0f} KiB "
+          f"({len(drop)} language resources dropped) at {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""
+Offline re-scoring of exported conversation archives.
+
+Streams a JSONL or CSV file (optionally .gz) through a process pool. Each
+worker holds one AnalysisService with SOS dispatch disabled and scores
+chunks of rows with the batch pipeline. Results are written incrementally,
+in input order, either as JSONL or as a directory of Parquet part files
+(needs pyarrow). Only a bounded number of chunks is in flight, so memory
+stays flat however large the input is.
+
+After every durable write a checkpoint (<output>.checkpoint.json) records
+how many input rows are done. --resume continues from it, dropping any
+partial output written after it. Progress goes to stderr and a throughput
+summary is printed at the end.
+
+Usage: python scripts/score_archive.py INPUT --output OUT [--input-format jsonl|csv]
+       [--output-format jsonl|parquet] [--message-field message] [--id-field id]
+       [--workers N] [--chunk-size 500] [--part-rows 100000] [--resume]
+"""
+import argparse
+import csv
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from utils.json_provider import dumps, loads
+
+# Per-process service, built by the pool initializer
+_service = None
+
+
+def _init_worker():
+    global _service
+    logging.disable(logging.WARNING)
+    from services.analysis_service import AnalysisService
+    _service = AnalysisService(enable_sos=False)
+
+
+def _extract(payload, message_field, id_field, row_no):
+    """
+    (row id, message) from a raw JSONL line or a CSV row dict. Raises
+    ValueError for rows that can't be parsed.
+    """
+    if isinstance(payload, str):
+        try:
+            payload = loads(payload)
+        except ValueError:
+            raise ValueError("Invalid JSON")
+        if isinstance(payload, str):
+            return row_no, payload
+        if not isinstance(payload, dict):
+            raise ValueError("Row must be a JSON object or string")
+    return payload.get(id_field, row_no), payload.get(message_field)
+
+
+def _score_chunk(chunk, message_field, id_field):
+    """
+    Worker: scores one chunk of (row number, payload) pairs, returning one
+    output record per row (errors in place).
+    """
+    ids, messages, parse_errors = [], [], {}
+    for index, (row_no, payload) in enumerate(chunk):
+        try:
+            row_id, message = _extract(payload, message_field, id_field, row_no)
+        except ValueError as e:
+            row_id, message = row_no, None
+            parse_errors[index] = str(e)
+        ids.append(row_id)
+        messages.append(message)
+
+    results = _service.perform_batch_analysis(messages, 'review')
+    lexicon_version = _service.keyword_extractor.lexicon_version
+    records = []
+    for index, ((row_no, _), row_id, result) in enumerate(zip(chunk, ids, results)):
+        record = {"row": row_no, "id": row_id}
+        if index in parse_errors or 'error' in result:
+            record["error"] = parse_errors.get(index) or result["error"]
+        else:
+            record.update({
+                "lexicon_version": lexicon_version,
+                "classified_state": result["classified_state"],
+                "intensity_score": result["intensity_score"],
+                "sentiment_score": result["sentiment_analysis"]["score"],
+                "sentiment_label": result["sentiment_analysis"]["label"],
+                "state_probabilities": result["state_probabilities"],
+                "keywords": result["extracted_keywords"]
+            })
+        records.append(record)
+    return records
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def read_rows(path, input_format, skip=0):
+    """
+    Yields (row number, payload) lazily: raw lines for JSONL (parsed in the
+    workers), dicts for CSV. Row numbers count data rows from 1; blank JSONL
+    lines are not rows. The first `skip` rows are passed over.
+    """
+    with _open_text(path) as f:
+        rows = csv.DictReader(f) if input_format == 'csv' else (line for line in f if line.strip())
+        for row_no, payload in enumerate(rows, 1):
+            if row_no > skip:
+                yield row_no, payload
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class JsonlWriter:
+    """
+    Appends records to one JSONL file; every write is a durable point.
+    `position` (bytes written) is what the checkpoint records.
+    """
+
+    def __init__(self, path, position=0):
+        if position:
+            self._file = open(path, 'r+b')
+            self._file.truncate(position)
+            self._file.seek(position)
+        else:
+            self._file = open(path, 'wb')
+        self.position = position
+
+    def write(self, records):
+        self._file.write("".join(dumps(record) + "\n" for record in records).encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.position = self._file.tell()
+        return True
+
+    def close(self):
+        self._file.close()
+        return False
+
+
+class ParquetWriter:
+    """
+    Buffers records into Parquet part files of `part_rows` rows in a
+    directory; a write is durable once its part is on disk. `position` is
+    the number of parts written.
+    """
+
+    def __init__(self, path, position=0, part_rows=100000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self.part_rows = part_rows
+        self.position = position
+        self._buffer = []
+        os.makedirs(path, exist_ok=True)
+        # Parts beyond the checkpoint are from an interrupted run
+        for name in os.listdir(path):
+            if name.startswith('part-') and int(name[5:11]) >= position:
+                os.remove(os.path.join(path, name))
+
+    def write(self, records):
+        self._buffer.extend(records)
+        if len(self._buffer) < self.part_rows:
+            return False
+        self._flush()
+        return True
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        table = self._pa.Table.from_pylist(self._buffer)
+        self._pq.write_table(table, os.path.join(self.path, f"part-{self.position:06d}.parquet"))
+        self.position += 1
+        self._buffer = []
+
+    def close(self):
+        flushed = bool(self._buffer)
+        self._flush()
+        return flushed
+
+
+class Checkpoint:
+    """
+    Progress record next to the output, replaced atomically on each save.
+    """
+
+    def __init__(self, path, input_path, input_size, lexicon_version):
+        self.path = path
+        self.state = {
+            "input": input_path,
+            "input_size": input_size,
+            "lexicon_version": lexicon_version,
+            "rows_done": 0,
+            "output_position": 0,
+            "errors": 0,
+            "states": {},
+            "completed": False
+        }
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            saved = json.load(f)
+        for key in ("input", "input_size", "lexicon_version"):
+            if saved.get(key) != self.state[key]:
+                raise SystemExit(f"Cannot resume: checkpoint {key} is {saved.get(key)!r}, "
+                                 f"current is {self.state[key]!r}")
+        self.state = saved
+        return self.state
+
+    def save(self, **updates):
+        self.state.update(updates, updated_at=time.time())
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+def score(args):
+    from nlp.lexicon_registry import get_lexicon
+
+    input_path = os.path.abspath(args.input)
+    input_format = args.input_format or ('csv' if '.csv' in os.path.basename(input_path) else 'jsonl')
+    checkpoint = Checkpoint(args.output.rstrip('/') + ".checkpoint.json", input_path,
+                            os.path.getsize(input_path), get_lexicon().version)
+
+    state = checkpoint.state
+    if args.resume and os.path.exists(checkpoint.path):
+        state = checkpoint.load()
+        if state["completed"]:
+            print(f"Already completed: {state['rows_done']} rows", file=sys.stderr)
+            return state
+        print(f"Resuming after row {state['rows_done']}", file=sys.stderr)
+
+    if args.output_format == 'parquet':
+        writer = ParquetWriter(args.output, state["output_position"], args.part_rows)
+    else:
+        writer = JsonlWriter(args.output, state["output_position"])
+
+    rows_done = state["rows_done"]
+    rows_written = rows_done
+    errors = state["errors"]
+    states = Counter(state["states"])
+    start = time.perf_counter()
+    scored = 0
+    last_report = start
+
+    chunks = chunked(read_rows(input_path, input_format, skip=rows_done), args.chunk_size)
+    max_in_flight = args.workers * 2
+    pending = []
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        while True:
+            # 1. Keep a bounded window of chunks in flight
+            while len(pending) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.append(pool.submit(_score_chunk, chunk, args.message_field, args.id_field))
+            if not pending:
+                break
+
+            # 2. Consume results in input order so the checkpoint is a prefix
+            records = pending.pop(0).result()
+            rows_written += len(records)
+            scored += len(records)
+            for record in records:
+                if "error" in record:
+                    errors += 1
+                else:
+                    states[record["classified_state"]] += 1
+
+            # 3. Checkpoint whenever the output is durable up to this chunk
+            if writer.write(records):
+                rows_done = rows_written
+                checkpoint.save(rows_done=rows_done, output_position=writer.position,
+                                errors=errors, states=dict(states))
+
+            now = time.perf_counter()
+            if now - last_report >= args.progress_interval:
+                last_report = now
+                print(f"{rows_written:,} rows  {scored / (now - start):,.0f} rows/s  {errors:,} errors",
+                      file=sys.stderr)
+
+    writer.close()
+    elapsed = time.perf_counter() - start
+    checkpoint.save(rows_done=rows_written, output_position=writer.position,
+                    errors=errors, states=dict(states), completed=True)
+    return {
+        "rows": rows_written,
+        "scored_this_run": scored,
+        "errors": errors,
+        "states": dict(states),
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(scored / elapsed, 1) if elapsed else None,
+        "workers": args.workers,
+        "lexicon_version": checkpoint.state["lexicon_version"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help="JSONL or CSV archive (.gz accepted)")
+    parser.add_argument('--output', required=True, help="Output JSONL file or Parquet directory")
+    parser.add_argument('--input-format', choices=('jsonl', 'csv'), help="Default: from the file name")
+    parser.add_argument('--output-format', choices=('jsonl', 'parquet'), default='jsonl')
+    parser.add_argument('--message-field', default='message')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=500, help="Rows per task sent to a worker")
+    parser.add_argument('--part-rows', type=int, default=100000, help="Rows per Parquet part file")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint")
+    args = parser.parse_args()
+
+    summary = score(args)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
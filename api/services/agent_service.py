@@ -1,4 +1,6 @@
-from utils.constants import NORMAL, ANXIETY, STRESS, DEPRESSION, CRITICAL
+from utils.constants import NORMAL, ANXIETY, STRESS, DEPRESSION, CRITICAL, ALLOWED_STATES, PRECAUTIONS
+from utils.payload import freeze
+from services.trend_tracker import TRENDS
 
 class AgentService:
     def __init__(self):
@@ -68,10 +70,31 @@ class AgentService:
             CRITICAL: "Urgent"
         }
 
+        # Every response is a pure function of (state, trend): build each one
+        # once, frozen so it can be shared by all requests, with its JSON pre-encoded
+        self._responses = {
+            (state, trend): freeze(self._build_response(state, trend))
+            for state in ALLOWED_STATES for trend in TRENDS
+        }
+        self._precautions = {state: freeze(PRECAUTIONS.get(state, PRECAUTIONS[NORMAL])) for state in ALLOWED_STATES}
+
     def generate_response(self, state, intensity, trend="Stable"):
         """
-        Generates a deterministic, empathetic agent response based on the detected state and session trend.
+        Returns the deterministic, empathetic agent response for the detected
+        state and session trend (a shared, read-only FrozenDict).
+        """
+        response = self._responses.get((state, trend))
+        if response is None:
+            response = freeze(self._build_response(state, trend))
+        return response
+
+    def precautions(self, state):
+        """
+        Precautions for a state, as a shared read-only FrozenList.
         """
+        return self._precautions.get(state) or self._precautions[NORMAL]
+
+    def _build_response(self, state, trend):
         base_message = self.messages.get(state, self.messages[NORMAL])
         
         # Contextual prefix based on trend
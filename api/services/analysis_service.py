@@ -1,78 +1,677 @@
+import logging
+import os
+import time
+import uuid
+from nlp.analysis_context import AnalysisContext
 from nlp.keyword_extractor import KeywordExtractor
+from nlp.preprocessing import split_sentences, split_sentences_fast, truncate_text
 from models.sentiment_model import SentimentAnalyzer
 from models.state_classifier import StateClassifier
-from utils.scoring import calculate_intensity
-from utils.constants import PRECAUTIONS, CRITICAL
+from utils.scoring import calculate_intensity, calculate_intensity_batch
+from utils.cache import LRUCache
+from utils.priority_gate import PriorityGate
+from utils.overload import OverloadController
+from utils.metrics import ANALYSES, ANALYSIS_LATENCY, STAGE_LATENCY, ERRORS
+from utils.constants import (
+    CRITICAL, ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL_SECONDS,
+    TREND_WINDOW, STREAM_TREND_WINDOW, STREAM_EWMA_ALPHA,
+    MAX_ANALYSIS_CHARS, TRUNCATION_CRISIS_SENTENCES, SEGMENT_PREVIEW_CHARS,
+    ANALYSIS_CONCURRENCY, CRISIS_QUEUE_BUDGET_MS, PRIORITY_CRISIS, PRIORITY_ROUTINE,
+    SERVING_MODES, OVERLOAD_BUSY_RATIO, OVERLOAD_QUEUE_DEPTH, OVERLOAD_LATENCY_MS, OVERLOAD_RECOVERY_RATIO, OVERLOAD_STEP_SECONDS,
+    OVERLOAD_RECOVERY_SECONDS
+)
 from services.sos_service import SOSService
+from services.sos_dispatcher import SOSDispatcher
+from services.session_store import get_session_store
+from services.history_store import get_history_store
+from services.trend_tracker import RollingTrend, recent_trend
 from services.agent_service import AgentService
 
+logger = logging.getLogger(__name__)
+
 class AnalysisService:
-    def __init__(self):
+    def __init__(self, enable_sos=True):
         self.keyword_extractor = KeywordExtractor()
-        self.sentiment_analyzer = SentimentAnalyzer()
+        self.sentiment_analyzer = SentimentAnalyzer(self.keyword_extractor)
         self.state_classifier = StateClassifier(self.keyword_extractor)
         self.sos_service = SOSService()
+        # Offline scoring (scripts/score_archive.py) runs without SOS side effects
+        self.sos_dispatcher = SOSDispatcher(self.sos_service) if enable_sos else None
         self.agent_service = AgentService()
+        self.session_store = get_session_store()
+        # Long-term per-user history for the dashboard (None unless HISTORY_STORE is set)
+        self.history_store = get_history_store()
+        self.result_cache = LRUCache(
+            maxsize=int(os.getenv("ANALYSIS_CACHE_SIZE", ANALYSIS_CACHE_SIZE)),
+            ttl=float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", ANALYSIS_CACHE_TTL_SECONDS))
+        )
+        # Longest text analyzed per message, and whether messages are scored per sentence by default
+        self.max_chars = int(os.getenv("MAX_ANALYSIS_CHARS", MAX_ANALYSIS_CHARS))
+        self.segmented_default = os.getenv("SEGMENTED_ANALYSIS", "0") == "1"
+        # States the emotional trend looks back over (streams may ask for a longer window)
+        self.trend_window = int(os.getenv("TREND_WINDOW", TREND_WINDOW))
+        # Analyses running at once (ANALYSIS_CONCURRENCY=0: unlimited); waiting ones are served crisis-first
+        concurrency = int(os.getenv("ANALYSIS_CONCURRENCY", ANALYSIS_CONCURRENCY))
+        self.gate = PriorityGate(concurrency) if concurrency > 0 else None
+        self.crisis_budget = float(os.getenv("CRISIS_QUEUE_BUDGET_MS", CRISIS_QUEUE_BUDGET_MS)) / 1000
+        self.lexicon_sentiment = self.sentiment_analyzer
+        if self.sentiment_analyzer.backend.name != 'lexicon':
+            self.lexicon_sentiment = SentimentAnalyzer(self.keyword_extractor, 'lexicon')
+        # Degraded serving under overload (LOAD_SHEDDING=0 disables it), falling back to lexicon sentiment;
+        # with the lexicon backend already in use that step would shed nothing, so it is skipped
+        modes = SERVING_MODES
+        if self.lexicon_sentiment is self.sentiment_analyzer:
+            modes = tuple(mode for mode in SERVING_MODES if mode != "lexicon_sentiment")
+        self.overload = None
+        if os.getenv("LOAD_SHEDDING", "1") != "0":
+            self.overload = OverloadController(
+                busy_ratio=float(os.getenv("OVERLOAD_BUSY_RATIO", OVERLOAD_BUSY_RATIO)),
+                queue_limit=int(os.getenv("OVERLOAD_QUEUE_DEPTH", OVERLOAD_QUEUE_DEPTH)),
+                latency_ms=float(os.getenv("OVERLOAD_LATENCY_MS", OVERLOAD_LATENCY_MS)),
+                recovery_ratio=float(os.getenv("OVERLOAD_RECOVERY_RATIO", OVERLOAD_RECOVERY_RATIO)),
+                step_seconds=float(os.getenv("OVERLOAD_STEP_SECONDS", OVERLOAD_STEP_SECONDS)),
+                recovery_seconds=float(os.getenv("OVERLOAD_RECOVERY_SECONDS", OVERLOAD_RECOVERY_SECONDS)),
+                modes=modes
+            )
 
-    def _analyze_momentum(self, history):
+    def _analyze_momentum(self, history, window=None):
         """
-        Analyzes the last few interactions to determine emotional momentum.
+        Analyzes the last `window` interactions (default: trend_window) to
+        determine emotional momentum.
         Returns: "Stable", "Spiraling", or "Improving"
         """
-        if not history or len(history) < 2:
-            return "Stable"
-            
-        severity_map = {
-            "Normal": 0,
-            "Stress": 1,
-            "Anxiety": 2,
-            "Depression": 3,
-            "Critical Distress": 4
+        return recent_trend(history or [], window or self.trend_window)
+
+    def screen_crisis(self, message, lexicon=None):
+        """
+        Tier 1: a compiled scan for Critical Distress terms (microseconds).
+        Those terms are never negated, so a hit means the full analysis will
+        classify the message as Critical Distress.
+        """
+        return self.keyword_extractor.has_crisis_terms(message, lexicon)
+
+    def perform_full_analysis(self, message, mode='user', history=[], emergency_contacts=None, session_id=None,
+                              segmented=None, crisis=None, trend_window=None):
+        """
+        `crisis` is the screen_crisis() result if the caller already has it;
+        `trend_window` overrides the number of past states the trend covers.
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        # Tier 1: crisis messages queue SOS before anything else and skip ahead
+        # of routine analyses waiting for a slot
+        if crisis is None:
+            crisis = self.screen_crisis(message)
+            timings['crisis_screen'] = (time.perf_counter() - start) * 1000
+        sos_action = None
+        if crisis:
+            sos_start = time.perf_counter()
+            sos_action = self._sos_action(CRITICAL, emergency_contacts, session_id)
+            timings['sos'] = (time.perf_counter() - sos_start) * 1000
+
+        # Serving mode under load; crisis messages count towards the load but
+        # are always served in full
+        serving_mode = SERVING_MODES[0]
+        if self.overload is not None:
+            serving_mode = self.overload.current(self._queue_depth())
+            if crisis:
+                serving_mode = SERVING_MODES[0]
+
+        try:
+            wait_start = time.perf_counter()
+            acquired = self._acquire_slot(crisis)
+            if self.gate is not None:
+                timings['queue_wait'] = (time.perf_counter() - wait_start) * 1000
+            try:
+                return self._analyze_message(message, mode, history, emergency_contacts, session_id, segmented,
+                                             sos_action, start, timings, serving_mode, trend_window)
+            finally:
+                if acquired:
+                    self.gate.release()
+        finally:
+            if self.overload is not None:
+                self.overload.observe((time.perf_counter() - start) * 1000, self._queue_depth())
+
+    def _analyze_message(self, message, mode, history, emergency_contacts, session_id, segmented, sos_action, start, timings, serving_mode,
+                         trend_window=None):
+        if segmented is None:
+            segmented = self.segmented_default
+
+        # Degraded modes, cumulative: lexicon-only sentiment (whole message), no explanation, user mode
+        level = SERVING_MODES.index(serving_mode)
+        sentiment_analyzer = self.sentiment_analyzer
+        if level >= 1:
+            sentiment_analyzer = self.lexicon_sentiment
+            segmented = False
+        if level >= 3:
+            mode = 'user'
+
+        # Shared per-message state: cleaning and lexicon matching happen once here
+        text, truncation = self._bound_input(message)
+        context = AnalysisContext(text, self.keyword_extractor)
+        context.timings.update(timings)
+
+        # 1-4. Pure analysis stages (served from the result cache when possible)
+        cache_key = self._cache_key(context, segmented, sentiment_analyzer)
+        with context.timed('cache_lookup'):
+            result = self._copy_result(self.result_cache.get(cache_key))
+        if result is None:
+            result = (self._analyze_segmented(context) if segmented
+                      else self._analyze_stages(context, sentiment_analyzer))
+            self.result_cache.put(cache_key, self._copy_result(result))
+
+        # Session trend: the server-side ring buffer stands in for the client-sent history
+        session_unknown = False
+        if session_id:
+            with context.timed('session'):
+                history = self._session_history(session_id, history)
+                session_unknown = not history
+                self.session_store.append(session_id, result['state'], result['intensity'])
+
+        # Trend and SOS side effects are always recomputed, never cached
+        response = self._build_response(context, result, mode, history, emergency_contacts, start, sos_action,
+                                        explain=level < 2, requester=session_id, trend_window=trend_window)
+        response['serving_mode'] = serving_mode
+        if session_id:
+            response['session_id'] = session_id
+            if session_unknown:
+                # Nothing on record and no history sent: the trend starts from scratch
+                response['session_unknown'] = True
+        if truncation:
+            response['input_truncated'] = truncation
+        return response
+
+    def _queue_depth(self):
+        return self.gate.stats()["queued"] if self.gate is not None else 0
+
+    def _acquire_slot(self, crisis):
+        """
+        Waits for a gate slot for the analysis (release it afterwards if this
+        returns True). Crisis messages go to the front of the queue and wait at
+        most the crisis budget; after that they run without a slot.
+        """
+        if self.gate is None:
+            return False
+        if crisis:
+            return self.gate.acquire(PRIORITY_CRISIS, self.crisis_budget)
+        return self.gate.acquire(PRIORITY_ROUTINE)
+
+    def _bound_input(self, message):
+        """
+        Caps the text analyzed per message at max_chars, cut at a sentence
+        boundary. The cut-off part is still screened for crisis terms (one
+        regex pass), and sentences containing them are analyzed too, so
+        truncation can never hide a Critical Distress message.
+        Returns (text to analyze, truncation info or None).
+        """
+        if len(message) <= self.max_chars:
+            return message, None
+
+        head, rest = truncate_text(message, self.max_chars)
+        retained = []
+        lexicon = self.keyword_extractor.lexicon
+        if self.keyword_extractor.has_crisis_terms(rest, lexicon):
+            for sentence in split_sentences_fast(rest):
+                if self.keyword_extractor.has_crisis_terms(sentence, lexicon):
+                    retained.append(sentence)
+                    if len(retained) == TRUNCATION_CRISIS_SENTENCES:
+                        break
+
+        logger.info(f"Message truncated from {len(message)} to {len(head)} characters "
+                    f"({len(retained)} crisis sentences retained)")
+        return "\n".join([head] + retained), {
+            "original_chars": len(message),
+            "analyzed_chars": len(head),
+            "retained_crisis_sentences": len(retained)
         }
-        
-        # Get last 3 states (assuming history is list of dicts with 'classified_state')
-        recent_history = history[-3:]
-        scores = [severity_map.get(item.get('classified_state', 'Normal'), 0) for item in recent_history]
-        
-        if len(scores) < 2:
-            return "Stable"
-            
-        # Compare first and last of the recent window
-        first = scores[0]
-        last = scores[-1]
-        
-        if last > first:
-            return "Spiraling"
-        elif last < first:
-            return "Improving"
-            
-        return "Stable"
-
-    def perform_full_analysis(self, message, mode='user', history=[]):
+
+    def record_history(self, user_id, response):
+        """
+        Appends an analysis response to the user's long-term history (the caller
+        has authenticated the user). A failed write is logged, never allowed to
+        fail the analysis itself.
+        """
+        if self.history_store is None:
+            return
+        try:
+            self.history_store.append(user_id, response['classified_state'], response['intensity_score'],
+                                      response['sentiment_analysis']['score'],
+                                      response['autonomous_action']['sos_triggered'])
+        except Exception as e:
+            ERRORS.inc(source='history')
+            logger.error(f"Failed to record history for user {user_id}: {e}")
+
+    def _session_history(self, session_id, history):
+        """
+        Recent entries for a session (before the current message). A session
+        this process has no record of (new, expired, or kept by another worker
+        with the in-memory store) is seeded from the client's history tail.
+        """
+        recent = self.session_store.recent(session_id)
+        if not recent and history:
+            logger.debug(f"Seeding session {session_id} from {len(history)} client history items")
+            self.session_store.seed(session_id, history)
+            recent = self.session_store.recent(session_id)
+        return recent
+
+    def _analyze_stages(self, context, sentiment_analyzer=None):
+        """
+        Sentiment, keywords, classification and intensity for one message.
+        Depends only on the message text and lexicon, so the result is cacheable.
+        """
         # 1. Sentiment Analysis
-        sentiment = self.sentiment_analyzer.analyze(message)
+        sentiment = (sentiment_analyzer or self.sentiment_analyzer).analyze(context)
         
         # 2. Keyword Extraction
-        keywords = self.keyword_extractor.extract_keywords(message)
+        with context.timed('keyword_extraction'):
+            keywords = self.keyword_extractor.extract_keywords(context)
         
         # 3. Detailed Classification
-        detailed_data = self.state_classifier.get_detailed_classification(message, sentiment['score'])
-        state = detailed_data['classified_state']
-        probabilities = detailed_data['probabilities']
-        keyword_contributions = detailed_data['category_matches']
+        detailed_data = self.state_classifier.get_detailed_classification(context, sentiment['score'])
         
         # 4. Intensity Score
         # We pass the Total match weights (especially Critical weighting) to ensure intensity floor triggers
-        total_match_weight = sum(keyword_contributions.values())
-        intensity = calculate_intensity(sentiment['score'], total_match_weight)
-        
+        with context.timed('scoring'):
+            total_match_weight = sum(detailed_data['category_matches'].values())
+            intensity = calculate_intensity(sentiment['score'], total_match_weight)
+
+        return {
+            "sentiment": sentiment,
+            "keywords": keywords,
+            "state": detailed_data['classified_state'],
+            "probabilities": detailed_data['probabilities'],
+            "keyword_contributions": detailed_data['category_matches'],
+            "negated_keywords": context.matches['negated_keywords'],
+            "fuzzy_corrections": context.matches['fuzzy_corrections'],
+            "intensity": intensity
+        }
+
+    def _analyze_segmented(self, context):
+        """
+        Segmented variant of _analyze_stages: the message is split into
+        sentences (punkt), each sentence is scored on its own, and the results
+        are aggregated into one state, probability set and intensity. Sentence
+        probabilities and intensities are computed together in one vectorized
+        batch (threads would not run this CPU-bound work in parallel).
+        Returns the _analyze_stages result plus a per-sentence breakdown.
+        """
+        # 1. Segmentation
+        with context.timed('segmentation'):
+            sentences = split_sentences(context.text) or [context.text]
+        sentence_contexts = [AnalysisContext(s, self.keyword_extractor, context.lexicon) for s in sentences]
+
+        # 2. Per-sentence sentiment, lexicon scores and state
+        sentiments, contributions, states = [], [], []
+        for sentence_context in sentence_contexts:
+            sentiment = self.sentiment_analyzer.analyze(sentence_context)
+            with sentence_context.timed('classification'):
+                state = self.state_classifier.classify(sentence_context, sentiment['score'])
+            sentiments.append(sentiment)
+            contributions.append(sentence_context.matches['category_matches'])
+            states.append(state)
+
+        # 3. Aggregation: summed scores, token-weighted sentiment, same classification rules
+        keyword_contributions = dict.fromkeys(self.keyword_extractor.categories, 0.0)
+        for matches in contributions:
+            for category, score in matches.items():
+                keyword_contributions[category] = keyword_contributions.get(category, 0.0) + score
+        keyword_contributions = {category: round(score, 2) for category, score in keyword_contributions.items()}
+        sentiment = self.sentiment_analyzer.aggregate(
+            sentiments, [max(1, len(c.tokens)) for c in sentence_contexts], keyword_contributions)
+        with context.timed('classification'):
+            state = self.state_classifier.classify_matches(keyword_contributions, sentiment['score'])
+
+        # 4. Probabilities and intensity for every sentence and the whole message in one batch
+        with context.timed('scoring'):
+            scores = [s['score'] for s in sentiments] + [sentiment['score']]
+            all_contributions = contributions + [keyword_contributions]
+            probabilities = self.state_classifier.get_probabilities_batch(all_contributions, scores)
+            intensities = calculate_intensity_batch(scores, [sum(c.values()) for c in all_contributions])
+
+        keywords, negated, fuzzy = [], [], {}
+        segments = []
+        for index, sentence_context in enumerate(sentence_contexts):
+            matches = sentence_context.matches
+            keywords.extend(k for k in matches['keywords'] if k not in keywords)
+            negated.extend(k for k in matches['negated_keywords'] if k not in negated)
+            fuzzy.update(matches['fuzzy_corrections'])
+            segments.append({
+                "index": index,
+                "text": sentence_context.text[:SEGMENT_PREVIEW_CHARS],
+                "classified_state": states[index],
+                "sentiment_score": sentiments[index]['score'],
+                "intensity_score": intensities[index],
+                "keywords": matches['keywords'],
+                "keyword_contributions": {c: v for c, v in matches['category_matches'].items() if v}
+            })
+            for stage, ms in sentence_context.timings.items():
+                context.timings[stage] = context.timings.get(stage, 0.0) + ms
+
+        return {
+            "sentiment": sentiment,
+            "keywords": keywords,
+            "state": state,
+            "probabilities": probabilities[-1],
+            "keyword_contributions": keyword_contributions,
+            "negated_keywords": negated,
+            "fuzzy_corrections": fuzzy,
+            "intensity": intensities[-1],
+            "segments": segments
+        }
+
+    def warm_up(self, message="I feel a little anxious about tomorrow"):
+        """
+        Runs the analysis stages once (uncached, no SOS) so lazily loaded data
+        is resident before serving, e.g. in a pre-fork server master.
+        """
+        self._analyze_stages(AnalysisContext(message, self.keyword_extractor))
+        if self.lexicon_sentiment is not self.sentiment_analyzer:
+            # Sentiment fallback for degraded serving
+            self._analyze_stages(AnalysisContext(message, self.keyword_extractor), self.lexicon_sentiment)
+        if self.segmented_default:
+            # Loads the punkt model
+            self._analyze_segmented(AnalysisContext(message, self.keyword_extractor))
+
+    @staticmethod
+    def _record_metrics(context, state, mode):
+        """
+        Feeds the stage timings already collected on the context into the
+        metrics histograms (no extra timers on the hot path).
+        """
+        ANALYSES.inc(state=state, mode=mode)
+        for stage, ms in context.timings.items():
+            if stage == 'total':
+                ANALYSIS_LATENCY.observe(ms / 1000, mode=mode)
+            else:
+                STAGE_LATENCY.observe(ms / 1000, stage=stage)
+
+    def _cache_key(self, context, segmented=False, sentiment_analyzer=None):
+        """
+        Normalised message (case and whitespace folded) plus the lexicon version
+        pinned on the context and the sentiment backend, so neither a lexicon
+        reload nor a backend change ever serves stale results. Segmented results
+        are cached separately.
+        """
+        key = (
+            context.lexicon_version,
+            (sentiment_analyzer or self.sentiment_analyzer).backend.name,
+            " ".join(context.lower_text.split())
+        )
+        return key + ('segmented',) if segmented else key
+
+    @staticmethod
+    def _copy_result(result):
+        """
+        Shallow-copies the mutable parts of a stage result so cached entries
+        are never shared with (or modified through) a response.
+        """
+        if result is None:
+            return None
+        return {
+            key: value.copy() if isinstance(value, (dict, list)) else value
+            for key, value in result.items()
+        }
+
+    def cache_stats(self):
+        return self.result_cache.stats()
+
+    def analyze_stream(self, messages, mode='user', window=None, alpha=None, emergency_contacts=None):
+        """
+        Analyzes an iterable of messages lazily, yielding one result per message
+        as soon as it is ready. Each result carries a "stream" block with the
+        rolling trend (window of recent states, EWMA-smoothed intensity); state
+        kept across the stream is bounded, however long it runs. Items that are
+        exceptions (e.g. unparseable input lines) are reported as errors in place.
+        """
+        # An explicit window sets the trend window too; by default a streamed
+        # message gets the trend it would get analyzed on its own
+        tracker = RollingTrend(
+            window=window or int(os.getenv("STREAM_TREND_WINDOW", STREAM_TREND_WINDOW)),
+            alpha=alpha or float(os.getenv("STREAM_EWMA_ALPHA", STREAM_EWMA_ALPHA)),
+            trend_window=window or self.trend_window
+        )
+        for index, message in enumerate(messages):
+            if isinstance(message, Exception):
+                ERRORS.inc(source='stream_item')
+                yield {"index": index, "error": str(message)}
+                continue
+            try:
+                result = self.perform_full_analysis(message, mode, tracker.history(), emergency_contacts,
+                                                    trend_window=tracker.trend_window)
+            except Exception as e:
+                ERRORS.inc(source='stream_item')
+                yield {"index": index, "error": str(e)}
+                continue
+
+            result["stream"] = dict(index=index, **tracker.update(result['classified_state'], result['intensity_score']))
+            yield result
+
+    def perform_batch_analysis(self, messages, mode='user', segmented=None):
+        """
+        Analyzes a list of messages in one call.
+        Lexicon matching, sentiment and classification run per message; probability
+        normalisation and intensity scoring are vectorized over the whole batch.
+        Each item matches perform_full_analysis output (with no history); an item
+        that fails is returned as {"error": ...} without failing the batch.
+        `segmented` defaults to SEGMENTED_ANALYSIS as for single messages;
+        segmented items are scored sentence by sentence (see _analyze_segmented).
+
+        Under load shedding the batch counts as one analysis: it takes one slot
+        and one serving mode for all its items. Crisis items queue their SOS
+        before waiting for the slot and are always served in full.
+        """
+        start = time.perf_counter()
+        # Crisis items in one batch raise a single alert
+        requester = f"batch:{uuid.uuid4().hex}"
+
+        # Tier 1: crisis items queue SOS before anything else
+        sos_actions = {}
+        for index, message in enumerate(messages):
+            if isinstance(message, str) and self.screen_crisis(message):
+                sos_actions[index] = self._sos_action(CRITICAL, None, requester)
+
+        serving_mode = SERVING_MODES[0]
+        if self.overload is not None:
+            serving_mode = self.overload.current(self._queue_depth())
+        wait_ms = 0.0
+        try:
+            wait_start = time.perf_counter()
+            acquired = self._acquire_slot(bool(sos_actions))
+            wait_ms = (time.perf_counter() - wait_start) * 1000
+            try:
+                return self._analyze_batch(messages, mode, segmented, serving_mode, sos_actions, requester)
+            finally:
+                if acquired:
+                    self.gate.release()
+        finally:
+            if self.overload is not None:
+                # Per-message latency, so a large batch doesn't read as overload
+                work_ms = (time.perf_counter() - start) * 1000 - wait_ms
+                self.overload.observe(wait_ms + work_ms / max(1, len(messages)), self._queue_depth())
+
+    def _analyze_batch(self, messages, mode, segmented, serving_mode, sos_actions, requester):
+        if segmented is None:
+            segmented = self.segmented_default
+        # Degraded modes as in _analyze_message; crisis items are served in full
+        level = SERVING_MODES.index(serving_mode)
+        results = [None] * len(messages)
+        truncations = {}
+        cached = []
+        staged = []
+
+        # 1. Per-message stages (cache hits skip straight to response assembly)
+        for index, message in enumerate(messages):
+            try:
+                if not isinstance(message, str) or not message.strip():
+                    raise ValueError("Message must be a non-empty string")
+
+                item_level = 0 if index in sos_actions else level
+                sentiment_analyzer = self.lexicon_sentiment if item_level >= 1 else self.sentiment_analyzer
+                item_segmented = segmented and item_level == 0
+                text, truncations[index] = self._bound_input(message)
+                context = AnalysisContext(text, self.keyword_extractor)
+                cache_key = self._cache_key(context, item_segmented, sentiment_analyzer)
+                result = self._copy_result(self.result_cache.get(cache_key))
+                if result is None and item_segmented:
+                    # Sentence scores are already vectorized per message
+                    result = self._analyze_segmented(context)
+                    self.result_cache.put(cache_key, self._copy_result(result))
+                if result is not None:
+                    cached.append((index, context, result))
+                    continue
+
+                sentiment = sentiment_analyzer.analyze(context)
+                with context.timed('keyword_extraction'):
+                    keywords = self.keyword_extractor.extract_keywords(context)
+                with context.timed('classification'):
+                    keyword_contributions = self.keyword_extractor.get_category_matches(context)
+                    state = self.state_classifier.classify(context, sentiment['score'])
+                staged.append((index, context, cache_key, {
+                    "sentiment": sentiment,
+                    "keywords": keywords,
+                    "state": state,
+                    "keyword_contributions": keyword_contributions,
+                    "negated_keywords": context.matches['negated_keywords'],
+                    "fuzzy_corrections": context.matches['fuzzy_corrections']
+                }))
+            except Exception as e:
+                logger.warning(f"Batch item {index} failed: {e}")
+                ERRORS.inc(source='batch_item')
+                results[index] = {"error": str(e)}
+
+        # 2. Vectorized probabilities and intensity
+        if staged:
+            sentiment_scores = [item[3]['sentiment']['score'] for item in staged]
+            contributions = [item[3]['keyword_contributions'] for item in staged]
+            probabilities = self.state_classifier.get_probabilities_batch(contributions, sentiment_scores)
+            intensities = calculate_intensity_batch(
+                sentiment_scores, [sum(c.values()) for c in contributions]
+            )
+
+            for item, item_probabilities, intensity in zip(staged, probabilities, intensities):
+                index, context, cache_key, result = item
+                result["probabilities"] = item_probabilities
+                result["intensity"] = intensity
+                self.result_cache.put(cache_key, self._copy_result(result))
+                cached.append((index, context, result))
+
+        # 3. Per-message response assembly
+        for index, context, result in cached:
+            try:
+                item_level = 0 if index in sos_actions else level
+                results[index] = self._build_response(context, result, 'user' if item_level >= 3 else mode, [], None,
+                                                      sos_action=sos_actions.get(index), explain=item_level < 2,
+                                                      requester=requester)
+                results[index]['serving_mode'] = SERVING_MODES[item_level]
+                if truncations.get(index):
+                    results[index]['input_truncated'] = truncations[index]
+            except Exception as e:
+                logger.warning(f"Batch item {index} failed: {e}")
+                ERRORS.inc(source='batch_item')
+                results[index] = {"error": str(e)}
+
+        return results
+
+    def _build_response(self, context, result, mode, history, emergency_contacts, start=None, sos_action=None,
+                        explain=True, requester=None, trend_window=None):
+        """
+        Trend, agent response, explanation, SOS and mode filtering shared by the
+        single-message and batch paths. `sos_action` is passed in when the SOS
+        was already queued by the crisis pre-screen; explain=False leaves out
+        the review-mode decision_explanation. `requester` scopes SOS dedup;
+        `trend_window` as for perform_full_analysis.
+        """
+        sentiment = result['sentiment']
+        keywords = result['keywords']
+        state = result['state']
+        probabilities = result['probabilities']
+        keyword_contributions = result['keyword_contributions']
+        intensity = result['intensity']
+
         # 5. Trend Analysis (NEW Phase 8)
-        trend = self._analyze_momentum(history)
+        with context.timed('trend'):
+            trend = self._analyze_momentum(history, trend_window)
         
         # 6. Agent Response (Updated Phase 8)
-        agent_resp = self.agent_service.generate_response(state, intensity, trend)
+        with context.timed('agent_response'):
+            agent_resp = self.agent_service.generate_response(state, intensity, trend)
+        
+        # 7. Precautions (shared, pre-encoded per state)
+        precautions = self.agent_service.precautions(state)
         
-        # 6. Intensity Reasoning Logic
+        # 8. Autonomous Action (SOS) - queued in the background, never blocks the response
+        if sos_action is None:
+            with context.timed('sos'):
+                sos_action = self._sos_action(state, emergency_contacts, requester)
+
+        if start is not None:
+            context.timings['total'] = (time.perf_counter() - start) * 1000
+        self._record_metrics(context, state, mode)
+
+        # Only the fields the mode needs are built
+        if mode == 'user':
+            # Hide heavy analytics for user mode, but keep sentiment/intensity for UI
+            return {
+                "prediction_result": state,
+                "sentiment_analysis": sentiment,
+                "intensity_score": intensity,
+                "classified_state": state,
+                "precautions": precautions,
+                "autonomous_action": sos_action,
+                "agent_response": agent_resp,
+                "lexicon_version": context.lexicon_version,
+                "mode": mode
+            }
+
+        stage_timings = context.stage_timings()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Analysis stage timings (ms): {stage_timings}")
+
+        # 9. Full response for review mode
+        response = {
+            "prediction_result": state,
+            "sentiment_analysis": sentiment,
+            "extracted_keywords": keywords,
+            "classified_state": state,
+            "intensity_score": intensity,
+            "state_probabilities": probabilities,
+            "precautions": precautions,
+            "autonomous_action": sos_action,
+            "decision_explanation": None,
+            "agent_response": agent_resp,
+            "stage_timings_ms": stage_timings,
+            "lexicon_version": context.lexicon_version,
+            "mode": mode
+        }
+        if explain:
+            response["decision_explanation"] = self._explain(state, sentiment, keywords, keyword_contributions,
+                                                             intensity, result.get('negated_keywords', []),
+                                                             result.get('fuzzy_corrections', {}),
+                                                             result.get('segments'))
+        else:
+            del response["decision_explanation"]
+        return response
+
+    def _sos_action(self, state, emergency_contacts, requester=None):
+        """
+        Queues an SOS dispatch for a Critical Distress message and returns the
+        autonomous_action payload. Repeat triggers are only deduplicated per
+        `requester` (the session, or one batch).
+        """
+        if state != CRITICAL:
+            return {"sos_triggered": False, "message": "No emergency action required"}
+        if self.sos_dispatcher is None:
+            return {"sos_triggered": False, "message": "SOS dispatch is disabled for this service"}
+        return self.sos_dispatcher.dispatch(emergency_contacts, requester)
+
+    @staticmethod
+    def _explain(state, sentiment, keywords, keyword_contributions, intensity, negated_keywords=(),
+                 fuzzy_corrections=None, segments=None):
+        """
+        Review-mode decision explanation.
+        """
+        # Intensity Reasoning Logic
         if intensity >= 4.0:
             intensity_reasoning = f"Critical indicators detected with high volume of risk keywords ({len(keywords)}) and significant negative sentiment ({sentiment['score']})."
         elif intensity >= 2.5:
@@ -80,7 +679,7 @@ class AnalysisService:
         else:
             intensity_reasoning = "Stable emotional state with low keyword density and neutral or positive sentiment."
 
-        # 7. Final Decision Summary
+        # Final Decision Summary
         has_keywords = any(count > 0 for count in keyword_contributions.values())
         if state == CRITICAL:
             summary = "The message was classified as Critical Distress due to the presence of emergency/crisis indicators."
@@ -89,49 +688,20 @@ class AnalysisService:
         else:
             summary = f"The message was classified as {state} based primarily on the overall sentiment score of {sentiment['score']}."
 
-        # 8. Precautions
-        precautions = PRECAUTIONS.get(state, PRECAUTIONS["Normal"])
-        
-        # 9. Autonomous Action (SOS)
-        sos_action = {"sos_triggered": False, "message": "No emergency action required"}
-        if state == CRITICAL:
-            sos_action = self.sos_service.trigger_sos()
-            
-        full_response = {
-            "prediction_result": state,
-            "sentiment_analysis": sentiment,
-            "extracted_keywords": keywords,
-            "classified_state": state,
-            "intensity_score": intensity,
-            "state_probabilities": probabilities,
-            "precautions": precautions,
-            "autonomous_action": sos_action,
-            "decision_explanation": {
-                "dominant_state": state,
-                "trigger_keywords": keywords,
-                "keyword_contributions": keyword_contributions,
-                "sentiment_influence": sentiment['score'],
-                "intensity_reasoning": intensity_reasoning,
-                "final_decision_summary": summary
-            },
-            "agent_response": agent_resp,
-            "mode": mode
+        explanation = {
+            "dominant_state": state,
+            "trigger_keywords": keywords,
+            "keyword_contributions": keyword_contributions,
+            # Lexicon terms found but cancelled by a negation ("not anxious")
+            "negated_keywords": list(negated_keywords),
+            # Misspelled tokens matched as lexicon words, down-weighted ({"anxous": "anxious"})
+            "fuzzy_corrections": dict(fuzzy_corrections or {}),
+            "sentiment_influence": sentiment['score'],
+            "intensity_reasoning": intensity_reasoning,
+            "final_decision_summary": summary
         }
-
-        # Filtering based on mode
-        if mode == 'user':
-            # Hide heavy analytics for user mode, but keep sentiment/intensity for UI
-            filtered_response = {
-                "prediction_result": full_response["prediction_result"],
-                "sentiment_analysis": full_response["sentiment_analysis"],  # Added for frontend
-                "intensity_score": full_response["intensity_score"],  # Added for frontend
-                "classified_state": full_response["classified_state"],
-                "precautions": full_response["precautions"],
-                "autonomous_action": full_response["autonomous_action"],
-                "agent_response": full_response["agent_response"],
-                "mode": mode
-            }
-            return filtered_response
-
-        # Return full response for review mode
-        return full_response
+        if segments is not None:
+            # Segmented analysis: per-sentence scores and the sentences that carry the final state
+            explanation["sentences"] = segments
+            explanation["triggering_sentences"] = [s["index"] for s in segments if s["classified_state"] == state]
+        return explanation
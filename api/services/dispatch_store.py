@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from utils.constants import DEFAULT_SOS_DISPATCH_STORE, SOS_DISPATCH_RETENTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISPATCH_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'sos_dispatches.sqlite3')
+)
+
+class DispatchStore:
+    """
+    SOS dispatch records by dispatch ID, with the dedup key each was created
+    under. Records are plain dicts; the dispatcher running a dispatch writes
+    every change with put(), and any worker can read it with get().
+    Records are kept for `retention` seconds.
+    """
+
+    def __init__(self, retention=SOS_DISPATCH_RETENTION_SECONDS):
+        self.retention = retention
+
+    def claim(self, dedup_key, record, window):
+        """
+        Stores a new `record` unless a dispatch with the same dedup_key was
+        created within `window` seconds, which is returned instead (None when
+        `record` was stored). A dedup_key of None never matches.
+        """
+        raise NotImplementedError
+
+    def put(self, record):
+        raise NotImplementedError
+
+    def get(self, dispatch_id):
+        raise NotImplementedError
+
+    @staticmethod
+    def _snapshot(record):
+        return {**record, "contacts": [dict(c) for c in record['contacts']]}
+
+class MemoryDispatchStore(DispatchStore):
+    """
+    In-process store. Dispatches are not visible to other worker processes,
+    so status polls and dedup only work with a single worker.
+    """
+
+    def __init__(self, retention=SOS_DISPATCH_RETENTION_SECONDS):
+        super().__init__(retention)
+        self._lock = threading.Lock()
+        self._records = {}
+        self._recent = {}
+
+    def claim(self, dedup_key, record, window):
+        now = record['created_at']
+        with self._lock:
+            self._prune(now)
+            existing_id = self._recent.get(dedup_key) if dedup_key is not None else None
+            if existing_id and now - self._records[existing_id]['created_at'] < window:
+                return self._snapshot(self._records[existing_id])
+            self._records[record['dispatch_id']] = self._snapshot(record)
+            if dedup_key is not None:
+                self._recent[dedup_key] = record['dispatch_id']
+            return None
+
+    def put(self, record):
+        with self._lock:
+            if record['dispatch_id'] in self._records:
+                self._records[record['dispatch_id']] = self._snapshot(record)
+
+    def get(self, dispatch_id):
+        with self._lock:
+            record = self._records.get(dispatch_id)
+            return self._snapshot(record) if record is not None else None
+
+    def _prune(self, now):
+        """
+        Drops records older than the retention window to bound memory.
+        """
+        expired = [d for d, r in self._records.items() if now - r['created_at'] > self.retention]
+        for dispatch_id in expired:
+            del self._records[dispatch_id]
+        self._recent = {k: d for k, d in self._recent.items() if d in self._records}
+
+class SQLiteDispatchStore(DispatchStore):
+    """
+    Local SQLite store, shared by every worker process on the host, so any
+    worker can answer a status poll and dedup holds across workers.
+    """
+    PRUNE_EVERY = 100
+
+    def __init__(self, path=DEFAULT_DISPATCH_DB_PATH, retention=SOS_DISPATCH_RETENTION_SECONDS):
+        super().__init__(retention)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._claims = 0
+
+    def _connection(self):
+        # Connections must not cross a fork (e.g. a preloading server master)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sos_dispatches ("
+                " dispatch_id TEXT PRIMARY KEY,"
+                " dedup_key TEXT,"
+                " created_at REAL NOT NULL,"
+                " record TEXT NOT NULL"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sos_dispatches_dedup ON sos_dispatches (dedup_key, created_at)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def claim(self, dedup_key, record, window):
+        now = record['created_at']
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = None
+                if dedup_key is not None:
+                    row = conn.execute(
+                        "SELECT record FROM sos_dispatches WHERE dedup_key = ? AND created_at > ?"
+                        " ORDER BY created_at DESC LIMIT 1",
+                        (dedup_key, now - window)
+                    ).fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO sos_dispatches VALUES (?, ?, ?, ?)",
+                        (record['dispatch_id'], dedup_key, now, json.dumps(record))
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._claims += 1
+            if self._claims % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM sos_dispatches WHERE created_at < ?", (now - self.retention,))
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, record):
+        with self._lock:
+            self._connection().execute(
+                "UPDATE sos_dispatches SET record = ? WHERE dispatch_id = ?",
+                (json.dumps(record), record['dispatch_id'])
+            )
+
+    def get(self, dispatch_id):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT record FROM sos_dispatches WHERE dispatch_id = ? AND created_at > ?",
+                (dispatch_id, time.time() - self.retention)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+DISPATCH_STORES = {
+    "memory": MemoryDispatchStore,
+    "sqlite": SQLiteDispatchStore
+}
+
+def get_dispatch_store(name=None):
+    """
+    Builds the configured store (SOS_DISPATCH_STORE env var: "memory" or
+    "sqlite"; SOS_DISPATCH_DB_PATH sets the SQLite file). Run more than one
+    worker process with "sqlite", or status polls can land on a worker that
+    doesn't know the dispatch. Serverless hosts can't share either (and their
+    filesystem is read-only); SOSDispatcher delivers synchronously there.
+    """
+    name = (name or os.getenv("SOS_DISPATCH_STORE", DEFAULT_SOS_DISPATCH_STORE)).lower()
+    if name not in DISPATCH_STORES:
+        raise ValueError(f"Unknown SOS dispatch store '{name}' (available: {', '.join(DISPATCH_STORES)})")
+
+    retention = float(os.getenv("SOS_DISPATCH_RETENTION_SECONDS", SOS_DISPATCH_RETENTION_SECONDS))
+    if name == "sqlite":
+        store = SQLiteDispatchStore(os.getenv("SOS_DISPATCH_DB_PATH", DEFAULT_DISPATCH_DB_PATH), retention)
+    else:
+        store = MemoryDispatchStore(retention)
+    logger.info(f"Using {name} SOS dispatch store")
+    return store
@@ -0,0 +1,54 @@
+import itertools
+import random
+import threading
+import time
+
+class FakeTwilioError(Exception):
+    pass
+
+class FakeMessage:
+    def __init__(self, sid, to, body):
+        self.sid = sid
+        self.to = to
+        self.body = body
+
+class FakeMessages:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, body, from_, to):
+        return self._client._send(body, from_, to)
+
+class FakeTwilioClient:
+    """
+    Offline stand-in for twilio.rest.Client.
+
+    Simulates per-message network latency and transient failures so SOS
+    dispatch concurrency and retry behaviour can be exercised without
+    network access. Enable it for the app with SOS_FAKE_TWILIO=1.
+    """
+
+    def __init__(self, latency=0.2, failure_rate=0.0, fail_first=0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        # Number of initial attempts per recipient that fail before succeeding
+        self.fail_first = fail_first
+        self.messages = FakeMessages(self)
+        self.sent = []
+        self.attempts = {}
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _send(self, body, from_, to):
+        time.sleep(self.latency)
+
+        with self._lock:
+            attempt = self.attempts.get(to, 0) + 1
+            self.attempts[to] = attempt
+            if attempt <= self.fail_first or self._rng.random() < self.failure_rate:
+                raise FakeTwilioError(f"Simulated delivery failure to {to} (attempt {attempt})")
+
+            message = FakeMessage(f"SMFAKE{next(self._ids):08d}", to, body)
+            self.sent.append(message)
+            return message
@@ -0,0 +1,274 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from utils.constants import (
+    DEFAULT_HISTORY_STORE, HISTORY_SERIES_POINTS, HISTORY_DEFAULT_RANGE_SECONDS, ALLOWED_STATES
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'history.sqlite3')
+)
+
+# Rollup levels kept alongside the raw events (bucket width in seconds, UTC-aligned)
+RESOLUTIONS = (("minute", 60), ("hour", 3600), ("day", 86400))
+
+class HistoryStore:
+    """
+    Append-only analysis history per user, with minute, hour and day rollups
+    (count, intensity sum and max, sentiment sum, SOS count and a count per
+    state) updated on every append.
+
+    series() answers a range query from the coarsest rollup that is still
+    finer than the requested point spacing, so the rows read depend on the
+    number of points asked for, not on how much history the user has.
+    """
+
+    def append(self, user_id, classified_state, intensity_score, sentiment_score, sos_triggered=False,
+               timestamp=None):
+        raise NotImplementedError
+
+    def series(self, user_id, start=None, end=None, points=HISTORY_SERIES_POINTS):
+        """
+        Downsampled series over [start, end) (epoch seconds; default: the last
+        HISTORY_DEFAULT_RANGE_SECONDS) in at most `points` buckets. Buckets
+        with no analyses are omitted. When read from a rollup, the range is
+        widened to whole rollup buckets at both ends.
+        """
+        end = time.time() if end is None else end
+        start = end - HISTORY_DEFAULT_RANGE_SECONDS if start is None else start
+        if end <= start:
+            raise ValueError("end must be after start")
+        source, width, first = self._plan(start, end, max(1, points))
+        rows = self._aggregate(user_id, source, width, first, end)
+        return {
+            "user_id": user_id,
+            "start": start,
+            "end": end,
+            "source": source,
+            "bucket_seconds": width,
+            "points": [self._point(first + slot * width, *values) for slot, *values in rows]
+        }
+
+    @staticmethod
+    def _plan(start, end, points):
+        """
+        Picks the rollup to read ("raw" below a minute) and an output bucket
+        width that is a whole multiple of it, with at most `points` buckets.
+        Returns (source, width, first bucket start).
+        """
+        step = (end - start) / points
+        source, resolution = "raw", None
+        for name, seconds in RESOLUTIONS:
+            if seconds <= step:
+                source, resolution = name, seconds
+        if resolution is None:
+            return source, step, start
+        first = start - start % resolution
+        width = math.ceil((end - first) / points / resolution) * resolution
+        return source, width, first
+
+    @staticmethod
+    def _point(bucket_start, count, intensity_sum, intensity_max, sentiment_sum, sos_count, *state_counts):
+        return {
+            "start": bucket_start,
+            "count": count,
+            "intensity_mean": round(intensity_sum / count, 3),
+            "intensity_max": round(intensity_max, 3),
+            "sentiment_mean": round(sentiment_sum / count, 3),
+            "sos_count": sos_count,
+            "states": {state: n for state, n in zip(ALLOWED_STATES, state_counts) if n}
+        }
+
+    def _aggregate(self, user_id, source, width, first, end):
+        """
+        Rows of (slot, count, intensity_sum, intensity_max, sentiment_sum,
+        sos_count, *state_counts) for the non-empty output buckets, in order.
+        """
+        raise NotImplementedError
+
+class MemoryHistoryStore(HistoryStore):
+    """
+    In-process store (not persisted, not shared between worker processes).
+    For development and tests.
+    """
+
+    def __init__(self):
+        self._events = {}
+        self._rollups = {}
+        self._lock = threading.Lock()
+
+    def append(self, user_id, classified_state, intensity_score, sentiment_score, sos_triggered=False,
+               timestamp=None):
+        timestamp = timestamp or time.time()
+        event = (timestamp, classified_state, float(intensity_score), float(sentiment_score), bool(sos_triggered))
+        with self._lock:
+            self._events.setdefault(user_id, []).append(event)
+            for name, seconds in RESOLUTIONS:
+                buckets = self._rollups.setdefault((user_id, name), {})
+                bucket = int(timestamp // seconds * seconds)
+                buckets[bucket] = self._merge(buckets.get(bucket), self._values(*event[1:]))
+
+    @staticmethod
+    def _values(classified_state, intensity_score, sentiment_score, sos_triggered):
+        return [1, intensity_score, intensity_score, sentiment_score, int(sos_triggered)] + \
+               [int(classified_state == state) for state in ALLOWED_STATES]
+
+    @staticmethod
+    def _merge(into, values):
+        if into is None:
+            return list(values)
+        into[0] += values[0]
+        into[1] += values[1]
+        into[2] = max(into[2], values[2])
+        for i in range(3, len(values)):
+            into[i] += values[i]
+        return into
+
+    def _aggregate(self, user_id, source, width, first, end):
+        with self._lock:
+            if source == "raw":
+                items = [(e[0], self._values(*e[1:])) for e in self._events.get(user_id, ())]
+            else:
+                items = list(self._rollups.get((user_id, source), {}).items())
+        slots = {}
+        for timestamp, values in items:
+            if first <= timestamp < end:
+                slot = int((timestamp - first) // width)
+                slots[slot] = self._merge(slots.get(slot), values)
+        return [(slot, *slots[slot]) for slot in sorted(slots)]
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    Local SQLite store, shared by every worker process on the host. Raw events
+    go to an append-only table; each append upserts its minute, hour and day
+    rollup rows in the same transaction.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # Connections must not cross a fork (e.g. a preloading server master)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            state_columns = "".join(f" state_{i} INTEGER NOT NULL DEFAULT 0," for i in range(len(ALLOWED_STATES)))
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history_events ("
+                " user_id TEXT NOT NULL,"
+                " timestamp REAL NOT NULL,"
+                " classified_state TEXT NOT NULL,"
+                " intensity_score REAL NOT NULL,"
+                " sentiment_score REAL NOT NULL,"
+                " sos_triggered INTEGER NOT NULL"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS history_events_user_time ON history_events (user_id, timestamp)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history_rollups ("
+                " user_id TEXT NOT NULL,"
+                " resolution TEXT NOT NULL,"
+                " bucket INTEGER NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " intensity_sum REAL NOT NULL,"
+                " intensity_max REAL NOT NULL,"
+                " sentiment_sum REAL NOT NULL,"
+                " sos_count INTEGER NOT NULL,"
+                f"{state_columns}"
+                " PRIMARY KEY (user_id, resolution, bucket)"
+                ") WITHOUT ROWID"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def append(self, user_id, classified_state, intensity_score, sentiment_score, sos_triggered=False,
+               timestamp=None):
+        timestamp = timestamp or time.time()
+        intensity_score, sentiment_score, sos = float(intensity_score), float(sentiment_score), int(bool(sos_triggered))
+        state_values = [int(classified_state == state) for state in ALLOWED_STATES]
+        state_names = ", ".join(f"state_{i}" for i in range(len(ALLOWED_STATES)))
+        state_updates = ", ".join(f"state_{i} = state_{i} + excluded.state_{i}" for i in range(len(ALLOWED_STATES)))
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO history_events VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, timestamp, classified_state, intensity_score, sentiment_score, sos)
+                )
+                conn.executemany(
+                    f"INSERT INTO history_rollups (user_id, resolution, bucket, count, intensity_sum, intensity_max,"
+                    f" sentiment_sum, sos_count, {state_names})"
+                    f" VALUES (?, ?, ?, 1, ?, ?, ?, ?, {', '.join('?' * len(ALLOWED_STATES))})"
+                    " ON CONFLICT (user_id, resolution, bucket) DO UPDATE SET"
+                    " count = count + 1,"
+                    " intensity_sum = intensity_sum + excluded.intensity_sum,"
+                    " intensity_max = MAX(intensity_max, excluded.intensity_max),"
+                    " sentiment_sum = sentiment_sum + excluded.sentiment_sum,"
+                    f" sos_count = sos_count + excluded.sos_count, {state_updates}",
+                    [(user_id, name, int(timestamp // seconds * seconds), intensity_score, intensity_score,
+                      sentiment_score, sos, *state_values) for name, seconds in RESOLUTIONS]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _aggregate(self, user_id, source, width, first, end):
+        # Output buckets are merged in SQL, so at most `points` rows come back
+        if source == "raw":
+            states = ", ".join("SUM(classified_state = ?)" for _ in ALLOWED_STATES)
+            query = (
+                "SELECT CAST((timestamp - ?) / ? AS INTEGER) AS slot, COUNT(*), SUM(intensity_score),"
+                f" MAX(intensity_score), SUM(sentiment_score), SUM(sos_triggered), {states}"
+                " FROM history_events WHERE user_id = ? AND timestamp >= ? AND timestamp < ?"
+                " GROUP BY slot ORDER BY slot"
+            )
+            params = (first, width, *ALLOWED_STATES, user_id, first, end)
+        else:
+            states = ", ".join(f"SUM(state_{i})" for i in range(len(ALLOWED_STATES)))
+            query = (
+                "SELECT (bucket - ?) / ? AS slot, SUM(count), SUM(intensity_sum), MAX(intensity_max),"
+                f" SUM(sentiment_sum), SUM(sos_count), {states}"
+                " FROM history_rollups WHERE user_id = ? AND resolution = ? AND bucket >= ? AND bucket < ?"
+                " GROUP BY slot ORDER BY slot"
+            )
+            params = (int(first), int(width), user_id, source, int(first), end)
+        with self._lock:
+            return self._connection().execute(query, params).fetchall()
+
+HISTORY_STORES = {
+    "memory": MemoryHistoryStore,
+    "sqlite": SQLiteHistoryStore
+}
+
+def get_history_store(name=None):
+    """
+    Builds the configured store (HISTORY_STORE env var: "sqlite", "memory" or
+    "none", the default, to disable history; HISTORY_DB_PATH sets the SQLite
+    file, which must be on persistent, writable storage shared by the workers).
+    """
+    name = (name or os.getenv("HISTORY_STORE", DEFAULT_HISTORY_STORE)).lower()
+    if name == "none":
+        logger.info("Analysis history is disabled")
+        return None
+    if name not in HISTORY_STORES:
+        raise ValueError(f"Unknown history store '{name}' (available: {', '.join(HISTORY_STORES)}, none)")
+
+    if name == "sqlite":
+        store = SQLiteHistoryStore(os.getenv("HISTORY_DB_PATH", DEFAULT_HISTORY_DB_PATH))
+    else:
+        store = MemoryHistoryStore()
+        logger.warning("Memory history store: history is per process and lost on restart")
+    logger.info(f"Using {name} history store")
+    return store
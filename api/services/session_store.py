@@ -0,0 +1,190 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from utils.cache import LRUCache
+from utils.constants import (
+    DEFAULT_SESSION_STORE, SESSION_HISTORY_SIZE, SESSION_TTL_SECONDS, SESSION_MAX_SESSIONS
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'sessions.sqlite3')
+)
+
+class SessionStore:
+    """
+    Per-session ring buffer of the most recent analyses.
+
+    Entries are {"classified_state", "intensity_score", "timestamp"}, oldest
+    first, so they can stand in for the client-sent history.
+    """
+
+    def __init__(self, capacity=SESSION_HISTORY_SIZE, ttl=SESSION_TTL_SECONDS):
+        self.capacity = capacity
+        self.ttl = ttl
+
+    def recent(self, session_id):
+        raise NotImplementedError
+
+    def append(self, session_id, classified_state, intensity_score, timestamp=None):
+        raise NotImplementedError
+
+    def clear(self, session_id):
+        raise NotImplementedError
+
+    def seed(self, session_id, history):
+        """
+        Fills an empty session from a client-sent history (its last `capacity` items).
+        """
+        for item in history[-self.capacity:]:
+            self.append(session_id, item.get('classified_state', 'Normal'), item.get('intensity_score', 0.0))
+
+    @staticmethod
+    def _entry(classified_state, intensity_score, timestamp):
+        return {
+            "classified_state": classified_state,
+            "intensity_score": intensity_score,
+            "timestamp": timestamp
+        }
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store: a bounded deque per session, with sessions kept in an
+    LRU (at most max_sessions, expiring `ttl` seconds after their last update).
+    Sessions are not shared between worker processes.
+    """
+
+    def __init__(self, capacity=SESSION_HISTORY_SIZE, ttl=SESSION_TTL_SECONDS, max_sessions=SESSION_MAX_SESSIONS):
+        super().__init__(capacity, ttl)
+        self._sessions = LRUCache(maxsize=max_sessions, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def recent(self, session_id):
+        with self._lock:
+            buffer = self._sessions.get(session_id)
+            return list(buffer) if buffer else []
+
+    def append(self, session_id, classified_state, intensity_score, timestamp=None):
+        entry = self._entry(classified_state, intensity_score, timestamp or time.time())
+        with self._lock:
+            buffer = self._sessions.get(session_id)
+            if buffer is None:
+                buffer = deque(maxlen=self.capacity)
+            buffer.append(entry)
+            # Re-inserting refreshes the session's TTL
+            self._sessions.put(session_id, buffer)
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.put(session_id, deque(maxlen=self.capacity))
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Local SQLite store, shared by every worker process on the host.
+    Each session keeps only its last `capacity` rows; sessions idle for longer
+    than `ttl` are pruned periodically.
+    """
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path=DEFAULT_SESSION_DB_PATH, capacity=SESSION_HISTORY_SIZE, ttl=SESSION_TTL_SECONDS):
+        super().__init__(capacity, ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._appends = 0
+
+    def _connection(self):
+        # Connections must not cross a fork (e.g. a preloading server master)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_events ("
+                " session_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " classified_state TEXT NOT NULL,"
+                " intensity_score REAL NOT NULL,"
+                " timestamp REAL NOT NULL,"
+                " PRIMARY KEY (session_id, seq)"
+                ") WITHOUT ROWID"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def recent(self, session_id):
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT classified_state, intensity_score, timestamp FROM session_events"
+                " WHERE session_id = ? AND timestamp > ? ORDER BY seq DESC LIMIT ?",
+                (session_id, time.time() - self.ttl, self.capacity)
+            ).fetchall()
+        return [self._entry(*row) for row in reversed(rows)]
+
+    def append(self, session_id, classified_state, intensity_score, timestamp=None):
+        timestamp = timestamp or time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM session_events WHERE session_id = ?",
+                    (session_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO session_events VALUES (?, ?, ?, ?, ?)",
+                    (session_id, seq, classified_state, float(intensity_score), timestamp)
+                )
+                conn.execute(
+                    "DELETE FROM session_events WHERE session_id = ? AND seq <= ?",
+                    (session_id, seq - self.capacity)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._appends += 1
+            if self._appends % self.PRUNE_EVERY == 0:
+                self._prune(conn)
+
+    def clear(self, session_id):
+        with self._lock:
+            self._connection().execute("DELETE FROM session_events WHERE session_id = ?", (session_id,))
+
+    def _prune(self, conn):
+        cutoff = time.time() - self.ttl
+        conn.execute(
+            "DELETE FROM session_events WHERE session_id IN ("
+            " SELECT session_id FROM session_events GROUP BY session_id HAVING MAX(timestamp) < ?)",
+            (cutoff,)
+        )
+
+SESSION_STORES = {
+    "memory": MemorySessionStore,
+    "sqlite": SQLiteSessionStore
+}
+
+def get_session_store(name=None):
+    """
+    Builds the configured store (SESSION_STORE env var: "memory" or "sqlite";
+    SESSION_DB_PATH sets the SQLite file).
+    """
+    name = (name or os.getenv("SESSION_STORE", DEFAULT_SESSION_STORE)).lower()
+    if name not in SESSION_STORES:
+        raise ValueError(f"Unknown session store '{name}' (available: {', '.join(SESSION_STORES)})")
+
+    capacity = int(os.getenv("SESSION_HISTORY_SIZE", SESSION_HISTORY_SIZE))
+    ttl = float(os.getenv("SESSION_TTL_SECONDS", SESSION_TTL_SECONDS))
+    if name == "sqlite":
+        store = SQLiteSessionStore(os.getenv("SESSION_DB_PATH", DEFAULT_SESSION_DB_PATH), capacity, ttl)
+    else:
+        store = MemorySessionStore(capacity, ttl)
+    logger.info(f"Using {name} session store (capacity {capacity})")
+    return store
@@ -0,0 +1,193 @@
+import logging
+import os
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from services.dispatch_store import get_dispatch_store
+from utils.constants import SOS_DISPATCH_WORKERS, SOS_MAX_RETRIES, SOS_BACKOFF_SECONDS, SOS_DEDUP_WINDOW_SECONDS
+from utils.metrics import ERRORS, SOS_DISPATCHES, SOS_DISPATCH_LATENCY, SOS_DELIVERIES, SOS_SEND_LATENCY
+
+logger = logging.getLogger(__name__)
+
+class SOSDispatcher:
+    """
+    Background SOS fan-out.
+
+    dispatch() records the request and returns immediately with a dispatch ID;
+    a worker pool then sends to every contact concurrently, retrying failed
+    sends with exponential backoff. Repeat triggers from the same requester
+    (session) for the same contacts within the dedup window reuse the existing
+    dispatch instead of sending again.
+
+    Records live in a DispatchStore (see get_dispatch_store); every change is
+    written through, so with a shared store any worker can report a status.
+
+    On serverless hosts (VERCEL set, or SOS_SYNC_DELIVERY=1) nothing may run
+    after the response: the function is frozen once it has answered, and a
+    status poll can land on another instance. There dispatch() waits for every
+    delivery, retries included, and returns the per-contact results with it.
+    """
+
+    def __init__(self, sos_service, max_workers=None, max_retries=None,
+                 backoff_seconds=None, dedup_window=None, store=None, synchronous=None):
+        self.sos_service = sos_service
+        self.max_workers = max_workers or int(os.getenv("SOS_DISPATCH_WORKERS", SOS_DISPATCH_WORKERS))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("SOS_MAX_RETRIES", SOS_MAX_RETRIES))
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else float(os.getenv("SOS_BACKOFF_SECONDS", SOS_BACKOFF_SECONDS))
+        self.dedup_window = dedup_window if dedup_window is not None else float(os.getenv("SOS_DEDUP_WINDOW_SECONDS", SOS_DEDUP_WINDOW_SECONDS))
+        self.store = store or get_dispatch_store()
+        if synchronous is None:
+            synchronous = os.getenv("SOS_SYNC_DELIVERY", "1" if os.getenv("VERCEL") else "0") == "1"
+        self.synchronous = synchronous
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sos")
+        self._lock = threading.Lock()
+
+    def dispatch(self, emergency_contacts=None, requester=None):
+        """
+        Queues an SOS alert and returns the autonomous_action payload right away
+        (or once every contact has settled, when delivering synchronously).
+        `requester` (e.g. the session ID) scopes deduplication; without one
+        every trigger is dispatched, since an alert must never be swallowed
+        by someone else's.
+        """
+        logger.info("!!! SOS TRIGGERED !!!")
+        start = time.perf_counter()
+        try:
+            return self._dispatch(emergency_contacts, requester)
+        finally:
+            SOS_DISPATCH_LATENCY.observe(time.perf_counter() - start)
+
+    def _dispatch(self, emergency_contacts, requester):
+        contacts = self.sos_service.normalize_contacts(emergency_contacts)
+        dedup_key = None
+        if requester:
+            dedup_key = json.dumps([requester, sorted(c.get('phone') or c.get('name', '') for c in contacts)])
+
+        record = {
+            "dispatch_id": uuid.uuid4().hex,
+            "status": "queued",
+            "created_at": time.time(),
+            "completed_at": None,
+            "contacts": [
+                {"name": c.get('name', 'Contact'), "status": "pending", "attempts": 0}
+                for c in contacts
+            ]
+        }
+        if not self.sos_service.is_configured:
+            logger.warning("Twilio not configured. Using Mock Logic.")
+            for result in record['contacts']:
+                result['status'] = "mock_sent"
+            self._finish(record)
+
+        existing = self.store.claim(dedup_key, record, self.dedup_window)
+        if existing is not None:
+            logger.info(f"SOS dispatch {existing['dispatch_id']} reused for repeat trigger")
+            SOS_DISPATCHES.inc(outcome="deduplicated")
+            return self._action(existing, deduplicated=True, contacts=self.synchronous)
+
+        SOS_DISPATCHES.inc(outcome="queued" if self.sos_service.is_configured else "mock")
+        if not self.sos_service.is_configured:
+            SOS_DELIVERIES.inc(len(record['contacts']), status="mock_sent")
+            return self._action(record, deduplicated=False, contacts=self.synchronous)
+
+        action = self._action(record, deduplicated=False)
+        deliveries = [
+            self._executor.submit(self._deliver, record, index, contact)
+            for index, contact in enumerate(contacts)
+        ]
+        if not self.synchronous:
+            return action
+        # Serverless: nothing is left running once the response has gone out
+        wait(deliveries)
+        return self._action(record, deduplicated=False, contacts=True)
+
+    def get_status(self, dispatch_id):
+        """
+        Returns a snapshot of a dispatch with per-contact delivery results, or None.
+        """
+        return self.store.get(dispatch_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _deliver(self, record, index, contact):
+        """
+        Sends to one contact, retrying with exponential backoff and jitter.
+        """
+        result = record['contacts'][index]
+        with self._lock:
+            if record['status'] == "queued":
+                record['status'] = "in_progress"
+                self.store.put(record)
+
+        if not contact.get('phone'):
+            with self._lock:
+                result.update({"status": "skipped", "error": "No phone number"})
+                SOS_DELIVERIES.inc(status="skipped")
+                self._finish_if_done(record)
+                self.store.put(record)
+            return
+
+        for attempt in range(1, self.max_retries + 2):
+            with self._lock:
+                result['attempts'] = attempt
+                self.store.put(record)
+            sent_at = time.perf_counter()
+            try:
+                sid = self.sos_service.send_alert(contact)
+                SOS_SEND_LATENCY.observe(time.perf_counter() - sent_at, result="ok")
+                SOS_DELIVERIES.inc(status="sent")
+                with self._lock:
+                    result.update({"status": "sent", "sid": sid})
+                    result.pop('error', None)
+                    self._finish_if_done(record)
+                    self.store.put(record)
+                return
+            except Exception as e:
+                SOS_SEND_LATENCY.observe(time.perf_counter() - sent_at, result="error")
+                logger.error(f"SOS send to {result['name']} failed (attempt {attempt}): {e}")
+                with self._lock:
+                    result['error'] = str(e)
+                    self.store.put(record)
+                if attempt <= self.max_retries:
+                    delay = self.backoff_seconds * (2 ** (attempt - 1))
+                    time.sleep(delay + random.uniform(0, delay / 2))
+
+        SOS_DELIVERIES.inc(status="failed")
+        ERRORS.inc(source="sos_delivery")
+        with self._lock:
+            result['status'] = "failed"
+            self._finish_if_done(record)
+            self.store.put(record)
+
+    def _finish_if_done(self, record):
+        if all(c['status'] != "pending" for c in record['contacts']):
+            self._finish(record)
+
+    def _finish(self, record):
+        statuses = [c['status'] for c in record['contacts']]
+        delivered = [s for s in statuses if s in ("sent", "mock_sent")]
+        if len(delivered) == len(statuses):
+            record['status'] = "completed"
+        elif delivered:
+            record['status'] = "partial"
+        else:
+            record['status'] = "failed"
+        record['completed_at'] = time.time()
+
+    @staticmethod
+    def _action(record, deduplicated, contacts=False):
+        action = {
+            "sos_triggered": True,
+            "dispatch_id": record['dispatch_id'],
+            "dispatch_status": record['status'],
+            "deduplicated": deduplicated,
+            "message": "Emergency response sequence initiated"
+        }
+        if contacts:
+            action['contacts_notified'] = [dict(c) for c in record['contacts']]
+        return action
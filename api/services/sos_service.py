@@ -1,47 +1,71 @@
 import logging
 import os
-from twilio.rest import Client
 from utils.constants import MOCK_EMERGENCY_CONTACTS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SOS_MESSAGE_BODY = "🚨 EMERGENCY ALERT: This is an automated message from KIDDOO. The user has triggered a mental health SOS. Status: Critical. Please check on them immediately."
+
 class SOSService:
-    def __init__(self):
+    def __init__(self, client=None):
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         self.from_number = os.getenv("TWILIO_PHONE_NUMBER")
-        
-        self.client = None
-        if self.account_sid and self.auth_token:
+
+        self.client = client
+        if self.client is None and os.getenv("SOS_FAKE_TWILIO") == "1":
+            from services.fake_twilio import FakeTwilioClient
+            self.client = FakeTwilioClient(latency=float(os.getenv("SOS_FAKE_TWILIO_LATENCY", "0.2")))
+            self.from_number = self.from_number or "+15005550006"
+            logger.info("Using fake Twilio client for SOS dispatch")
+        elif self.client is None and self.account_sid and self.auth_token:
             try:
+                from twilio.rest import Client
                 self.client = Client(self.account_sid, self.auth_token)
             except Exception as e:
                 logger.error(f"Failed to initialize Twilio Client: {e}")
 
+    @property
+    def is_configured(self):
+        return bool(self.client and self.from_number)
+
+    @staticmethod
+    def normalize_contacts(emergency_contacts=None):
+        """
+        Returns contacts as dicts; plain strings (as in MOCK_EMERGENCY_CONTACTS) become names.
+        """
+        contacts = emergency_contacts if emergency_contacts else MOCK_EMERGENCY_CONTACTS
+        return [c if isinstance(c, dict) else {"name": str(c)} for c in contacts]
+
+    def send_alert(self, contact):
+        """
+        Sends one SOS SMS. Returns the message SID; raises on delivery failure.
+        """
+        message = self.client.messages.create(
+            body=SOS_MESSAGE_BODY,
+            from_=self.from_number,
+            to=contact['phone']
+        )
+        logger.info(f"SMS sent to {contact.get('name', 'Contact')} ({contact['phone']}): {message.sid}")
+        return message.sid
+
     def trigger_sos(self, emergency_contacts=None):
         """
         Triggers SOS alert via Twilio SMS.
         """
         logger.info("!!! SOS TRIGGERED !!!")
-        contacts = emergency_contacts if emergency_contacts else MOCK_EMERGENCY_CONTACTS
-        
+        contacts = self.normalize_contacts(emergency_contacts)
+
         results = []
-        if self.client and self.from_number:
+        if self.is_configured:
             for contact in contacts:
+                name = contact.get('name', 'Contact')
                 try:
-                    name = contact.get('name', 'Contact')
-                    phone = contact.get('phone')
-                    
-                    if phone:
-                        message = self.client.messages.create(
-                            body=f"🚨 EMERGENCY ALERT: This is an automated message from KIDDOO. The user has triggered a mental health SOS. Status: Critical. Please check on them immediately.",
-                            from_=self.from_number,
-                            to=phone
-                        )
-                        logger.info(f"SMS sent to {name} ({phone}): {message.sid}")
-                        results.append({"name": name, "status": "sent", "sid": message.sid})
+                    if contact.get('phone'):
+                        sid = self.send_alert(contact)
+                        results.append({"name": name, "status": "sent", "sid": sid})
                 except Exception as e:
                     logger.error(f"Failed to send SMS to {contact}: {e}")
                     results.append({"name": name, "status": "failed", "error": str(e)})
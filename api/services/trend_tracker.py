@@ -0,0 +1,84 @@
+from collections import deque
+from utils.constants import TREND_WINDOW, STREAM_TREND_WINDOW, STREAM_EWMA_ALPHA
+
+# Ordinal severity of each state, used for trend direction
+SEVERITY_MAP = {
+    "Normal": 0,
+    "Stress": 1,
+    "Anxiety": 2,
+    "Depression": 3,
+    "Critical Distress": 4
+}
+
+# Possible momentum() results
+TRENDS = ("Stable", "Spiraling", "Improving")
+
+def momentum(scores):
+    """
+    Direction of a window of severity scores (oldest first): the mean of the
+    newest half against the mean of the oldest half. For three scores this
+    is simply last vs. first.
+    Returns: "Stable", "Spiraling", or "Improving"
+    """
+    half = len(scores) // 2
+    if half == 0:
+        return "Stable"
+
+    older = sum(scores[:half]) / half
+    newer = sum(scores[-half:]) / half
+    if newer > older:
+        return "Spiraling"
+    elif newer < older:
+        return "Improving"
+    return "Stable"
+
+def recent_trend(history, window=TREND_WINDOW):
+    """
+    Trend of the last `window` entries of a history in the client format
+    ({"classified_state", ...}, oldest first). Every path computes the trend
+    this way, so a message gets the same trend however it is analyzed.
+    """
+    if len(history) < 2:
+        return "Stable"
+    return momentum([SEVERITY_MAP.get(item.get('classified_state', 'Normal'), 0) for item in history[-window:]])
+
+class RollingTrend:
+    """
+    Constant-memory trend over a message stream: a fixed-size window of
+    severity scores and an exponentially weighted moving average of intensity.
+    The trend itself is recent_trend() of the last `trend_window` entries
+    before the current one (default: the whole window), as for a single
+    message analyzed with that history and trend window.
+    """
+
+    def __init__(self, window=STREAM_TREND_WINDOW, alpha=STREAM_EWMA_ALPHA, trend_window=None):
+        self.window = window
+        self.trend_window = trend_window or window
+        self.alpha = alpha
+        self.count = 0
+        self.smoothed_intensity = None
+        self._entries = deque(maxlen=max(window, self.trend_window))
+
+    def history(self):
+        """
+        Window entries in the client history format ({"classified_state", ...}).
+        """
+        return list(self._entries)
+
+    def update(self, classified_state, intensity):
+        trend = recent_trend(self.history(), self.trend_window)
+        self.count += 1
+        self._entries.append({"classified_state": classified_state, "intensity_score": intensity})
+
+        if self.smoothed_intensity is None:
+            self.smoothed_intensity = intensity
+        else:
+            self.smoothed_intensity = self.alpha * intensity + (1 - self.alpha) * self.smoothed_intensity
+
+        scores = [SEVERITY_MAP.get(e["classified_state"], 0) for e in self._entries][-self.window:]
+        return {
+            "trend": trend,
+            "window_size": len(scores),
+            "window_severity": round(sum(scores) / len(scores), 2),
+            "smoothed_intensity": round(self.smoothed_intensity, 2)
+        }
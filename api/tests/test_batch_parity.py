@@ -0,0 +1,110 @@
+"""
+Batch analysis parity: the vectorized probability and intensity scoring and
+/api/analyze/batch results match the per-message path item for item.
+
+Usage: python -m pytest tests (from api/)
+"""
+import itertools
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from models.state_classifier import StateClassifier
+from services.analysis_service import AnalysisService
+from utils.scoring import calculate_intensity, calculate_intensity_batch
+
+GOLDEN_PATH = os.path.join(API_DIR, 'benchmarks', 'fixtures', 'golden_corpus.jsonl')
+
+# Fractional counts come from context scoring (x1.5, x0.5) and fuzzy hits
+COUNTS = (0, 0.5, 1, 1.5, 2, 3)
+SENTIMENTS = (-0.9, -0.5, -0.3, -0.2, 0.0, 0.2, 0.25, 0.8)
+FIELDS = ("classified_state", "state_probabilities", "intensity_score", "sentiment_analysis",
+          "extracted_keywords", "prediction_result", "serving_mode")
+
+
+def golden_messages():
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        return [json.loads(line)["message"] for line in f if line.strip()]
+
+
+@pytest.fixture(scope="module")
+def service():
+    # Uncached and unshed, so every batch item goes through the vectorized path
+    saved = {key: os.environ.get(key) for key in ("ANALYSIS_CACHE_SIZE", "LOAD_SHEDDING")}
+    os.environ.update(ANALYSIS_CACHE_SIZE="0", LOAD_SHEDDING="0")
+    try:
+        yield AnalysisService(enable_sos=False)
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def test_probabilities_batch_matches_scalar():
+    cases = [
+        ({"Anxiety": a, "Stress": s, "Depression": d, "Critical Distress": c}, sentiment)
+        for a, s, d in itertools.product(COUNTS, repeat=3)
+        for c in (0, 1)
+        for sentiment in SENTIMENTS
+    ]
+    classifier = StateClassifier.__new__(StateClassifier)
+    batch = classifier.get_probabilities_batch([m for m, _ in cases], [s for _, s in cases])
+
+    for (matches, sentiment), probabilities in zip(cases, batch):
+        classifier.keyword_extractor = SimpleNamespace(lexicon=None, get_category_matches=lambda context: matches)
+        assert classifier.get_probabilities("", sentiment) == probabilities, (matches, sentiment)
+        assert sum(probabilities.values()) == 100
+
+
+def test_probabilities_round_half_to_even():
+    # Normal 10 / Anxiety 15 / Stress 5 / Depression 10 of 40: 25, 37.5, 12.5, 25 percent
+    classifier = StateClassifier.__new__(StateClassifier)
+    matches = {"Anxiety": 1, "Depression": 0.5}
+    [probabilities] = classifier.get_probabilities_batch([matches], [0.0])
+    assert probabilities == {"Normal": 25, "Anxiety": 38, "Stress": 12, "Depression": 25, "Critical Distress": 0}
+
+
+def test_intensity_batch_matches_scalar():
+    counts = [0, 0.5, 1, 1.5, 2, 4.5, 5, 9.5, 10, 12]
+    sentiments = [-1.0, -0.52, -0.5, -0.04, 0.0, 0.04, 0.36, 1.0]
+    cases = list(itertools.product(sentiments, counts))
+    batch = calculate_intensity_batch([s for s, _ in cases], [c for _, c in cases])
+    assert batch == [calculate_intensity(s, c) for s, c in cases]
+
+
+@pytest.mark.parametrize("mode", ["user", "review"])
+def test_batch_matches_single_analysis(service, mode):
+    messages = golden_messages()
+    results = service.perform_batch_analysis(messages, mode=mode, segmented=False)
+    assert len(results) == len(messages)
+    for message, result in zip(messages, results):
+        single = service.perform_full_analysis(message, mode=mode, segmented=False)
+        for field in FIELDS:
+            assert result.get(field) == single.get(field), (message, field)
+
+
+def test_segmented_batch_matches_single_analysis(service):
+    messages = [m for m in golden_messages() if m.count('.') >= 2][:5]
+    assert messages
+    results = service.perform_batch_analysis(messages, mode='review', segmented=True)
+    for message, result in zip(messages, results):
+        single = service.perform_full_analysis(message, mode='review', segmented=True)
+        assert result["decision_explanation"]["sentences"] == single["decision_explanation"]["sentences"]
+        for field in FIELDS:
+            assert result.get(field) == single.get(field), (message, field)
+
+
+def test_bad_batch_item_is_reported_in_place(service):
+    results = service.perform_batch_analysis(["I feel anxious", None, "I am fine"])
+    assert "error" in results[1]
+    assert results[0]["classified_state"] == "Anxiety"
+    assert "error" not in results[2]
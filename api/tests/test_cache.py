@@ -0,0 +1,149 @@
+"""
+Analysis result cache: LRU eviction, TTL expiry and the cache key.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from models.sentiment_model import SentimentAnalyzer
+from nlp.analysis_context import AnalysisContext
+from services.analysis_service import AnalysisService
+from utils import cache
+from utils.cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture(scope="module")
+def service():
+    return AnalysisService(enable_sos=False)
+
+
+def test_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+
+def test_put_refreshes_recency():
+    lru = LRUCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.put("a", 10)
+    lru.put("c", 3)
+    assert lru.get("a") == 10
+    assert lru.get("b") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=5)
+    lru.put("a", 1)
+    clock.now += 4.9
+    assert lru.get("a") == 1
+    clock.now += 0.1
+    assert lru.get("a") is None
+    assert len(lru) == 0
+    assert lru.stats()["expirations"] == 1
+
+
+def test_ttl_runs_from_last_put(clock):
+    lru = LRUCache(maxsize=10, ttl=5)
+    lru.put("a", 1)
+    clock.now += 4
+    lru.put("a", 2)
+    clock.now += 4
+    assert lru.get("a") == 2
+
+
+def test_no_ttl_never_expires(clock):
+    lru = LRUCache(maxsize=10)
+    lru.put("a", 1)
+    clock.now += 10 ** 9
+    assert lru.get("a") == 1
+
+
+def test_maxsize_zero_disables_caching():
+    lru = LRUCache(maxsize=0)
+    lru.put("a", 1)
+    assert lru.get("a") is None
+    assert lru.stats()["size"] == 0
+
+
+def test_stats_count_hits_and_misses():
+    lru = LRUCache(maxsize=10)
+    lru.put("a", 1)
+    lru.get("a")
+    lru.get("b")
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_key_folds_case_and_whitespace(service):
+    key = service._cache_key(AnalysisContext("I feel  Anxious\n", service.keyword_extractor))
+    assert key == service._cache_key(AnalysisContext("i feel anxious", service.keyword_extractor))
+    assert key != service._cache_key(AnalysisContext("i feel anxious!", service.keyword_extractor))
+
+
+def test_key_includes_lexicon_version(service):
+    v1 = AnalysisContext("I feel anxious", lexicon=SimpleNamespace(version="v1"))
+    v2 = AnalysisContext("I feel anxious", lexicon=SimpleNamespace(version="v2"))
+    assert service._cache_key(v1) != service._cache_key(v2)
+    assert service._cache_key(v1)[0] == "v1"
+
+
+def test_key_includes_sentiment_backend_and_segmentation(service):
+    context = AnalysisContext("I feel anxious", service.keyword_extractor)
+    textblob = SentimentAnalyzer(service.keyword_extractor, 'textblob')
+    keys = {
+        service._cache_key(context, False, service.lexicon_sentiment),
+        service._cache_key(context, False, textblob),
+        service._cache_key(context, True, service.lexicon_sentiment),
+    }
+    assert len(keys) == 3
+
+
+def test_repeat_analysis_is_served_from_cache(service):
+    service.result_cache.clear()
+    before = service.cache_stats()["hits"]
+    first = service.perform_full_analysis("Exams make me so anxious")
+    second = service.perform_full_analysis("exams make me   so ANXIOUS")
+    assert service.cache_stats()["hits"] == before + 1
+    for field in ("classified_state", "intensity_score", "sentiment_analysis", "extracted_keywords"):
+        assert first.get(field) == second.get(field)
+
+
+def test_cached_results_are_not_shared(service):
+    service.result_cache.clear()
+    first = service.perform_full_analysis("I feel hopeless", mode='review')
+    first['extracted_keywords'].append("tampered")
+    first['state_probabilities']['Normal'] = 99
+    second = service.perform_full_analysis("I feel hopeless", mode='review')
+    assert "tampered" not in second['extracted_keywords']
+    assert second['state_probabilities']['Normal'] != 99
@@ -0,0 +1,71 @@
+"""
+Negation scope regressions for context-aware keyword scoring.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.keyword_extractor import KeywordExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return KeywordExtractor(context_scoring=True, fuzzy_matching=False)
+
+
+# Distress said with a negation in it must still count (and counts more)
+@pytest.mark.parametrize("message, category, keyword", [
+    ("I can't stop crying", "Depression", "crying"),
+    ("I never stop feeling anxious", "Anxiety", "anxious"),
+    ("I can't handle this stress anymore", "Stress", "stress"),
+    ("I couldn't stop worrying", "Anxiety", "worrying"),
+])
+def test_inability_phrases_strengthen(extractor, message, category, keyword):
+    result = extractor.match(message)
+    assert keyword in result["keywords"]
+    assert keyword not in result["negated_keywords"]
+    assert result["category_matches"][category] > 1.0
+
+
+def test_comma_ends_negation_scope(extractor):
+    result = extractor.match("I am not stressed, just tired")
+    assert result["negated_keywords"] == ["stressed"]
+    assert "tired" in result["keywords"]
+    assert result["category_matches"]["Stress"] == 1.0
+
+
+@pytest.mark.parametrize("message, keyword", [
+    ("I am not anxious", "anxious"),
+    ("I don't feel very stressed", "stressed"),
+    ("I am not at all anxious", "anxious"),
+    ("I'm not really sad", "sad"),
+    ("I don't feel hopeless", "hopeless"),
+])
+def test_negation_before_term(extractor, message, keyword):
+    assert extractor.match(message)["negated_keywords"] == [keyword]
+
+
+def test_clause_word_ends_negation_scope(extractor):
+    result = extractor.match("I'm not sad but I am tired")
+    assert result["negated_keywords"] == ["sad"]
+    assert "tired" in result["keywords"]
+
+
+def test_distant_negation_does_not_cancel(extractor):
+    # Only scope words may sit between a negation and the term it negates
+    result = extractor.match("I didn't sleep and now I'm exhausted")
+    assert "exhausted" in result["keywords"]
+    assert result["negated_keywords"] == []
+
+
+def test_crisis_terms_never_negated(extractor):
+    result = extractor.match("I don't want to die")
+    assert result["negated_keywords"] == []
+    assert result["category_matches"]["Critical Distress"] > 0
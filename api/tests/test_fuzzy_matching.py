@@ -0,0 +1,108 @@
+"""
+Typo-tolerant lexicon matching: SymSpell corrections and their guards.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.fuzzy_index import FuzzyIndex, edit_distance
+from nlp.keyword_extractor import KeywordExtractor
+
+VOCABULARY = ["anxious", "stressed", "hopeless", "lonely", "die", "sad", "suicidal", "overwhelmed"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzyIndex(VOCABULARY, known=["said", "hike"])
+
+
+@pytest.fixture(scope="module")
+def fuzzy():
+    return KeywordExtractor(context_scoring=True, fuzzy_matching=True)
+
+
+@pytest.fixture(scope="module")
+def exact():
+    return KeywordExtractor(context_scoring=True, fuzzy_matching=False)
+
+
+@pytest.mark.parametrize("token, word", [
+    ("anxous", "anxious"),
+    ("stresed", "stressed"),
+    ("hopless", "hopeless"),
+    ("lonley", "lonely"),
+    ("overwhlemed", "overwhelmed"),
+    ("overwhlmd", "overwhelmed"),
+])
+def test_corrects_misspellings(index, token, word):
+    assert index.correct(token) == word
+
+
+@pytest.mark.parametrize("token", ["dei", "dye", "sda"])
+def test_short_tokens_are_never_corrected(index, token):
+    # Below min_length (4) nothing is corrected, though each is one edit from "die" or "sad"
+    assert index.correct(token) is None
+    assert index.correct("sadd") == "sad"
+
+
+def test_short_tokens_allow_one_edit(index):
+    # Under long_length (8) characters only one edit is allowed
+    assert index.correct("anxus") is None
+    assert index.correct("lonly") == "lonely"
+
+
+@pytest.mark.parametrize("token", ["said", "hiking", "hikes"])
+def test_known_words_are_never_corrected(index, token):
+    assert index.correct(token) is None
+
+
+def test_vocabulary_words_are_left_alone(index):
+    tokens = ["i", "am", "suicidal", "and", "sad"]
+    corrected, corrections = index.correct_tokens(tokens)
+    assert corrected is tokens
+    assert corrections == {}
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("anxoius", "anxious", 2) == 1
+    assert edit_distance("hopeless", "hopeless", 2) == 0
+    assert edit_distance("abc", "xyz", 1) == 2
+
+
+@pytest.mark.parametrize("message", [
+    "I want to kill myself",
+    "I just want to die",
+    "I feel suicidal",
+])
+def test_crisis_terms_are_not_corrected_or_down_weighted(fuzzy, exact, message):
+    result = fuzzy.match(message)
+    assert result["fuzzy_corrections"] == {}
+    assert result["category_matches"] == exact.match(message)["category_matches"]
+    assert result["category_matches"]["Critical Distress"] > 0
+
+
+@pytest.mark.parametrize("message", ["I want to dye my hair", "I said I was fine", "We went hiking"])
+def test_no_false_hits_from_real_words(fuzzy, exact, message):
+    result = fuzzy.match(message)
+    assert result["fuzzy_corrections"] == {}
+    assert result["category_matches"] == exact.match(message)["category_matches"]
+
+
+def test_fuzzy_hits_are_down_weighted(fuzzy, exact):
+    result = fuzzy.match("i feel hopless")
+    assert result["fuzzy_corrections"] == {"hopless": "hopeless"}
+    assert result["category_matches"]["Depression"] == pytest.approx(fuzzy.fuzzy_weight)
+    assert exact.match("i feel hopless")["keywords"] == []
+
+
+def test_misspelled_crisis_term_counts_at_fuzzy_weight(fuzzy, exact):
+    fuzzy_score = fuzzy.match("i am suicdal")["category_matches"]["Critical Distress"]
+    exact_score = exact.match("i am suicidal")["category_matches"]["Critical Distress"]
+    assert fuzzy_score == pytest.approx(exact_score * fuzzy.fuzzy_weight)
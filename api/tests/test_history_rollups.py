@@ -0,0 +1,115 @@
+"""
+Analysis history: minute, hour and day rollups and the downsampled series,
+for both the memory and SQLite stores.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from services.history_store import MemoryHistoryStore, SQLiteHistoryStore, get_history_store
+
+# Midnight UTC, so minute, hour and day buckets all start here
+DAY = 1700006400
+HOUR = 3600
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteHistoryStore(str(tmp_path / "history.sqlite3"))
+    return MemoryHistoryStore()
+
+
+def summary(series):
+    return [(p["start"], p["count"]) for p in series["points"]]
+
+
+def test_sub_minute_spacing_reads_raw_events(store):
+    store.append("u1", "Anxiety", 40, -0.2, timestamp=DAY + 10.5)
+    store.append("u1", "Stress", 60, -0.4, timestamp=DAY + 10.9)
+    series = store.series("u1", DAY, DAY + 100, points=100)
+    assert (series["source"], series["bucket_seconds"]) == ("raw", 1.0)
+    assert summary(series) == [(DAY + 10, 2)]
+
+
+def test_minute_rollup_buckets(store):
+    store.append("u1", "Anxiety", 40, -0.2, timestamp=DAY + 10)
+    store.append("u1", "Depression", 80, -0.6, sos_triggered=True, timestamp=DAY + 59)
+    store.append("u1", "Anxiety", 20, 0.1, timestamp=DAY + 60)
+    series = store.series("u1", DAY, DAY + HOUR, points=60)
+
+    assert (series["source"], series["bucket_seconds"]) == ("minute", 60)
+    [first, second] = series["points"]
+    assert (first["start"], first["count"], second["start"], second["count"]) == (DAY, 2, DAY + 60, 1)
+    assert first["intensity_mean"] == 60
+    assert first["intensity_max"] == 80
+    assert first["sentiment_mean"] == -0.4
+    assert first["sos_count"] == 1
+    assert first["states"] == {"Anxiety": 1, "Depression": 1}
+
+
+def test_hour_rollup_buckets(store):
+    for offset in (100, HOUR - 1, HOUR, 5 * HOUR + 30):
+        store.append("u1", "Stress", 50, -0.3, timestamp=DAY + offset)
+    series = store.series("u1", DAY, DAY + 24 * HOUR, points=24)
+    assert (series["source"], series["bucket_seconds"]) == ("hour", HOUR)
+    assert summary(series) == [(DAY, 2), (DAY + HOUR, 1), (DAY + 5 * HOUR, 1)]
+
+
+def test_day_rollup_buckets(store):
+    for offset in (0, 86399, 86400, 10 * 86400):
+        store.append("u1", "Normal", 10, 0.5, timestamp=DAY + offset)
+    series = store.series("u1", DAY, DAY + 30 * 86400, points=30)
+    assert (series["source"], series["bucket_seconds"]) == ("day", 86400)
+    assert summary(series) == [(DAY, 2), (DAY + 86400, 1), (DAY + 10 * 86400, 1)]
+
+
+def test_output_buckets_are_whole_multiples_of_the_rollup(store):
+    for hour in range(24):
+        store.append("u1", "Stress", 50, -0.3, timestamp=DAY + hour * HOUR + 1)
+    series = store.series("u1", DAY, DAY + 24 * HOUR, points=10)
+    # 8640s spacing reads the hour rollup, merged three hours to a point
+    assert (series["source"], series["bucket_seconds"]) == ("hour", 3 * HOUR)
+    assert summary(series) == [(DAY + i * 3 * HOUR, 3) for i in range(8)]
+
+
+def test_range_is_widened_to_whole_rollup_buckets(store):
+    store.append("u1", "Anxiety", 40, -0.2, timestamp=DAY + 100)
+    series = store.series("u1", DAY + HOUR // 2, DAY + 2 * HOUR, points=1)
+    # The hour bucket holding the start is read whole, so the earlier event counts
+    assert (series["source"], series["start"]) == ("hour", DAY + HOUR // 2)
+    assert summary(series) == [(DAY, 1)]
+
+
+def test_end_is_exclusive_and_users_are_separate(store):
+    store.append("u1", "Anxiety", 40, -0.2, timestamp=DAY + HOUR)
+    store.append("u2", "Anxiety", 40, -0.2, timestamp=DAY + 10)
+    assert store.series("u1", DAY, DAY + HOUR, points=60)["points"] == []
+    assert summary(store.series("u2", DAY, DAY + HOUR, points=60)) == [(DAY, 1)]
+
+
+def test_end_must_be_after_start(store):
+    with pytest.raises(ValueError):
+        store.series("u1", DAY, DAY)
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    SQLiteHistoryStore(path).append("u1", "Depression", 70, -0.5, timestamp=DAY + 10)
+    series = SQLiteHistoryStore(path).series("u1", DAY, DAY + 86400, points=24)
+    assert summary(series) == [(DAY, 1)]
+
+
+def test_factory_defaults_to_disabled(monkeypatch):
+    monkeypatch.delenv("HISTORY_STORE", raising=False)
+    assert get_history_store() is None
+    assert isinstance(get_history_store("memory"), MemoryHistoryStore)
+    with pytest.raises(ValueError):
+        get_history_store("redis")
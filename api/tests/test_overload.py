@@ -0,0 +1,144 @@
+"""
+Overload controller: serving mode steps and recovery hysteresis.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from utils import overload
+from utils.constants import SERVING_MODES
+from utils.overload import OverloadController
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(overload.time, "monotonic", clock)
+    return clock
+
+
+def make_controller(**kwargs):
+    # alpha=1: the latency and queue averages are the latest sample
+    options = dict(busy_ratio=0.9, queue_limit=10, latency_ms=100, recovery_ratio=0.5,
+                   step_seconds=1.0, recovery_seconds=3.0, alpha=1.0)
+    options.update(kwargs)
+    return OverloadController(**options)
+
+
+def serve(controller, clock, latency_ms, seconds=0.5, queued=0):
+    """
+    One analysis taking no busy time, then `seconds` later; returns the mode it got.
+    """
+    mode = controller.current(queued)
+    controller.observe(latency_ms, queued)
+    clock.now += seconds
+    return mode
+
+
+def test_steps_down_one_mode_per_step(clock):
+    controller = make_controller()
+    assert serve(controller, clock, 10) == "full"
+    modes = [serve(controller, clock, 300) for _ in range(8)]
+    # At most one step per step_seconds, down to the last mode and no further
+    assert modes == ["full", "lexicon_sentiment", "no_explanation", "no_explanation",
+                     "user_only", "user_only", "user_only", "user_only"]
+    assert controller.stats()["level"] == len(SERVING_MODES) - 1
+
+
+def test_queue_depth_triggers_step(clock):
+    controller = make_controller()
+    serve(controller, clock, 10, queued=20)
+    assert controller.stats()["mode"] == "lexicon_sentiment"
+
+
+def test_pressure_between_thresholds_holds_mode(clock):
+    controller = make_controller()
+    serve(controller, clock, 300)
+    assert controller.stats()["mode"] == "lexicon_sentiment"
+    # Above recovery_ratio but below 1.0: neither steps down nor recovers
+    for _ in range(20):
+        serve(controller, clock, 70)
+    assert controller.stats()["mode"] == "lexicon_sentiment"
+
+
+def test_recovers_one_step_per_calm_period(clock):
+    controller = make_controller()
+    for _ in range(3):
+        serve(controller, clock, 300)
+    assert controller.stats()["mode"] == "no_explanation"
+
+    modes = [serve(controller, clock, 10) for _ in range(13)]
+    # Calm from the first fast analysis: one step up after recovery_seconds, the next after another
+    assert modes[:6] == ["no_explanation"] * 6
+    assert modes[6:12] == ["lexicon_sentiment"] * 6
+    assert modes[12] == "full"
+
+
+def test_pressure_spike_restarts_calm_period(clock):
+    controller = make_controller()
+    serve(controller, clock, 300)
+    for _ in range(5):
+        serve(controller, clock, 10)
+    serve(controller, clock, 70)
+    for _ in range(5):
+        serve(controller, clock, 10)
+    # 2.5s calm since the spike: not yet recovered
+    assert controller.stats()["mode"] == "lexicon_sentiment"
+    serve(controller, clock, 10)
+    serve(controller, clock, 10)
+    assert controller.stats()["mode"] == "full"
+
+
+def test_busy_time_triggers_step(clock):
+    controller = make_controller()
+    # Analyses back to back for a whole window: utilization 1.0 > busy_ratio
+    for _ in range(3):
+        controller.current()
+        clock.now += 0.5
+        controller.observe(10)
+    controller.current()
+    controller.observe(10)
+    assert controller.stats()["utilization"] == 1.0
+    assert controller.stats()["mode"] == "lexicon_sentiment"
+
+
+def test_idle_gap_resets_latency(clock):
+    controller = make_controller()
+    serve(controller, clock, 300, seconds=5)
+    assert controller.stats()["mode"] == "lexicon_sentiment"
+    # Nothing observed for longer than a step: old latency no longer counts
+    assert controller.stats()["pressure"] == 0
+
+
+def test_custom_ladder_skips_modes(clock):
+    controller = make_controller(modes=("full", "no_explanation", "user_only"))
+    modes = [serve(controller, clock, 300) for _ in range(4)]
+    assert modes == ["full", "no_explanation", "user_only", "user_only"]
+
+
+@pytest.mark.parametrize("backend, modes", [
+    ("lexicon", ("full", "no_explanation", "user_only")),
+    ("textblob", SERVING_MODES),
+])
+def test_ladder_skips_lexicon_sentiment_for_lexicon_backend(monkeypatch, backend, modes):
+    from services.analysis_service import AnalysisService
+
+    monkeypatch.setenv("SENTIMENT_BACKEND", backend)
+    monkeypatch.setenv("LOAD_SHEDDING", "1")
+    service = AnalysisService(enable_sos=False)
+    assert service.overload.modes == modes
@@ -0,0 +1,133 @@
+"""
+Priority gate: slot limits, crisis-first hand-off, timeouts.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+import threading
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from utils.constants import PRIORITY_CRISIS, PRIORITY_ROUTINE
+from utils.priority_gate import PriorityGate
+
+
+def wait_queued(gate, count):
+    deadline = time.time() + 5
+    while gate.stats()["queued"] < count:
+        assert time.time() < deadline, "waiters did not queue"
+        time.sleep(0.001)
+
+
+def start_waiter(gate, priority, order, name, timeout=None):
+    """
+    Thread that acquires, records `name` in `order` once granted, and releases.
+    """
+    def run():
+        if gate.acquire(priority, timeout):
+            order.append(name)
+            gate.release()
+        else:
+            order.append(f"{name}:timeout")
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_free_slots_are_taken_immediately():
+    gate = PriorityGate(2)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    assert gate.stats() == {"slots": 2, "active": 2, "queued": 0, "waiting": {}}
+    gate.release()
+    gate.release()
+    assert gate.stats()["active"] == 0
+
+
+def test_crisis_waiter_jumps_the_queue():
+    gate = PriorityGate(1)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    order = []
+    threads = [start_waiter(gate, PRIORITY_ROUTINE, order, "routine-1")]
+    wait_queued(gate, 1)
+    threads.append(start_waiter(gate, PRIORITY_ROUTINE, order, "routine-2"))
+    wait_queued(gate, 2)
+    threads.append(start_waiter(gate, PRIORITY_CRISIS, order, "crisis"))
+    wait_queued(gate, 3)
+    assert gate.stats()["waiting"] == {PRIORITY_ROUTINE: 2, PRIORITY_CRISIS: 1}
+
+    gate.release()
+    for thread in threads:
+        thread.join(5)
+    # Crisis first, then routine waiters in arrival order
+    assert order == ["crisis", "routine-1", "routine-2"]
+    assert gate.stats() == {"slots": 1, "active": 0, "queued": 0, "waiting": {}}
+
+
+def test_release_hands_slot_to_waiter():
+    gate = PriorityGate(1)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    granted = threading.Event()
+    hold = threading.Event()
+
+    def waiter():
+        gate.acquire(PRIORITY_ROUTINE)
+        granted.set()
+        hold.wait(5)
+        gate.release()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    wait_queued(gate, 1)
+    gate.release()
+    assert granted.wait(5)
+    # The slot passed over without being freed: a newcomer must wait
+    assert gate.stats()["active"] == 1
+    assert not gate.acquire(PRIORITY_CRISIS, timeout=0.01)
+    hold.set()
+    thread.join(5)
+    assert gate.stats()["active"] == 0
+
+
+def test_newcomer_does_not_overtake_queued_waiters():
+    gate = PriorityGate(1)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    order = []
+    thread = start_waiter(gate, PRIORITY_ROUTINE, order, "queued")
+    wait_queued(gate, 1)
+    gate.release()
+    thread.join(5)
+    assert order == ["queued"]
+
+
+def test_timeout_gives_up_and_is_skipped_on_release():
+    gate = PriorityGate(1)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    start = time.perf_counter()
+    assert gate.acquire(PRIORITY_CRISIS, timeout=0.05) is False
+    assert time.perf_counter() - start >= 0.05
+    assert gate.stats()["queued"] == 0
+    assert gate.stats()["waiting"] == {}
+
+    # The timed-out waiter is still in the heap; release must pass it over
+    order = []
+    thread = start_waiter(gate, PRIORITY_ROUTINE, order, "routine")
+    wait_queued(gate, 1)
+    gate.release()
+    thread.join(5)
+    assert order == ["routine"]
+    assert gate.stats()["active"] == 0
+
+
+def test_release_with_only_cancelled_waiters_frees_the_slot():
+    gate = PriorityGate(1)
+    assert gate.acquire(PRIORITY_ROUTINE)
+    assert gate.acquire(PRIORITY_ROUTINE, timeout=0.01) is False
+    gate.release()
+    assert gate.stats()["active"] == 0
+    assert gate.acquire(PRIORITY_ROUTINE, timeout=0)
+    gate.release()
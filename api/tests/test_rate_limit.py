@@ -0,0 +1,158 @@
+"""
+Token bucket rate limiting and single-flight request coalescing.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from utils import rate_limit
+from utils.rate_limit import MemoryRateLimiter, SQLiteRateLimiter
+from utils.single_flight import SingleFlight
+
+IP = ("ip:1.2.3.4", 10, 3)
+SESSION = ("session:abc", 1, 2)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    monkeypatch.setattr(rate_limit.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path, clock):
+    if request.param == "sqlite":
+        return SQLiteRateLimiter(str(tmp_path / "rate_limits.sqlite3"))
+    return MemoryRateLimiter()
+
+
+def test_burst_then_limited(limiter):
+    assert [limiter.take([IP]) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take([IP]) == pytest.approx(0.1)
+
+
+def test_bucket_refills_at_rate(limiter, clock):
+    for _ in range(3):
+        limiter.take([IP])
+    clock.now += 0.1
+    assert limiter.take([IP]) == 0.0
+    assert limiter.take([IP]) == pytest.approx(0.1)
+
+    # Idle for long enough, the bucket is full again but never above burst
+    clock.now += 60
+    assert [limiter.take([IP]) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take([IP]) > 0
+
+
+def test_take_is_all_or_none(limiter):
+    # The session bucket runs out first; the IP bucket must not be charged for refused requests
+    assert limiter.take([IP, SESSION]) == 0.0
+    assert limiter.take([IP, SESSION]) == 0.0
+    for _ in range(5):
+        assert limiter.take([IP, SESSION]) == pytest.approx(1.0)
+    assert limiter.take([IP]) == 0.0
+    assert limiter.take([IP]) > 0
+
+
+def test_retry_after_is_the_longest_wait(limiter):
+    for _ in range(3):
+        limiter.take([IP])
+    limiter.take([SESSION])
+    limiter.take([SESSION])
+    assert limiter.take([IP, SESSION]) == pytest.approx(1.0)
+
+
+def test_sqlite_buckets_are_shared(tmp_path, clock):
+    path = str(tmp_path / "rate_limits.sqlite3")
+    first, second = SQLiteRateLimiter(path), SQLiteRateLimiter(path)
+    assert first.take([SESSION]) == 0.0
+    assert second.take([SESSION]) == 0.0
+    assert first.take([SESSION]) > 0
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("key", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("key", slow))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flights.stats()["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False)] + [("result", True)] * 3
+    assert flights.stats() == {"in_flight": 0, "executed": 1, "coalesced": 3}
+
+    # Nothing is kept once the call is done
+    assert flights.do("key", lambda: "again") == ("again", False)
+
+
+def test_single_flight_shares_errors():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("key", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while flights.stats()["coalesced"] < 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ["boom", "boom"]
+
+
+def test_single_flight_keys_are_independent():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == (1, False)
+    assert flights.do("b", lambda: 2) == (2, False)
+    assert flights.stats()["coalesced"] == 0
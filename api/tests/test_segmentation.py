@@ -0,0 +1,123 @@
+"""
+Long messages: truncation that keeps crisis sentences, and segmented
+(per-sentence) scoring.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from nlp.preprocessing import truncate_text
+from services.analysis_service import AnalysisService
+from utils.constants import SEGMENT_PREVIEW_CHARS, TRUNCATION_CRISIS_SENTENCES
+
+FILLER = "Today I went to the shops and then walked home slowly. " * 4
+CRISIS = "I want to kill myself."
+
+
+@pytest.fixture
+def service():
+    service = AnalysisService(enable_sos=False)
+    service.result_cache.clear()
+    return service
+
+
+def test_truncate_cuts_at_sentence_end():
+    head, rest = truncate_text("I am tired. Work is a lot. Nothing else.", 20)
+    assert (head, rest) == ("I am tired.", "Work is a lot. Nothing else.")
+
+
+def test_truncate_falls_back_to_word_boundary():
+    head, rest = truncate_text("one two three four five six", 12)
+    assert head == "one two"
+    assert rest == " three four five six"
+
+
+def test_short_message_is_not_truncated(service):
+    message = "I feel a bit stressed."
+    assert service._bound_input(message) == (message, None)
+    assert "input_truncated" not in service.perform_full_analysis(message)
+
+
+def test_truncation_keeps_crisis_sentences(service):
+    service.max_chars = 100
+    message = FILLER + "Nothing else happened. " + CRISIS + " Then I slept."
+    text, info = service._bound_input(message)
+
+    assert text.endswith("\n" + CRISIS)
+    assert "Then I slept." not in text
+    assert info == {"original_chars": len(message),
+                    "analyzed_chars": len(text) - len(CRISIS) - 1,
+                    "retained_crisis_sentences": 1}
+    assert info["analyzed_chars"] <= 100
+
+
+def test_truncated_crisis_message_is_still_critical(service):
+    service.max_chars = 100
+    result = service.perform_full_analysis(FILLER + CRISIS)
+    assert result["classified_state"] == "Critical Distress"
+    assert result["input_truncated"]["retained_crisis_sentences"] == 1
+
+
+def test_retained_crisis_sentences_are_capped(service):
+    service.max_chars = 100
+    crisis = [f"Day {n} I want to kill myself." for n in range(TRUNCATION_CRISIS_SENTENCES + 3)]
+    text, info = service._bound_input(FILLER + " ".join(crisis))
+    assert info["retained_crisis_sentences"] == TRUNCATION_CRISIS_SENTENCES
+    assert text.split("\n")[1:] == crisis[:TRUNCATION_CRISIS_SENTENCES]
+
+
+def test_truncation_without_crisis_terms_keeps_only_head(service):
+    service.max_chars = 100
+    text, info = service._bound_input(FILLER)
+    assert "\n" not in text
+    assert info["retained_crisis_sentences"] == 0
+
+
+def test_segmented_scores_each_sentence(service):
+    message = "Work has been busy. I feel hopeless and alone. Tomorrow is Monday."
+    result = service.perform_full_analysis(message, mode='review', segmented=True)
+    sentences = result["decision_explanation"]["sentences"]
+
+    assert [s["index"] for s in sentences] == [0, 1, 2]
+    assert [s["text"] for s in sentences] == ["Work has been busy.", "I feel hopeless and alone.",
+                                              "Tomorrow is Monday."]
+    assert sentences[1]["classified_state"] == "Depression"
+    assert sentences[2]["keyword_contributions"] == {}
+    assert result["decision_explanation"]["triggering_sentences"] == [
+        s["index"] for s in sentences if s["classified_state"] == result["classified_state"]]
+
+
+def test_segmented_contributions_sum_sentence_scores(service):
+    message = "I am so anxious about exams. I feel hopeless. I cannot sleep."
+    result = service.perform_full_analysis(message, mode='review', segmented=True)
+    totals = {}
+    for sentence in result["decision_explanation"]["sentences"]:
+        for category, score in sentence["keyword_contributions"].items():
+            totals[category] = totals.get(category, 0.0) + score
+    contributions = result["decision_explanation"]["keyword_contributions"]
+    for category, score in contributions.items():
+        assert score == pytest.approx(totals.get(category, 0.0), abs=0.01)
+
+
+def test_crisis_sentence_decides_segmented_state(service):
+    message = "I had a nice lunch. The weather was lovely. " + CRISIS
+    result = service.perform_full_analysis(message, mode='review', segmented=True)
+    sentences = result["decision_explanation"]["sentences"]
+    assert result["classified_state"] == "Critical Distress"
+    assert [s["classified_state"] for s in sentences][-1] == "Critical Distress"
+    assert result["decision_explanation"]["triggering_sentences"] == [2]
+
+
+def test_segment_text_is_a_preview(service):
+    long_sentence = "I keep thinking about " + "all the work " * 30 + "ahead."
+    result = service.perform_full_analysis(long_sentence + " I am stressed.", mode='review', segmented=True)
+    [first, second] = result["decision_explanation"]["sentences"]
+    assert first["text"] == long_sentence[:SEGMENT_PREVIEW_CHARS]
+    assert second["text"] == "I am stressed."
@@ -0,0 +1,216 @@
+"""
+SOS dispatch retries, deduplication and status records, offline with the fake Twilio client.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from services import sos_dispatcher
+from services.dispatch_store import MemoryDispatchStore, SQLiteDispatchStore
+from services.fake_twilio import FakeTwilioClient
+from services.sos_dispatcher import SOSDispatcher
+from services.sos_service import SOSService
+
+CONTACTS = [
+    {"name": "Alex", "phone": "+15550000001"},
+    {"name": "Sam", "phone": "+15550000002"},
+]
+
+
+def make_dispatcher(store=None, fail_first=0, max_retries=3, synchronous=False, **kwargs):
+    client = FakeTwilioClient(latency=0, fail_first=fail_first)
+    service = SOSService(client=client)
+    service.from_number = "+15005550006"
+    dispatcher = SOSDispatcher(service, max_retries=max_retries, backoff_seconds=0.01,
+                               dedup_window=60, store=store or MemoryDispatchStore(),
+                               synchronous=synchronous, **kwargs)
+    return dispatcher, client
+
+
+def wait_settled(dispatcher, dispatch_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = dispatcher.get_status(dispatch_id)
+        if status['status'] not in ("queued", "in_progress"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"dispatch {dispatch_id} did not settle")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Records the dispatcher's backoff delays instead of sleeping; jitter pinned to zero
+    delays = []
+    real_sleep = time.sleep
+
+    def sleep(seconds):
+        if seconds and threading.current_thread().name.startswith("sos"):
+            delays.append(seconds)
+        else:
+            real_sleep(seconds)
+
+    monkeypatch.setattr(sos_dispatcher.time, "sleep", sleep)
+    monkeypatch.setattr(sos_dispatcher.random, "uniform", lambda a, b: 0)
+    return delays
+
+
+def test_retries_with_exponential_backoff(sleeps):
+    dispatcher, client = make_dispatcher(fail_first=2)
+    action = dispatcher.dispatch(CONTACTS[:1], requester="session-a")
+    status = wait_settled(dispatcher, action['dispatch_id'])
+    dispatcher.shutdown()
+
+    assert status['status'] == "completed"
+    assert status['contacts'][0]['status'] == "sent"
+    assert status['contacts'][0]['attempts'] == 3
+    assert "error" not in status['contacts'][0]
+    assert sleeps == [0.01, 0.02]
+    assert len(client.sent) == 1
+
+
+def test_gives_up_after_max_retries(sleeps):
+    dispatcher, client = make_dispatcher(fail_first=10, max_retries=2)
+    action = dispatcher.dispatch(CONTACTS[:1], requester="session-a")
+    status = wait_settled(dispatcher, action['dispatch_id'])
+    dispatcher.shutdown()
+
+    assert status['status'] == "failed"
+    assert status['contacts'][0]['status'] == "failed"
+    assert status['contacts'][0]['attempts'] == 3
+    assert "Simulated delivery failure" in status['contacts'][0]['error']
+    assert client.sent == []
+
+
+def test_contacts_without_phone_are_skipped():
+    dispatcher, _ = make_dispatcher()
+    action = dispatcher.dispatch(CONTACTS[:1] + [{"name": "No Phone"}], requester="session-a")
+    status = wait_settled(dispatcher, action['dispatch_id'])
+    dispatcher.shutdown()
+
+    assert status['status'] == "partial"
+    assert [c['status'] for c in status['contacts']] == ["sent", "skipped"]
+
+
+def test_repeat_trigger_within_window_is_deduplicated():
+    dispatcher, client = make_dispatcher()
+    first = dispatcher.dispatch(CONTACTS, requester="session-a")
+    repeat = dispatcher.dispatch(CONTACTS, requester="session-a")
+    wait_settled(dispatcher, first['dispatch_id'])
+    dispatcher.shutdown()
+
+    assert first['deduplicated'] is False
+    assert repeat['deduplicated'] is True
+    assert repeat['dispatch_id'] == first['dispatch_id']
+    assert len(client.sent) == len(CONTACTS)
+
+
+def test_trigger_after_window_dispatches_again(monkeypatch):
+    dispatcher, client = make_dispatcher()
+    first = dispatcher.dispatch(CONTACTS, requester="session-a")
+    wait_settled(dispatcher, first['dispatch_id'])
+
+    later = time.time() + dispatcher.dedup_window + 1
+    monkeypatch.setattr(sos_dispatcher.time, "time", lambda: later)
+    second = dispatcher.dispatch(CONTACTS, requester="session-a")
+    monkeypatch.undo()
+    wait_settled(dispatcher, second['dispatch_id'])
+    dispatcher.shutdown()
+
+    assert second['deduplicated'] is False
+    assert second['dispatch_id'] != first['dispatch_id']
+    assert len(client.sent) == 2 * len(CONTACTS)
+
+
+@pytest.mark.parametrize("first_requester, second_requester, second_contacts", [
+    ("session-a", "session-b", CONTACTS),
+    ("session-a", "session-a", CONTACTS[:1]),
+    (None, None, CONTACTS),
+])
+def test_dedup_is_scoped_to_requester_and_contacts(first_requester, second_requester, second_contacts):
+    dispatcher, _ = make_dispatcher()
+    first = dispatcher.dispatch(CONTACTS, requester=first_requester)
+    second = dispatcher.dispatch(second_contacts, requester=second_requester)
+    wait_settled(dispatcher, first['dispatch_id'])
+    wait_settled(dispatcher, second['dispatch_id'])
+    dispatcher.shutdown()
+
+    assert second['deduplicated'] is False
+    assert second['dispatch_id'] != first['dispatch_id']
+
+
+def test_status_record_lifecycle(monkeypatch):
+    dispatcher, client = make_dispatcher()
+    # Hold the sends until the queued record has been checked
+    release = threading.Event()
+    send = client._send
+
+    def held_send(*args):
+        release.wait(5)
+        return send(*args)
+
+    monkeypatch.setattr(client, "_send", held_send)
+
+    action = dispatcher.dispatch(CONTACTS, requester="session-a")
+    assert action['dispatch_status'] == "queued"
+    pending = dispatcher.get_status(action['dispatch_id'])
+    assert pending['status'] in ("queued", "in_progress")
+    assert pending['completed_at'] is None
+    assert all(c['status'] == "pending" for c in pending['contacts'])
+    release.set()
+
+    status = wait_settled(dispatcher, action['dispatch_id'])
+    dispatcher.shutdown()
+    assert status['status'] == "completed"
+    assert status['completed_at'] >= status['created_at']
+    assert [c['status'] for c in status['contacts']] == ["sent", "sent"]
+    assert all(c['sid'].startswith("SMFAKE") for c in status['contacts'])
+    assert dispatcher.get_status("unknown") is None
+
+
+def test_status_readable_from_another_worker(tmp_path):
+    path = str(tmp_path / "dispatches.sqlite3")
+    dispatcher, _ = make_dispatcher(store=SQLiteDispatchStore(path))
+    action = dispatcher.dispatch(CONTACTS, requester="session-a")
+    wait_settled(dispatcher, action['dispatch_id'])
+    dispatcher.shutdown()
+
+    # A second dispatcher (another worker) sees the record and dedups against it
+    other, client = make_dispatcher(store=SQLiteDispatchStore(path))
+    assert other.get_status(action['dispatch_id'])['status'] == "completed"
+    repeat = other.dispatch(CONTACTS, requester="session-a")
+    other.shutdown()
+    assert repeat['deduplicated'] is True
+    assert client.sent == []
+
+
+def test_synchronous_delivery_settles_before_returning(sleeps):
+    dispatcher, client = make_dispatcher(fail_first=1, synchronous=True)
+    action = dispatcher.dispatch(CONTACTS, requester="session-a")
+    dispatcher.shutdown()
+
+    assert action['dispatch_status'] == "completed"
+    assert [c['status'] for c in action['contacts_notified']] == ["sent", "sent"]
+    assert [c['attempts'] for c in action['contacts_notified']] == [2, 2]
+    assert len(client.sent) == len(CONTACTS)
+
+
+def test_vercel_delivers_synchronously(monkeypatch):
+    monkeypatch.delenv("SOS_SYNC_DELIVERY", raising=False)
+    monkeypatch.setenv("VERCEL", "1")
+    dispatcher, _ = make_dispatcher(synchronous=None)
+    assert dispatcher.synchronous is True
+    dispatcher.shutdown()
+
+    monkeypatch.setenv("SOS_SYNC_DELIVERY", "0")
+    dispatcher, _ = make_dispatcher(synchronous=None)
+    assert dispatcher.synchronous is False
+    dispatcher.shutdown()
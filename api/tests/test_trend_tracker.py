@@ -0,0 +1,49 @@
+"""
+Trend window for single and streamed analyses.
+
+Usage: python -m pytest tests (from api/)
+"""
+import os
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+from services.trend_tracker import RollingTrend, recent_trend
+
+# Severities 0, 1, 2, 3, 4, 0, 0: rising, then back to Normal
+STATES = ["Normal", "Stress", "Anxiety", "Depression", "Critical Distress", "Normal", "Normal"]
+
+
+def history(states):
+    return [{"classified_state": s} for s in states]
+
+
+def test_recent_trend_uses_last_window_entries():
+    assert recent_trend(history(STATES), window=3) == "Improving"
+    assert recent_trend(history(STATES), window=7) == "Spiraling"
+    assert recent_trend(history(STATES[:1])) == "Stable"
+
+
+def test_stream_trend_matches_single_analysis():
+    tracker = RollingTrend(window=10, trend_window=3)
+    for index, state in enumerate(STATES):
+        update = tracker.update(state, 1.0)
+        assert update["trend"] == recent_trend(history(STATES[:index]), 3)
+
+
+def test_stream_window_sets_trend_window():
+    tracker = RollingTrend(window=7)
+    trends = [tracker.update(state, 1.0)["trend"] for state in STATES + ["Normal"]]
+    assert tracker.trend_window == 7
+    assert trends[-1] == recent_trend(history(STATES), 7) == "Spiraling"
+
+
+def test_severity_window_is_bounded():
+    tracker = RollingTrend(window=2, trend_window=5)
+    for state in STATES:
+        update = tracker.update(state, 1.0)
+    assert update["window_size"] == 2
+    assert update["window_severity"] == 0
+    assert len(tracker.history()) == 5
@@ -0,0 +1,74 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+class AuthError(Exception):
+    """
+    Missing or invalid credentials; `status` is the HTTP status to answer with.
+    """
+
+    def __init__(self, message, status=401):
+        super().__init__(message)
+        self.status = status
+
+class FirebaseVerifier:
+    """
+    Verifies Firebase ID tokens (the `Authorization: Bearer <token>` header
+    the web client sends) for the project in FIREBASE_PROJECT_ID.
+
+    firebase-admin is imported on first use, so routes that never need an
+    identity don't pay for it. Google's signing keys are fetched and cached
+    by firebase-admin itself.
+    """
+
+    def __init__(self, project_id=None):
+        self.project_id = project_id if project_id is not None else os.getenv("FIREBASE_PROJECT_ID", "")
+        self._app = None
+        self._auth = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self):
+        return bool(self.project_id)
+
+    def _load(self):
+        if self._auth is None:
+            with self._lock:
+                if self._auth is None:
+                    import firebase_admin
+                    from firebase_admin import auth
+                    self._app = firebase_admin.initialize_app(options={"projectId": self.project_id},
+                                                              name="kiddo-auth")
+                    self._auth = auth
+        return self._auth
+
+    def verify(self, authorization):
+        """
+        The verified uid for an Authorization header value. Raises AuthError
+        (401 for missing or bad tokens, 503 when verification isn't set up).
+        """
+        if not self.configured:
+            raise AuthError("Authentication is not configured (FIREBASE_PROJECT_ID)", 503)
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not token.strip():
+            raise AuthError("A Firebase ID token is required (Authorization: Bearer <token>)")
+        try:
+            auth = self._load()
+        except ImportError:
+            raise AuthError("Authentication is not available (firebase-admin is not installed)", 503)
+        try:
+            return auth.verify_id_token(token.strip(), app=self._app)["uid"]
+        except Exception as e:
+            logger.info(f"Rejected ID token: {e}")
+            raise AuthError("Invalid or expired ID token")
+
+    def verify_user(self, authorization, user_id):
+        """
+        Checks that the request is authenticated as `user_id` (403 otherwise).
+        """
+        uid = self.verify(authorization)
+        if uid != user_id:
+            raise AuthError("Token does not match user_id", 403)
+        return uid
@@ -0,0 +1,40 @@
+import gzip
+
+# Optional brotli support; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+# Fast settings: these are per-request, latency-sensitive payloads
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def compress_response(response, accept_encodings, min_bytes):
+    """
+    Compresses a buffered JSON response in place with the client's preferred
+    supported encoding, if it is large enough to be worth it. Streamed
+    responses, error responses and already-encoded bodies are left alone.
+    """
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < min_bytes:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
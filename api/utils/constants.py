@@ -12,6 +12,41 @@ SENTIMENT_THRESHOLD_NEGATIVE = -0.2
 SENTIMENT_THRESHOLD_POSITIVE = 0.2
 INTENSITY_THRESHOLD_CRITICAL = 4.0
 
+# Keyword Weighting
+CRITICAL_KEYWORD_WEIGHT = 10
+
+# Context-aware keyword scoring (mirrors src/utils/textAnalyzer.ts; words in clean_text form).
+# A negation right before a hit, or separated from it only by up to NEGATION_WINDOW scope words
+# ("don't feel very stressed", "not at all anxious"), in the same clause, cancels it; a negation
+# before an inability verb ("can't stop crying", "can't handle this stress") strengthens it
+# instead. Critical Distress hits are never negated or scaled; an intensifier right before scales it.
+NEGATION_WORDS = (
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "nowhere", "hardly", "barely",
+    "without", "dont", "doesnt", "didnt", "wont", "wouldnt", "cant", "cannot", "couldnt", "isnt", "arent",
+    "wasnt", "werent", "havent", "hasnt", "hadnt", "shouldnt", "aint"
+)
+INTENSIFIER_WEIGHTS = {
+    "very": 1.5, "extremely": 1.5, "incredibly": 1.5, "super": 1.5, "really": 1.5, "so": 1.5,
+    "absolutely": 1.5, "totally": 1.5, "completely": 1.5,
+    "quite": 1.2, "pretty": 1.2, "fairly": 1.2, "rather": 1.2, "somewhat": 1.2,
+    "a bit": 0.7, "slightly": 0.7, "kind of": 0.7, "sort of": 0.7, "a little": 0.7
+}
+NEGATION_SCOPE_WORDS = (
+    "feel", "feeling", "feels", "felt", "am", "is", "are", "was", "were", "be", "been", "being", "get",
+    "getting", "got", "seem", "seems", "at", "all", "that", "too", "even", "any", "this", "the", "my"
+)
+INABILITY_VERBS = ("stop", "handle", "take", "cope", "bear", "stand")
+INABILITY_WEIGHT = 1.5
+NEGATION_WINDOW = 3
+NEGATED_HIT_WEIGHT = 0.0
+
+# Batch Analysis
+MAX_BATCH_SIZE = 1000
+
+# Analysis Result Cache (overridable via environment variables of the same name)
+ANALYSIS_CACHE_SIZE = 2048
+ANALYSIS_CACHE_TTL_SECONDS = 3600
+
 # Precautions Mapping
 PRECAUTIONS = {
     NORMAL: [
@@ -47,3 +82,126 @@ PRECAUTIONS = {
 
 # SOS Configuration
 MOCK_EMERGENCY_CONTACTS = ["Emergency Contact 1", "Emergency Contact 2"]
+
+# NLTK Resources (languages bundled and loadable; overridable via NLTK_LANGUAGES)
+DEFAULT_NLTK_LANGUAGES = "english"
+
+# SOS Dispatch (overridable via environment variables of the same name). Deliveries run in the background
+# after the response, except on serverless hosts (VERCEL set; SOS_SYNC_DELIVERY=1/0 overrides the detection),
+# where they finish before it and the response carries the per-contact results
+SOS_DISPATCH_WORKERS = 8
+SOS_MAX_RETRIES = 3
+SOS_BACKOFF_SECONDS = 0.5
+SOS_DEDUP_WINDOW_SECONDS = 300
+SOS_DISPATCH_RETENTION_SECONDS = 3600
+# Dispatch records: "memory" (per process) or "sqlite" (shared by the host's workers; needed with more than one)
+DEFAULT_SOS_DISPATCH_STORE = "memory"
+
+# Sentiment backend ("lexicon" or "textblob"; overridable via SENTIMENT_BACKEND)
+DEFAULT_SENTIMENT_BACKEND = "lexicon"
+
+# Production serving (see wsgi.py / asgi.py; overridable via SERVER_THREADS)
+DEFAULT_SERVER_THREADS = 4
+
+# Session Store (server-side trend history; overridable via environment variables of the same name)
+DEFAULT_SESSION_STORE = "memory"
+SESSION_HISTORY_SIZE = 10
+SESSION_TTL_SECONDS = 86400
+SESSION_MAX_SESSIONS = 10000
+MAX_SESSION_ID_LENGTH = 128
+
+# Crisis fast track and priority scheduling (overridable via environment variables of the same name).
+# With ANALYSIS_CONCURRENCY set, at most that many analyses run at once per process and waiting ones are
+# served by priority; a crisis message waits at most CRISIS_QUEUE_BUDGET_MS for a slot, then runs anyway.
+# Off (0) by default: lexicon analyses are short and a serverless instance serves one request at a time.
+# Set it on a multi-threaded server where slow (e.g. TextBlob) analyses can pile up, keeping SERVER_THREADS
+# above it so that requests queue here rather than in the server (see benchmarks/bench_crisis_latency.py).
+ANALYSIS_CONCURRENCY = 0
+CRISIS_QUEUE_BUDGET_MS = 50
+PRIORITY_CRISIS = 0
+PRIORITY_ROUTINE = 1
+
+# Load shedding (overridable via environment variables of the same name, LOAD_SHEDDING=0 disables it).
+# Serving steps down one mode when the process spends OVERLOAD_BUSY_RATIO of its time analysing, analyses
+# waiting for a slot average OVERLOAD_QUEUE_DEPTH or the moving average analysis latency reaches
+# OVERLOAD_LATENCY_MS, at most one step per OVERLOAD_STEP_SECONDS, and back up once all three have stayed
+# below OVERLOAD_RECOVERY_RATIO of those limits for OVERLOAD_RECOVERY_SECONDS.
+# Modes, in order: everything; lexicon sentiment instead of TextBlob (and no per-sentence scoring);
+# no decision_explanation; user mode only. Crisis messages are always served in full. With the lexicon
+# sentiment backend the second mode sheds nothing and is skipped (its per-sentence cut still applies below it).
+SERVING_MODES = ("full", "lexicon_sentiment", "no_explanation", "user_only")
+OVERLOAD_BUSY_RATIO = 0.9
+OVERLOAD_QUEUE_DEPTH = 32
+OVERLOAD_LATENCY_MS = 100
+OVERLOAD_RECOVERY_RATIO = 0.5
+OVERLOAD_STEP_SECONDS = 1.0
+OVERLOAD_RECOVERY_SECONDS = 3.0
+OVERLOAD_LATENCY_ALPHA = 0.2
+
+# Analysis history (append-only per user, with minute/hour/day rollups for the dashboard;
+# HISTORY_STORE is "sqlite", "memory" or "none", overridable via environment variables of the same name).
+# Off unless configured: serverless hosts (Vercel) have a read-only, ephemeral filesystem and the memory
+# store is per process, so HISTORY_STORE=sqlite belongs on a self-hosted server with a persistent disk.
+DEFAULT_HISTORY_STORE = "none"
+HISTORY_SERIES_POINTS = 200
+HISTORY_MAX_POINTS = 2000
+HISTORY_DEFAULT_RANGE_SECONDS = 30 * 86400
+MAX_USER_ID_LENGTH = 128
+
+# Emotional trend: direction of the last TREND_WINDOW analyses before the current one
+# (single messages, sessions and streams alike; see trend_tracker.recent_trend; overridable via TREND_WINDOW)
+TREND_WINDOW = 3
+
+# Streaming analysis (rolling severity window and intensity EWMA smoothing factor;
+# a stream's ?window= sets both the severity window and its trend window)
+STREAM_TREND_WINDOW = 10
+STREAM_EWMA_ALPHA = 0.3
+MAX_STREAM_LINE_BYTES = 65536
+
+# Sampling profiler (enabled with SAMPLING_PROFILER=1)
+PROFILER_INTERVAL_MS = 10
+PROFILER_MAX_STACKS = 5000
+
+# Lexicon hot reload (seconds between source mtime checks, 0 disables the watcher;
+# overridable via LEXICON_WATCH_INTERVAL. POST /api/lexicon/reload is guarded by LEXICON_RELOAD_TOKEN if set)
+LEXICON_WATCH_INTERVAL = 5
+
+# Request handling (request body limit for JSON endpoints, overridable via MAX_REQUEST_BYTES;
+# the streaming endpoint is bounded per line instead)
+MAX_REQUEST_BYTES = 1048576
+MAX_HISTORY_ITEMS = 1000
+
+# Response compression (gzip, or brotli if installed) for bodies of at least this size;
+# overridable via COMPRESSION_MIN_BYTES, COMPRESSION=0 disables it
+COMPRESSION_MIN_BYTES = 1024
+
+# Rate limiting (token buckets per client IP and per session on /api/analyze and /api/sos/trigger;
+# off unless RATE_LIMIT=1, limits overridable via environment variables of the same name.
+# RATE_LIMIT_BACKEND is "memory" (per worker) or "sqlite" (shared by the workers on a host).
+# The limits are abuse ceilings, not traffic shaping: a chat turn is one request, so a session
+# sending faster than a message a second sustained (after a burst of 20) is not a person typing)
+DEFAULT_RATE_LIMIT_BACKEND = "memory"
+RATE_LIMIT_IP_RATE = 10
+RATE_LIMIT_IP_BURST = 30
+RATE_LIMIT_SESSION_RATE = 1
+RATE_LIMIT_SESSION_BURST = 20
+RATE_LIMIT_MAX_KEYS = 100000
+RATE_LIMIT_IDLE_SECONDS = 3600
+
+# Fuzzy (typo-tolerant) lexicon matching, enabled with FUZZY_MATCHING=1: tokens of at least
+# FUZZY_MIN_TOKEN_LENGTH characters are corrected within one edit (FUZZY_MAX_DISTANCE from
+# FUZZY_LONG_TOKEN_LENGTH characters), and corrected hits count FUZZY_HIT_WEIGHT of an exact hit
+FUZZY_MAX_DISTANCE = 2
+FUZZY_MIN_TOKEN_LENGTH = 4
+FUZZY_LONG_TOKEN_LENGTH = 8
+FUZZY_HIT_WEIGHT = 0.6
+FUZZY_CACHE_SIZE = 65536
+
+# Input bounds (overridable via MAX_ANALYSIS_CHARS): longer messages are cut at a sentence
+# boundary; sentences past the cut that contain Critical Distress terms (up to
+# TRUNCATION_CRISIS_SENTENCES) are still analyzed
+MAX_ANALYSIS_CHARS = 10000
+TRUNCATION_CRISIS_SENTENCES = 5
+
+# Segmented analysis (per-sentence scoring; SEGMENTED_ANALYSIS=1 makes it the default)
+SEGMENT_PREVIEW_CHARS = 160
@@ -0,0 +1,70 @@
+import json
+import os
+from flask.json.provider import DefaultJSONProvider
+
+# Optional fast encoder; the standard library is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(obj):
+    # Types orjson doesn't serialise natively but the API may return
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _backend():
+    """
+    JSON_BACKEND=orjson | stdlib selects the codec; by default orjson is used
+    when it is installed.
+    """
+    name = os.getenv("JSON_BACKEND", "orjson" if orjson else "stdlib")
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+    if name not in ("orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON_BACKEND '{name}' (expected 'orjson' or 'stdlib')")
+    return name
+
+JSON_BACKEND = _backend()
+
+if JSON_BACKEND == "orjson":
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode('utf-8')
+
+    loads = orjson.loads
+else:
+    # One shared compact encoder (json.dumps builds a new one per call when given options)
+    _encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_default).encode
+
+    def dumps_bytes(obj):
+        return _encode(obj).encode('utf-8')
+
+    dumps = _encode
+    loads = json.loads
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider (jsonify, request.get_json) backed by the codec
+    above. Output is compact and keys keep their insertion order; calls with
+    encoder options (indent, sort_keys, ...) go through the default provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
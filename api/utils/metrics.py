@@ -0,0 +1,166 @@
+import bisect
+import threading
+
+# Latency buckets in seconds (Prometheus convention), from 0.1ms to 5s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key):
+        return list(zip(self.labelnames, key))
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram; observations only bump one bucket counter, the
+    cumulative counts are built at render time.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        for key, (counts, total, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", labels + [("le", _format_value(float(bound)))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class MetricsRegistry:
+    """
+    Process-local metrics rendered in the Prometheus text exposition format.
+    Collectors are callables returning (name, type, documentation, samples)
+    tuples, for values read at scrape time (e.g. cache statistics). Under a
+    multi-process server each worker reports its own series.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# Analysis pipeline
+ANALYSIS_LATENCY = REGISTRY.histogram(
+    "kiddo_analysis_duration_seconds", "End-to-end analysis latency per message.", ("mode",))
+STAGE_LATENCY = REGISTRY.histogram(
+    "kiddo_analysis_stage_duration_seconds", "Latency of each analysis stage.", ("stage",))
+ANALYSES = REGISTRY.counter(
+    "kiddo_analyses_total", "Analyses by classified state.", ("state", "mode"))
+ERRORS = REGISTRY.counter(
+    "kiddo_errors_total", "Errors by source (endpoint, batch/stream item or SOS delivery).", ("source",))
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    "kiddo_http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "kiddo_http_request_duration_seconds", "Time to response headers per route.", ("route",))
+
+# SOS
+SOS_DISPATCHES = REGISTRY.counter(
+    "kiddo_sos_dispatches_total", "SOS dispatch requests by outcome.", ("outcome",))
+SOS_DISPATCH_LATENCY = REGISTRY.histogram(
+    "kiddo_sos_dispatch_duration_seconds", "Time for dispatch() to queue an SOS alert.")
+SOS_DELIVERIES = REGISTRY.counter(
+    "kiddo_sos_deliveries_total", "Per-contact SOS delivery results.", ("status",))
+SOS_SEND_LATENCY = REGISTRY.histogram(
+    "kiddo_sos_send_duration_seconds", "Latency of individual SOS send attempts.", ("result",))
+
+# Request protection
+RATE_LIMITED = REGISTRY.counter(
+    "kiddo_rate_limited_total", "Requests rejected by the rate limiter, by route.", ("route",))
+COALESCED = REGISTRY.counter(
+    "kiddo_coalesced_requests_total", "Requests served by an identical in-flight request, by route.", ("route",))
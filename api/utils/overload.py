@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from utils.constants import (
+    SERVING_MODES, OVERLOAD_BUSY_RATIO, OVERLOAD_QUEUE_DEPTH, OVERLOAD_LATENCY_MS, OVERLOAD_RECOVERY_RATIO,
+    OVERLOAD_STEP_SECONDS, OVERLOAD_RECOVERY_SECONDS, OVERLOAD_LATENCY_ALPHA
+)
+
+logger = logging.getLogger(__name__)
+
+class OverloadController:
+    """
+    Chooses the serving mode from recent load: the share of time the process
+    spent with analyses in flight, the number waiting for a slot and a
+    moving average of analysis latency.
+
+    Busy time is the signal that sees a backlog building outside the service
+    (in the server's accept queue, once every thread is taken); queue depth
+    and latency only grow as far as the thread count lets them. Pressure is
+    the largest of busy share / busy_ratio, average queue depth / queue_limit
+    and average latency / latency_ms.
+
+    At 1.0 or above the mode steps down one level of `modes` (SERVING_MODES,
+    or the part of it that sheds anything for the service), at
+    most once per step_seconds so every step gets time to take effect. It
+    steps back up only after pressure has stayed below recovery_ratio for
+    recovery_seconds: a degraded mode that keeps up looks calm, and going
+    straight back to full under the same load would flap.
+    """
+
+    def __init__(self, busy_ratio=OVERLOAD_BUSY_RATIO, queue_limit=OVERLOAD_QUEUE_DEPTH,
+                 latency_ms=OVERLOAD_LATENCY_MS, recovery_ratio=OVERLOAD_RECOVERY_RATIO,
+                 step_seconds=OVERLOAD_STEP_SECONDS, recovery_seconds=OVERLOAD_RECOVERY_SECONDS,
+                 alpha=OVERLOAD_LATENCY_ALPHA, modes=SERVING_MODES):
+        self.modes = tuple(modes)
+        self.busy_ratio = busy_ratio
+        self.queue_limit = queue_limit
+        self.latency_ms = latency_ms
+        self.recovery_ratio = recovery_ratio
+        self.step_seconds = step_seconds
+        self.recovery_seconds = recovery_seconds
+        self.alpha = alpha
+        self.level = 0
+        self._in_flight = 0
+        self._busy_since = None
+        self._busy = 0.0
+        self._window_start = time.monotonic()
+        self._utilization = 0.0
+        self._latency = 0.0
+        self._queue = 0.0
+        self._last_change = 0.0
+        self._last_observed = 0.0
+        self._calm_since = None
+        self._lock = threading.Lock()
+
+    def current(self, queued=0):
+        """
+        Serving mode for an analysis starting now, with `queued` others waiting
+        for a slot. Every call must be paired with observe() once it finishes.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._in_flight == 0:
+                self._busy_since = now
+            self._in_flight += 1
+            self._observe_queue(queued)
+            self._update(now)
+            return self.modes[self.level]
+
+    def observe(self, latency_ms, queued=0):
+        """
+        Records a finished analysis (latency including any queue wait).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._busy += now - self._busy_since
+                self._busy_since = None
+            if now - self._last_observed > self.step_seconds:
+                # Idle gap: the old average says nothing about the current load
+                self._latency = 0.0
+            self._latency += self.alpha * (latency_ms - self._latency)
+            self._last_observed = now
+            self._observe_queue(queued)
+            self._update(now)
+
+    def _observe_queue(self, queued):
+        # Smoothed like latency, so one burst of arrivals doesn't count as overload
+        self._queue += self.alpha * (queued - self._queue)
+
+    def _roll_window(self, now):
+        """
+        Closes the busy-time window once it is step_seconds long.
+        """
+        elapsed = now - self._window_start
+        if elapsed < self.step_seconds:
+            return
+        busy = self._busy
+        if self._busy_since is not None:
+            busy += now - self._busy_since
+            self._busy_since = now
+        self._utilization = min(1.0, busy / elapsed)
+        self._busy = 0.0
+        self._window_start = now
+
+    def _pressure(self, now):
+        pressure = self._utilization / self.busy_ratio
+        if now - self._last_observed > self.step_seconds:
+            return pressure
+        return max(pressure, self._queue / self.queue_limit, self._latency / self.latency_ms)
+
+    def _update(self, now):
+        self._roll_window(now)
+        pressure = self._pressure(now)
+        if pressure >= self.recovery_ratio:
+            self._calm_since = None
+        elif self._calm_since is None:
+            self._calm_since = now
+        if now - self._last_change < self.step_seconds:
+            return
+        if pressure >= 1.0 and self.level < len(self.modes) - 1:
+            self.level += 1
+            logger.warning(f"Overloaded (pressure {pressure:.2f}): serving in {self.modes[self.level]} mode")
+        elif self.level > 0 and self._calm_since is not None and now - self._calm_since >= self.recovery_seconds:
+            self.level -= 1
+            # Each further step up needs its own calm period
+            self._calm_since = now
+            logger.info(f"Load easing (pressure {pressure:.2f}): serving in {self.modes[self.level]} mode")
+        else:
+            return
+        self._last_change = now
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self._roll_window(now)
+            return {"mode": self.modes[self.level], "level": self.level,
+                    "utilization": round(self._utilization, 3), "latency_ms": round(self._latency, 2),
+                    "queued": round(self._queue, 2), "pressure": round(self._pressure(now), 3)}
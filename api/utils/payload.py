@@ -0,0 +1,75 @@
+from utils.json_provider import dumps as _encode
+
+_encoded_keys = {}
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only")
+
+class FrozenDict(dict):
+    """
+    Read-only dict for payload parts that are built once and shared by every
+    response (agent messages, precautions). Still a dict, so any JSON encoder
+    serialises it as usual; `json` holds its pre-encoded form, which
+    encode_response() splices in verbatim.
+    """
+    __slots__ = ('json',)
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.json = _encode(self)
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+class FrozenList(list):
+    """
+    List counterpart of FrozenDict for shared list values.
+    """
+    __slots__ = ('json',)
+
+    def __init__(self, items=()):
+        list.__init__(self, items)
+        self.json = _encode(self)
+
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = _readonly
+    sort = reverse = __iadd__ = __imul__ = _readonly
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+_FROZEN_TYPES = (FrozenDict, FrozenList)
+
+def freeze(value):
+    """
+    Deep-freezes plain dicts and lists into FrozenDict / FrozenList.
+    """
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+def encode_response(response):
+    """
+    Serialises a response dict to JSON, encoding only its dynamic top-level
+    fields and splicing in the pre-encoded text of frozen ones.
+    """
+    dynamic = {}
+    static = []
+    for key, value in response.items():
+        if type(value) in _FROZEN_TYPES:
+            encoded_key = _encoded_keys.get(key)
+            if encoded_key is None:
+                encoded_key = _encoded_keys.setdefault(key, _encode(key))
+            static.append(f'{encoded_key}:{value.json}')
+        else:
+            dynamic[key] = value
+
+    body = _encode(dynamic)
+    if not static:
+        return body
+    if len(body) == 2:
+        return "{" + ",".join(static) + "}"
+    return body[:-1] + "," + ",".join(static) + "}"
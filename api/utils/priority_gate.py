@@ -0,0 +1,74 @@
+import heapq
+import itertools
+import threading
+
+class _Waiter:
+    __slots__ = ('event', 'granted', 'cancelled')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+class PriorityGate:
+    """
+    At most `slots` holders at a time; requests waiting for a slot are served
+    by priority (lower value first), then in arrival order. A released slot
+    is handed straight to the best waiter, so a late high-priority request
+    never queues behind earlier routine ones.
+
+    acquire() with a timeout gives up waiting after it; the caller may then
+    run without a slot (see AnalysisService), which bounds how long crisis
+    messages can be held back even when every slot is busy.
+    """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = []
+        self._waiting = {}
+        self._queued = 0
+        self._order = itertools.count()
+
+    def acquire(self, priority, timeout=None):
+        """
+        Returns True once a slot is held (release() it afterwards), or False
+        if `timeout` seconds passed first.
+        """
+        with self._lock:
+            if self._active < self.slots and not self._queued:
+                self._active += 1
+                return True
+            waiter = _Waiter()
+            heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+            self._queued += 1
+
+        waiter.event.wait(timeout)
+        with self._lock:
+            if not waiter.granted:
+                # Timed out: left in the heap, skipped when it comes up
+                waiter.cancelled = True
+                self._waiting[priority] -= 1
+                self._queued -= 1
+            return waiter.granted
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                priority, _, waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled:
+                    continue
+                # The slot passes to the waiter; the active count is unchanged
+                waiter.granted = True
+                self._waiting[priority] -= 1
+                self._queued -= 1
+                waiter.event.set()
+                return
+            self._active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"slots": self.slots, "active": self._active, "queued": self._queued,
+                    "waiting": {priority: n for priority, n in self._waiting.items() if n}}
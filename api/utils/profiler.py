@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+from utils.constants import PROFILER_INTERVAL_MS, PROFILER_MAX_STACKS
+
+# Threads parked in these modules are idle (waiting on locks, queues or sockets)
+_IDLE_MODULES = ('threading.py', 'queue.py', 'selectors.py', 'socket.py', 'socketserver.py')
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for production use.
+
+    A daemon thread wakes every `interval` seconds, snapshots the stack of
+    every other busy thread and counts it in collapsed ("folded") form, the
+    input format of flamegraph tools. Frames are keyed by file and function
+    (not line) and the number of distinct stacks is capped, so memory stays
+    bounded however long it runs.
+    """
+
+    def __init__(self, interval=PROFILER_INTERVAL_MS / 1000, max_stacks=PROFILER_MAX_STACKS, max_depth=64):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.samples = 0
+        self.dropped = 0
+        self._stacks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self):
+        """
+        Starts the sampler in the current process; threads don't survive a
+        fork, so a forked worker starts its own on first use.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._stacks.clear()
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip_thread=own_id)
+
+    def sample(self, skip_thread=None):
+        frames = sys._current_frames()
+        for thread_id, frame in frames.items():
+            if thread_id == skip_thread or frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+
+            with self._lock:
+                self.samples += 1
+                if key in self._stacks:
+                    self._stacks[key] += 1
+                elif len(self._stacks) < self.max_stacks:
+                    self._stacks[key] = 1
+                else:
+                    self.dropped += 1
+
+    def folded(self):
+        """
+        Collapsed stacks, hottest first: "outer;...;inner count" per line.
+        """
+        with self._lock:
+            stacks = sorted(self._stacks.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.dropped = 0
+
+_profiler = None
+
+def get_profiler():
+    """
+    The process-wide profiler if SAMPLING_PROFILER=1, else None.
+    SAMPLING_PROFILER_INTERVAL_MS sets the sampling period.
+    """
+    global _profiler
+    if os.getenv("SAMPLING_PROFILER") != "1":
+        return None
+    if _profiler is None:
+        interval_ms = float(os.getenv("SAMPLING_PROFILER_INTERVAL_MS", PROFILER_INTERVAL_MS))
+        _profiler = SamplingProfiler(interval=interval_ms / 1000)
+    return _profiler
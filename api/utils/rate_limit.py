@@ -0,0 +1,148 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from utils.cache import LRUCache
+from utils.constants import DEFAULT_RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_IDLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_LIMIT_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'rate_limits.sqlite3')
+)
+
+class RateLimiter:
+    """
+    Token buckets keyed by string. A bucket holds at most `burst` tokens and
+    refills at `rate` tokens per second; a key never seen (or idle long
+    enough) has a full bucket.
+
+    take() checks several buckets at once (e.g. the client IP and the
+    session) and consumes a token from all of them or from none.
+    """
+
+    def take(self, limits, cost=1.0):
+        """
+        `limits` is a list of (key, rate, burst). Returns 0.0 if the request
+        is allowed, otherwise the seconds until it would be.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _refill(tokens, updated, now, rate, burst):
+        return min(burst, tokens + (now - updated) * rate)
+
+    @staticmethod
+    def _wait(tokens, cost, rate):
+        return (cost - tokens) / rate if rate > 0 else float('inf')
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    In-process buckets in an LRU (at most max_keys, dropped after `idle`
+    seconds without requests). Limits apply per worker process.
+    """
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS, idle=RATE_LIMIT_IDLE_SECONDS):
+        self._buckets = LRUCache(maxsize=max_keys, ttl=idle)
+        self._lock = threading.Lock()
+
+    def take(self, limits, cost=1.0):
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            retry_after = 0.0
+            for key, rate, burst in limits:
+                bucket = self._buckets.get(key)
+                tokens = burst if bucket is None else self._refill(bucket[0], bucket[1], now, rate, burst)
+                if tokens < cost:
+                    retry_after = max(retry_after, self._wait(tokens, cost, rate))
+                levels.append((key, tokens))
+
+            # 1. All buckets must have room; 2. then every one is charged
+            for key, tokens in levels:
+                self._buckets.put(key, (tokens - cost if not retry_after else tokens, now))
+        return retry_after
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Buckets in a local SQLite key-value table, shared by every worker
+    process on the host. Idle buckets are pruned periodically.
+    """
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path=DEFAULT_RATE_LIMIT_DB_PATH, idle=RATE_LIMIT_IDLE_SECONDS):
+        self.path = path
+        self.idle = idle
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._takes = 0
+
+    def _connection(self):
+        # Connections must not cross a fork (e.g. a preloading server master)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                " key TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def take(self, limits, cost=1.0):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = []
+                retry_after = 0.0
+                for key, rate, burst in limits:
+                    row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                    tokens = burst if row is None else self._refill(row[0], row[1], now, rate, burst)
+                    if tokens < cost:
+                        retry_after = max(retry_after, self._wait(tokens, cost, rate))
+                    levels.append((key, tokens))
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rate_buckets VALUES (?, ?, ?)",
+                    [(key, tokens - cost if not retry_after else tokens, now) for key, tokens in levels]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._takes += 1
+            if self._takes % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - self.idle,))
+        return retry_after
+
+RATE_LIMITERS = {
+    "memory": MemoryRateLimiter,
+    "sqlite": SQLiteRateLimiter
+}
+
+def get_rate_limiter(name=None):
+    """
+    Builds the configured limiter (RATE_LIMIT_BACKEND env var: "memory" or
+    "sqlite"; RATE_LIMIT_DB_PATH sets the SQLite file).
+    """
+    name = (name or os.getenv("RATE_LIMIT_BACKEND", DEFAULT_RATE_LIMIT_BACKEND)).lower()
+    if name not in RATE_LIMITERS:
+        raise ValueError(f"Unknown rate limit backend '{name}' (available: {', '.join(RATE_LIMITERS)})")
+
+    idle = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", RATE_LIMIT_IDLE_SECONDS))
+    if name == "sqlite":
+        limiter = SQLiteRateLimiter(os.getenv("RATE_LIMIT_DB_PATH", DEFAULT_RATE_LIMIT_DB_PATH), idle)
+    else:
+        limiter = MemoryRateLimiter(int(os.getenv("RATE_LIMIT_MAX_KEYS", RATE_LIMIT_MAX_KEYS)), idle)
+    logger.info(f"Using {name} rate limiter")
+    return limiter
@@ -15,3 +15,22 @@ def calculate_intensity(sentiment_score, keyword_count):
     total_intensity = sentiment_intensity + kw_intensity
     
     return round(min(total_intensity, 5.0), 1)
+
+def calculate_intensity_batch(sentiment_scores, keyword_counts):
+    """
+    Vectorized calculate_intensity over a batch.
+    Final rounding uses Python's round() so results match the scalar version exactly.
+    """
+    import numpy as np
+
+    sentiment = np.asarray(sentiment_scores, dtype=np.float64)
+    counts = np.asarray(keyword_counts, dtype=np.float64)
+
+    sentiment_intensity = (1.0 - sentiment) * 1.25
+    kw_intensity = np.minimum(counts * 0.5, 2.5)
+    total_intensity = np.minimum(sentiment_intensity + kw_intensity, 5.0)
+
+    return [
+        5.0 if count >= 10 else round(value, 1)
+        for value, count in zip(total_intensity.tolist(), counts.tolist())
+    ]
@@ -0,0 +1,87 @@
+from utils.constants import MAX_BATCH_SIZE, MAX_HISTORY_ITEMS, MAX_SESSION_ID_LENGTH, MAX_USER_ID_LENGTH
+
+_TYPE_NAMES = {str: "a string", list: "a list", dict: "an object", int: "an integer", float: "a number",
+               bool: "a boolean"}
+
+class Field:
+    """
+    Declarative constraints for one request body field. `message` replaces
+    the generated error text for type and emptiness failures.
+    """
+
+    def __init__(self, types, required=False, nullable=False, non_empty=False, choices=None,
+                 max_length=None, items=None, message=None, status=400):
+        self.types = types if isinstance(types, tuple) else (types,)
+        self.required = required
+        self.nullable = nullable
+        self.non_empty = non_empty
+        self.choices = choices
+        self.max_length = max_length
+        self.items = items if isinstance(items, tuple) or items is None else (items,)
+        self.message = message
+        # Status for a max_length failure (e.g. 413 for oversized batches)
+        self.status = status
+
+    def check(self, name, value):
+        """
+        Returns (error, status) for an invalid value, None if it is valid.
+        """
+        if value is None:
+            return None if self.nullable else (self.message or f"'{name}' must not be null", 400)
+        # bool is an int subclass but never a valid number here
+        if not isinstance(value, self.types) or (isinstance(value, bool) and bool not in self.types):
+            expected = " or ".join(_TYPE_NAMES.get(t, t.__name__) for t in self.types)
+            return self.message or f"'{name}' must be {expected}", 400
+        if self.non_empty and not (value.strip() if isinstance(value, str) else value):
+            return self.message or f"'{name}' must not be empty", 400
+        if self.choices is not None and value not in self.choices:
+            return f"'{name}' must be one of: {', '.join(self.choices)}", 400
+        if self.max_length is not None and len(value) > self.max_length:
+            return f"'{name}' exceeds the maximum length of {self.max_length}", self.status
+        if self.items is not None and not all(isinstance(item, self.items) for item in value):
+            expected = " or ".join(_TYPE_NAMES.get(t, t.__name__) for t in self.items)
+            return f"Every item in '{name}' must be {expected}", 400
+        return None
+
+def validate(data, schema):
+    """
+    Checks a parsed JSON body against a {field: Field} schema before any
+    analysis work. Returns (error, status) for the first failure, or None.
+    Unknown fields are ignored.
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object", 400
+    for name, field in schema.items():
+        if name not in data:
+            if field.required:
+                return f"Missing '{name}' field in request body", 400
+            continue
+        error = field.check(name, data[name])
+        if error:
+            return error
+    return None
+
+MODES = ('user', 'review')
+
+ANALYZE_SCHEMA = {
+    "message": Field(str, required=True, non_empty=True, message="Message must be a non-empty string"),
+    "mode": Field(str, choices=MODES),
+    "segmented": Field(bool, nullable=True),
+    "history": Field(list, nullable=True, max_length=MAX_HISTORY_ITEMS, items=dict),
+    "emergency_contacts": Field(list, nullable=True, items=(dict, str)),
+    "session_id": Field(str, nullable=True, non_empty=True, max_length=MAX_SESSION_ID_LENGTH,
+                        message=f"session_id must be a non-empty string of at most {MAX_SESSION_ID_LENGTH} characters"),
+    "user_id": Field(str, nullable=True, non_empty=True, max_length=MAX_USER_ID_LENGTH,
+                     message=f"user_id must be a non-empty string of at most {MAX_USER_ID_LENGTH} characters")
+}
+
+BATCH_SCHEMA = {
+    "messages": Field(list, required=True, non_empty=True, max_length=MAX_BATCH_SIZE,
+                      message="Messages must be a non-empty list", status=413),
+    "mode": Field(str, choices=MODES),
+    "segmented": Field(bool, nullable=True)
+}
+
+SOS_TRIGGER_SCHEMA = {
+    "emergency_contacts": Field(list, nullable=True, items=(dict, str))
+}
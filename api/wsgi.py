@@ -0,0 +1,37 @@
+"""
+Production WSGI entry point for self-hosting (Vercel keeps using index.py).
+
+Services and analysis data are loaded at import time, so a pre-forking server
+that imports this module in its master (gunicorn with preload_app, see
+gunicorn.conf.py) shares them copy-on-write across workers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import gc
+import logging
+import time
+
+import index
+from index import app, get_services
+
+logger = logging.getLogger(__name__)
+
+def preload():
+    """
+    Initializes services and warms every lazily loaded analysis resource.
+    """
+    start = time.perf_counter()
+    analysis_service, _ = get_services()
+    if analysis_service is None:
+        raise RuntimeError(f"Backend services failed to initialize: {index.init_error}")
+    analysis_service.warm_up()
+
+    # Move everything loaded so far out of the collector's reach, so GC passes
+    # in forked workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded analysis services in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+preload()
+
+application = app
@@ -0,0 +1,141 @@
+import React, { useEffect, useState } from 'react';
+import { XAxis, YAxis, ResponsiveContainer, Tooltip, CartesianGrid, Area, AreaChart } from 'recharts';
+import type { User } from 'firebase/auth';
+import { TrendingUp } from 'lucide-react';
+import { getHistorySeries } from '../../services/analysisService';
+import type { HistorySeries } from '../../services/analysisService';
+
+interface HistorySeriesChartProps {
+    user: User;
+}
+
+// Each range reads the rollup that matches its resolution (minute, hour or day buckets)
+const RANGES = {
+    day: { label: 'Day', seconds: 86400, format: { hour: '2-digit', minute: '2-digit' } },
+    month: { label: 'Month', seconds: 30 * 86400, format: { month: 'short', day: 'numeric' } },
+    year: { label: 'Year', seconds: 365 * 86400, format: { month: 'short', day: 'numeric' } },
+} as const;
+
+type Range = keyof typeof RANGES;
+
+export const HistorySeriesChart: React.FC<HistorySeriesChartProps> = ({ user }) => {
+    const [range, setRange] = useState<Range>('month');
+    const [series, setSeries] = useState<HistorySeries | null>(null);
+    const [unavailable, setUnavailable] = useState(false);
+
+    useEffect(() => {
+        let cancelled = false;
+        const end = Date.now() / 1000;
+        user.getIdToken()
+            .then(idToken => getHistorySeries(user.uid, idToken, { start: end - RANGES[range].seconds, end, points: 120 }))
+            .then(result => {
+                if (!cancelled) setSeries(result);
+            })
+            .catch(() => {
+                // History is off on this server (or the user isn't authorized): hide the chart
+                if (!cancelled) setUnavailable(true);
+            });
+        return () => { cancelled = true; };
+    }, [user, range]);
+
+    if (unavailable) return null;
+
+    const data = (series?.points || []).map(point => ({
+        time: new Date(point.start * 1000).toLocaleString([], RANGES[range].format),
+        intensity: point.intensity_mean,
+        peak: point.intensity_max,
+        count: point.count,
+        sos: point.sos_count
+    }));
+
+    const CustomTooltip = ({ active, payload }: any) => {
+        if (active && payload && payload.length) {
+            const point = payload[0].payload;
+            return (
+                <div className="bg-white/95 backdrop-blur-sm px-4 py-3 rounded-xl border border-brand-light shadow-xl">
+                    <p className="text-xs font-bold text-brand-medium mb-1">{point.time}</p>
+                    <p className="text-2xl font-black text-brand-primary">{point.intensity.toFixed(1)}</p>
+                    <p className="text-[9px] text-brand-medium mt-1 uppercase tracking-wider font-bold">
+                        Avg intensity · peak {point.peak.toFixed(1)} · {point.count} {point.count === 1 ? 'analysis' : 'analyses'}
+                        {point.sos > 0 ? ` · ${point.sos} SOS` : ''}
+                    </p>
+                </div>
+            );
+        }
+        return null;
+    };
+
+    return (
+        <div className="bg-white p-8 rounded-[2.5rem] border border-brand-light shadow-2xl shadow-brand-medium/10 relative overflow-hidden font-sans">
+            {/* Header */}
+            <div className="flex items-center justify-between mb-6">
+                <div className="flex items-center gap-3">
+                    <div className="p-2 bg-brand-light rounded-xl">
+                        <TrendingUp size={18} className="text-brand-primary" />
+                    </div>
+                    <div>
+                        <h3 className="text-xl font-black text-brand-dark">Intensity History</h3>
+                        <p className="text-[9px] text-brand-primary uppercase tracking-widest font-black mt-0.5">
+                            {series ? `${series.source} buckets` : 'Loading'}
+                        </p>
+                    </div>
+                </div>
+                <div className="flex gap-1 bg-brand-light rounded-xl p-1">
+                    {(Object.keys(RANGES) as Range[]).map(key => (
+                        <button
+                            key={key}
+                            onClick={() => setRange(key)}
+                            className={`px-3 py-1.5 rounded-lg text-[10px] font-black uppercase tracking-widest transition-all ${range === key ? 'bg-white text-brand-primary shadow-sm' : 'text-brand-medium hover:text-brand-primary'}`}
+                        >
+                            {RANGES[key].label}
+                        </button>
+                    ))}
+                </div>
+            </div>
+
+            {/* Chart */}
+            {data.length > 0 ? (
+                <div className="w-full h-56">
+                    <ResponsiveContainer width="100%" height="100%">
+                        <AreaChart data={data} margin={{ left: -20, right: 30, top: 10, bottom: 0 }}>
+                            <defs>
+                                <linearGradient id="historyGradient" x1="0" y1="0" x2="0" y2="1">
+                                    <stop offset="0%" stopColor="#2E5E99" stopOpacity={0.2} />
+                                    <stop offset="100%" stopColor="#2E5E99" stopOpacity={0} />
+                                </linearGradient>
+                            </defs>
+                            <CartesianGrid strokeDasharray="3 3" vertical={false} stroke="#7BA4D0" strokeOpacity={0.1} />
+                            <XAxis
+                                dataKey="time"
+                                axisLine={false}
+                                tickLine={false}
+                                tick={{ fill: '#7BA4D0', fontSize: 9, fontWeight: 900 }}
+                            />
+                            <YAxis
+                                domain={[0, 5]}
+                                axisLine={false}
+                                tickLine={false}
+                                tick={{ fill: '#7BA4D0', fontSize: 10, fontWeight: 900 }}
+                                ticks={[0, 1, 2, 3, 4, 5]}
+                            />
+                            <Tooltip content={<CustomTooltip />} />
+                            <Area
+                                type="monotone"
+                                dataKey="intensity"
+                                stroke="#2E5E99"
+                                strokeWidth={3}
+                                fill="url(#historyGradient)"
+                            />
+                        </AreaChart>
+                    </ResponsiveContainer>
+                </div>
+            ) : (
+                <div className="h-56 flex items-center justify-center">
+                    <p className="text-[10px] text-brand-medium font-bold uppercase tracking-widest">
+                        {series ? 'No analyses in this period' : 'Loading history'}
+                    </p>
+                </div>
+            )}
+        </div>
+    );
+};
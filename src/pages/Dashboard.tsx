@@ -23,6 +23,7 @@ import {
 } from 'lucide-react';
 import { useNavigate, Link } from 'react-router-dom';
 import { exportToCSV, exportToPDF } from '../utils/exportUtils';
+import { HistorySeriesChart } from '../components/charts/HistorySeriesChart';
 
 interface HistoryItem {
     id: string;
@@ -502,6 +503,13 @@ const Dashboard: React.FC = () => {
                                     </Link>
                                 </motion.div>
 
+                                {/* Long-term intensity history (server-side rollups) */}
+                                {currentUser && (
+                                    <motion.div variants={itemVariants} className="lg:col-span-12">
+                                        <HistorySeriesChart user={currentUser} />
+                                    </motion.div>
+                                )}
+
                                 {/* Recent Activity Table */}
                                 <motion.div variants={itemVariants} className="lg:col-span-8 bg-white rounded-[2.5rem] border border-brand-light shadow-2xl shadow-brand-medium/10 overflow-hidden">
                                     <div className="p-8 border-b border-brand-light flex items-center justify-between">
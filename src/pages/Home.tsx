@@ -4,7 +4,7 @@ import DashboardGrid from '../components/DashboardGrid';
 import CalmCircle from '../components/CalmCircle';
 import { EmergencyOverlay } from '../components/EmergencyOverlay';
 import { HistoryModal } from '../components/HistoryModal';
-import { analyzeMessage, triggerSOS } from '../services/analysisService';
+import { analyzeMessage, triggerSOS, TREND_HISTORY_TAIL } from '../services/analysisService';
 import type { AnalysisResponse } from '../services/analysisService';
 import type { PredictionHistoryItem } from '../types/history';
 import { generateGroqResponse } from '../services/groqService';
@@ -20,6 +20,9 @@ import { collection, addDoc, query, orderBy, onSnapshot, limit, doc, getDoc } fr
 
 const Home: React.FC = () => {
     const hydrationRef = useRef(false);
+    // Server-side trend session; a short history tail goes with every turn so a
+    // worker that has no record of the session can rebuild the trend
+    const sessionIdRef = useRef<string>(crypto.randomUUID());
     const [analysisResult, setAnalysisResult] = useState<AnalysisResponse | null>(null);
     const [isMobileMenuOpen, setIsMobileMenuOpen] = useState(false);
     // If brand new user with no history, set initial greeting
@@ -56,6 +59,9 @@ const Home: React.FC = () => {
 
     // HYDRATION: Fetch history on mount/re-login
     useEffect(() => {
+        // A different user (or logout) starts a new trend session
+        sessionIdRef.current = crypto.randomUUID();
+
         if (!currentUser) {
             setHistory([]);
             return;
@@ -192,7 +198,10 @@ const Home: React.FC = () => {
                 emergencyContacts = userDoc.data()?.emergencyContacts || [];
             }
 
-            analyzeMessage(content, reviewMode ? 'review' : 'user', history, emergencyContacts)
+            // ID token so the server records the analysis in this user's history
+            const idToken = currentUser ? await currentUser.getIdToken().catch(() => undefined) : undefined;
+
+            analyzeMessage(content, reviewMode ? 'review' : 'user', history.slice(-TREND_HISTORY_TAIL), emergencyContacts, sessionIdRef.current, currentUser?.uid, idToken)
                 .then(async (analysisResult) => {
                     if (!analysisResult) return; // Safety check
 
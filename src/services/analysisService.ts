@@ -20,6 +20,11 @@ export interface AnalysisResponse {
     autonomous_action: {
         sos_triggered: boolean;
         message: string;
+        dispatch_id?: string;
+        dispatch_status?: SOSDispatchStatus['status'];
+        deduplicated?: boolean;
+        // Serverless deployments deliver before responding and report the results here
+        contacts_notified?: SOSDispatchStatus['contacts'];
     };
     decision_explanation?: {
         dominant_state: string;
@@ -28,6 +33,16 @@ export interface AnalysisResponse {
         sentiment_influence: number;
         intensity_reasoning: string;
         final_decision_summary: string;
+        sentences?: {
+            index: number;
+            text: string;
+            classified_state: string;
+            sentiment_score: number;
+            intensity_score: number;
+            keywords: string[];
+            keyword_contributions: Record<string, number>;
+        }[];
+        triggering_sentences?: number[];
     };
     agent_response: {
         agent_message: string;
@@ -37,18 +52,77 @@ export interface AnalysisResponse {
         agent_tone: string;
     };
     mode: 'user' | 'review';
+    // Degraded under load: review requests may come back without decision_explanation or in user mode
+    serving_mode?: 'full' | 'lexicon_sentiment' | 'no_explanation' | 'user_only';
+    session_id?: string;
+    session_unknown?: boolean;
+    lexicon_version?: string;
+    input_truncated?: {
+        original_chars: number;
+        analyzed_chars: number;
+        retained_crisis_sentences: number;
+    };
+}
+
+export interface SOSDispatchStatus {
+    dispatch_id: string;
+    status: 'queued' | 'in_progress' | 'completed' | 'partial' | 'failed';
+    created_at: number;
+    completed_at: number | null;
+    contacts: {
+        name: string;
+        status: 'pending' | 'sent' | 'mock_sent' | 'failed' | 'skipped';
+        attempts: number;
+        sid?: string;
+        error?: string;
+    }[];
+}
+
+export interface HistorySeriesPoint {
+    start: number;
+    count: number;
+    intensity_mean: number;
+    intensity_max: number;
+    sentiment_mean: number;
+    sos_count: number;
+    states: Partial<Record<'Normal' | 'Anxiety' | 'Stress' | 'Depression' | 'Critical Distress', number>>;
 }
 
+export interface HistorySeries {
+    user_id: string;
+    start: number;
+    end: number;
+    source: 'raw' | 'minute' | 'hour' | 'day';
+    bucket_seconds: number;
+    points: HistorySeriesPoint[];
+}
+
+// The emotional trend compares the last TREND_WINDOW states (api/utils/constants.py),
+// so that much history is enough to rebuild it
+export const TREND_HISTORY_TAIL = 3;
+
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api';
 
-export const analyzeMessage = async (message: string, mode: 'user' | 'review' = 'user', history: PredictionHistoryItem[] = [], emergencyContacts: any[] = []): Promise<AnalysisResponse> => {
+// With a sessionId the server keeps the recent trend history itself; `history` only
+// needs the last TREND_HISTORY_TAIL items, which reseed the session on a worker that
+// has no record of it (the response says session_unknown when it had neither).
+// With a userId and that user's Firebase ID token the analysis is also added to the
+// user's long-term history (see getHistorySeries); without a valid token it is not recorded.
+export const analyzeMessage = async (message: string, mode: 'user' | 'review' = 'user', history: PredictionHistoryItem[] = [], emergencyContacts: any[] = [], sessionId?: string, userId?: string, idToken?: string): Promise<AnalysisResponse> => {
     try {
+        const payload = sessionId
+            ? { message, mode, session_id: sessionId, emergency_contacts: emergencyContacts, ...(history.length ? { history } : {}) }
+            : { message, mode, history, emergency_contacts: emergencyContacts };
+        if (userId) {
+            Object.assign(payload, { user_id: userId });
+        }
         const response = await fetch(`${API_BASE_URL}/analyze`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
+                ...(idToken ? { Authorization: `Bearer ${idToken}` } : {}),
             },
-            body: JSON.stringify({ message, mode, history, emergency_contacts: emergencyContacts }),
+            body: JSON.stringify(payload),
         });
 
         if (!response.ok) {
@@ -86,3 +160,43 @@ export const triggerSOS = async (emergencyContacts: any[] = []): Promise<any> =>
         throw error;
     }
 };
+
+export const getSOSStatus = async (dispatchId: string): Promise<SOSDispatchStatus> => {
+    try {
+        const response = await fetch(`${API_BASE_URL}/sos/status/${encodeURIComponent(dispatchId)}`);
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || 'Failed to fetch SOS status');
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('SOS Status API Error:', error);
+        throw error;
+    }
+};
+
+// Server-side rollups of the user's history, at most `points` buckets over [start, end)
+// (epoch seconds; the server defaults to the last 30 days). Needs the user's Firebase ID token.
+export const getHistorySeries = async (userId: string, idToken: string, options: { start?: number; end?: number; points?: number } = {}): Promise<HistorySeries> => {
+    try {
+        const params = new URLSearchParams();
+        Object.entries(options).forEach(([key, value]) => {
+            if (value !== undefined) params.set(key, String(value));
+        });
+        const response = await fetch(`${API_BASE_URL}/history/${encodeURIComponent(userId)}/series?${params}`, {
+            headers: { Authorization: `Bearer ${idToken}` },
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || 'Failed to fetch history');
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('History API Error:', error);
+        throw error;
+    }
+};